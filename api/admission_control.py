@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Admission Control for BuilderOS Mobile BridgeHub Executions
+
+Caps how many BridgeHub/CLI executions run at once on the Mac and queues the
+rest fairly per device, so one phone firing several tabs cannot starve another
+and five simultaneous sends do not fork five Node runtimes plus five CLIs.
+
+Fairness:
+- Each device has its own FIFO queue
+- Free slots are handed out round-robin across devices with waiters
+- Waiters are told their queue position whenever it changes
+
+Priority classes:
+- interactive (a person waiting on a chat answer), background (autonomous
+  runs such as a long Codex build) and batch (bulk work nobody watches)
+- Queued interactive executions are admitted before background ones, and
+  background before batch
+- Non-interactive classes never hold the last INTERACTIVE_RESERVED_SLOTS
+  slots, so a quick question does not wait behind a full house of builds
+- Wait times are reported per class
+
+Only executions on this host take a slot; turns sent to worker nodes are
+admitted by the node itself. The cap comes from BRIDGEHUB_MAX_CONCURRENT.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT = 3
+MAX_CONCURRENT_ENV = "BRIDGEHUB_MAX_CONCURRENT"
+
+# Priority classes, in the order they are served
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+PRIORITY_BATCH = "batch"
+PRIORITY_CLASSES = (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BATCH)
+
+# OS scheduling priority (nice value) for each class's BridgeHub/CLI children
+PRIORITY_NICE = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 10, PRIORITY_BATCH: 19}
+
+# Slots only interactive executions may use
+INTERACTIVE_RESERVED_SLOTS = 1
+
+WAIT_SAMPLES = 200  # Recent waits kept per class for percentiles
+
+# Called with the 1-based queue position while waiting for a slot
+QueuePositionCallback = Callable[[int], Awaitable[None]]
+
+
+@dataclass
+class _Waiter:
+    """A queued execution waiting for a slot"""
+    device_id: str
+    future: asyncio.Future
+    on_queued: Optional[QueuePositionCallback]
+    priority: str = PRIORITY_INTERACTIVE
+    enqueued_at: float = field(default_factory=time.time)
+    position: int = 0
+
+
+class _WaitStats:
+    """Queue latency of admitted executions in one priority class"""
+
+    def __init__(self):
+        self.admitted = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.recent: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def add(self, wait_ms: float):
+        self.admitted += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.recent.append(wait_ms)
+
+    def to_dict(self) -> Dict:
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "admitted": self.admitted,
+            "avg_wait_ms": round(self.total_wait_ms / self.admitted, 2) if self.admitted else 0.0,
+            "p95_wait_ms": round(p95, 2),
+            "max_wait_ms": round(self.max_wait_ms, 2)
+        }
+
+
+def normalize_priority(priority: Optional[str]) -> str:
+    """A known priority class, defaulting to interactive"""
+    return priority if priority in PRIORITY_CLASSES else PRIORITY_INTERACTIVE
+
+
+class AdmissionController:
+    """
+    Global concurrency limiter with priority classes and per-device fair queues
+
+    Usage:
+        async with controller.slot(device_id, on_queued=notify, priority="background"):
+            ... run the BridgeHub/CLI execution ...
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        interactive_reserved: int = INTERACTIVE_RESERVED_SLOTS
+    ):
+        self.max_concurrent = max_concurrent
+        self.active = 0
+
+        # Most slots non-interactive executions may hold at once (at least one)
+        self.background_limit = max(1, max_concurrent - interactive_reserved)
+        self.active_by_priority: Dict[str, int] = {priority: 0 for priority in PRIORITY_CLASSES}
+
+        # Priority class → device → waiters; order of device keys is the
+        # round-robin order within the class
+        self.queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in PRIORITY_CLASSES
+        }
+        self.wait_stats: Dict[str, _WaitStats] = {priority: _WaitStats() for priority in PRIORITY_CLASSES}
+
+        # Wait time statistics
+        self.admitted = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.last_wait_ms = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(waiters) for queues in self.queues.values() for waiters in queues.values())
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        device_id: str,
+        on_queued: Optional[QueuePositionCallback] = None,
+        priority: str = PRIORITY_INTERACTIVE
+    ):
+        """Hold one execution slot for the duration of the block"""
+
+        priority = normalize_priority(priority)
+        await self._acquire(device_id, on_queued, priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def _has_room(self, priority: str) -> bool:
+        """Whether an execution of this class may start now"""
+
+        if self.active >= self.max_concurrent:
+            return False
+        if priority == PRIORITY_INTERACTIVE:
+            return True
+        return self.active - self.active_by_priority[PRIORITY_INTERACTIVE] < self.background_limit
+
+    def _has_waiters_ahead(self, priority: str) -> bool:
+        """Whether a queued execution of this class or a higher one goes first"""
+
+        for waiting_priority in PRIORITY_CLASSES:
+            if self.queues[waiting_priority]:
+                return True
+            if waiting_priority == priority:
+                return False
+        return False
+
+    def _start(self, priority: str):
+        self.active += 1
+        self.active_by_priority[priority] += 1
+
+    async def _acquire(self, device_id: str, on_queued: Optional[QueuePositionCallback], priority: str):
+        """Wait for a free slot, honoring priority classes and the per-device fair queue"""
+
+        start_time = time.time()
+
+        if self._has_room(priority) and not self._has_waiters_ahead(priority):
+            self._start(priority)
+            self._record_wait(start_time, priority)
+            return
+
+        waiter = _Waiter(
+            device_id=device_id,
+            future=asyncio.get_running_loop().create_future(),
+            on_queued=on_queued,
+            priority=priority
+        )
+        self.queues[priority].setdefault(device_id, deque()).append(waiter)
+
+        logger.info(
+            f"🚦 {priority.capitalize()} execution queued for device {device_id[:8]} "
+            f"({self.active}/{self.max_concurrent} running, {self.queue_depth} waiting)"
+        )
+        await self._notify_positions()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Slot was granted just as we were cancelled: hand it on
+                self._release(priority)
+            else:
+                self._remove(waiter)
+                await self._notify_positions()
+            raise
+
+        self._record_wait(waiter.enqueued_at, priority)
+
+    def _release(self, priority: str):
+        """Free a slot and grant free slots to waiters, highest class first"""
+
+        self.active -= 1
+        self.active_by_priority[priority] -= 1
+
+        for waiting_priority in PRIORITY_CLASSES:
+            queues = self.queues[waiting_priority]
+
+            while queues and self._has_room(waiting_priority):
+                device_id, waiters = next(iter(queues.items()))
+                waiter = waiters.popleft()
+
+                # Rotate: this device goes to the back of the round-robin order
+                del queues[device_id]
+                if waiters:
+                    queues[device_id] = waiters
+
+                if waiter.future.done():
+                    continue
+
+                self._start(waiting_priority)
+                waiter.future.set_result(None)
+
+            if queues:
+                break  # Lower classes wait behind this one
+
+        if self.queue_depth:
+            asyncio.ensure_future(self._notify_positions())
+
+    def _remove(self, waiter: _Waiter):
+        """Drop a cancelled waiter from its device queue"""
+
+        queues = self.queues[waiter.priority]
+        waiters = queues.get(waiter.device_id)
+        if waiters is None:
+            return
+
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+
+        if not waiters:
+            del queues[waiter.device_id]
+
+    def _ordered_waiters(self) -> List[_Waiter]:
+        """All waiters in the order they will be admitted"""
+
+        ordered: List[_Waiter] = []
+
+        for priority in PRIORITY_CLASSES:
+            queues = [list(waiters) for waiters in self.queues[priority].values()]
+            depth = max((len(waiters) for waiters in queues), default=0)
+
+            for round_index in range(depth):
+                for waiters in queues:
+                    if round_index < len(waiters):
+                        ordered.append(waiters[round_index])
+
+        return ordered
+
+    async def _notify_positions(self):
+        """Tell every waiter whose position changed where it now stands"""
+
+        for position, waiter in enumerate(self._ordered_waiters(), start=1):
+            if waiter.position == position:
+                continue
+
+            waiter.position = position
+            if waiter.on_queued:
+                try:
+                    await waiter.on_queued(position)
+                except Exception as e:
+                    logger.debug(f"Queue position callback failed: {e}")
+
+    def _record_wait(self, enqueued_at: float, priority: str):
+        """Track how long an admitted execution waited"""
+
+        wait_ms = (time.time() - enqueued_at) * 1000
+        self.admitted += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.last_wait_ms = wait_ms
+        self.wait_stats[priority].add(wait_ms)
+
+        if wait_ms >= 1:
+            logger.info(f"🚦 {priority.capitalize()} execution admitted after {wait_ms:.0f}ms in queue")
+
+    def get_stats(self) -> Dict:
+        """Get admission statistics"""
+
+        now = time.time()
+        oldest_wait_ms = max(
+            (
+                (now - waiters[0].enqueued_at) * 1000
+                for queues in self.queues.values()
+                for waiters in queues.values()
+            ),
+            default=0.0
+        )
+
+        # Cut like the pool's session ids: /api/health is unauthenticated
+        queued_by_device: Dict[str, int] = {}
+        for queues in self.queues.values():
+            for device_id, waiters in queues.items():
+                shown = device_id[:16] + "..." if len(device_id) > 16 else device_id
+                queued_by_device[shown] = queued_by_device.get(shown, 0) + len(waiters)
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "background_limit": self.background_limit,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "queued_by_device": queued_by_device,
+            "by_priority": {
+                priority: {
+                    "active": self.active_by_priority[priority],
+                    "queued": sum(len(waiters) for waiters in self.queues[priority].values()),
+                    **self.wait_stats[priority].to_dict()
+                }
+                for priority in PRIORITY_CLASSES
+            },
+            "admitted": self.admitted,
+            "avg_wait_ms": round(self.total_wait_ms / self.admitted, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "last_wait_ms": round(self.last_wait_ms, 2),
+            "oldest_wait_ms": round(oldest_wait_ms, 2)
+        }
+
+
+def max_concurrent_from_env() -> int:
+    """Executions this host runs at once, from BRIDGEHUB_MAX_CONCURRENT"""
+
+    value = os.environ.get(MAX_CONCURRENT_ENV, "").strip()
+    if not value:
+        return DEFAULT_MAX_CONCURRENT
+
+    try:
+        count = int(value)
+        if count < 1:
+            raise ValueError
+    except ValueError:
+        logger.warning(f"⚠️  Ignoring {MAX_CONCURRENT_ENV}={value!r}; using {DEFAULT_MAX_CONCURRENT}")
+        return DEFAULT_MAX_CONCURRENT
+
+    return count
+
+
+# Global admission controller shared by CLIProcessPool and BridgeHubClient
+admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the global admission controller"""
+    global admission_controller
+
+    if admission_controller is None:
+        admission_controller = AdmissionController(max_concurrent_from_env())
+
+    return admission_controller
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Daemon Benchmark for BuilderOS Mobile
+
+Measures request round-trip time for a one-shot BridgeHub spawn versus a
+request to a resident daemon over a Unix socket, sequentially and with
+several requests in flight at once (multiplexed over the pooled
+connections).
+
+Both sides are bridgehub_standin.py, so the numbers isolate process start-up
+and transport from BridgeHub/CLI work. The stand-in runs under Python; a
+real bridgehub.js spawn adds Node.js start-up on top (100-300 ms).
+
+Usage:
+    python3 bench_daemon.py [--runs 50] [--concurrency 8] [--latency 0]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from bridgehub_daemon import DaemonPool
+from bridgehub_protocol import FrameReader, KIND_PAYLOAD, STDIN_REQUEST_ARGS, write_request
+from bridgehub_request import build_request, encode_request
+
+STANDIN = str(Path(__file__).with_name("bridgehub_standin.py"))
+
+
+async def time_spawn(body: bytes, latency: float) -> float:
+    """One-shot: spawn the stand-in and wait for its payload"""
+
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, STANDIN, *STDIN_REQUEST_ARGS, "--latency", str(latency),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE
+    )
+    writer = asyncio.create_task(write_request(process.stdin, body))
+
+    reader = FrameReader(process.stdout)
+    while (record := await reader.read()) and record[0] != KIND_PAYLOAD:
+        pass
+
+    elapsed = (time.perf_counter() - start) * 1000
+    await writer
+    await process.wait()
+    return elapsed
+
+
+async def time_daemon(pool: DaemonPool, body: bytes) -> float:
+    """Daemon: send the request over a pooled connection and wait for its payload"""
+
+    start = time.perf_counter()
+    async for _ in pool.execute(body):
+        pass
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_concurrent(make_sample, runs: int, concurrency: int) -> List[float]:
+    """Run `runs` samples with at most `concurrency` in flight"""
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await make_sample()
+
+    return await asyncio.gather(*(one() for _ in range(runs)))
+
+
+def summarize(label: str, samples: List[float], wall_s: float):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(
+        f"{label:<24} median {statistics.median(samples):7.1f}ms  "
+        f"p95 {p95:7.1f}ms  throughput {len(samples) / wall_s:7.1f} req/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated CLI time in ms")
+    args = parser.parse_args()
+
+    body = encode_request(build_request(
+        session_id="bench-session",
+        agent_type="claude",
+        message="benchmark",
+        conversation_history=[{"role": "user", "content": "x" * 1000}] * 16
+    ))
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "bridgehub.sock")
+    daemon = await asyncio.create_subprocess_exec(
+        sys.executable, STANDIN, "--daemon", "--socket", socket_path, "--latency", str(args.latency),
+        stdout=asyncio.subprocess.PIPE
+    )
+    await daemon.stdout.readline()  # Listening
+    pool = DaemonPool(socket_path)
+
+    print(f"{len(body)} byte request | {args.runs} runs | simulated CLI latency {args.latency:.0f}ms")
+
+    try:
+        for label, concurrency in (("sequential", 1), (f"{args.concurrency} in flight", args.concurrency)):
+            start = time.perf_counter()
+            samples = await run_concurrent(lambda: time_spawn(body, args.latency), args.runs, concurrency)
+            summarize(f"spawn, {label}", samples, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            samples = await run_concurrent(lambda: time_daemon(pool, body), args.runs, concurrency)
+            summarize(f"daemon, {label}", samples, time.perf_counter() - start)
+
+        print(f"daemon connections used: {pool.get_stats()['connections']}")
+
+    finally:
+        await pool.close()
+        daemon.terminate()
+        await daemon.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
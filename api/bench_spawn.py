@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Spawn Benchmark for BuilderOS Mobile
+
+Measures how long it takes a freshly spawned child to receive a BridgeHub
+request, passing the request as a `--request <json>` argument versus
+streaming it over stdin (`--request -`), across payload sizes.
+
+The child is a tiny stand-in that reads the request the same way
+bridgehub.js does and prints its length, so the numbers isolate spawn and
+transfer cost from BridgeHub/CLI start-up.
+
+With --overhead it instead measures the cost of the spawn itself, as the
+pool used to do it (environment copied and PATH rebuilt per call, a bare
+program name looked up on PATH at exec, rlimits set in a preexec_fn, which
+forces fork) versus through BridgeHubLauncher and ProcessLimiter now
+(cached environment, resolved path, rlimits applied after spawn so CPython
+can vfork). The child is `true`; --ballast grows this process first, since
+fork gets slower the more memory the server holds.
+
+Usage:
+    python3 bench_spawn.py [--runs 20] [--sizes 1,16,64,120,512,2048] [--node]
+    python3 bench_spawn.py --overhead [--runs 200] [--ballast 512]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from bridgehub_launcher import BridgeHubLauncher
+from bridgehub_protocol import STDIN_REQUEST_ARGS, write_request
+from bridgehub_request import encode_request
+from process_control import NEW_PROCESS_GROUP
+from resource_limits import ProcessLimiter, ResourceLimits
+
+PYTHON_CHILD = (
+    "import sys;"
+    "a=sys.argv[1:];"
+    "r=sys.stdin.buffer.read() if a[1]=='-' else a[1].encode();"
+    "print(len(r),flush=True)"
+)
+
+NODE_CHILD = (
+    "const a=process.argv.slice(1);"
+    "if(a[1]==='-'){const c=[];process.stdin.on('data',d=>c.push(d));"
+    "process.stdin.on('end',()=>console.log(Buffer.concat(c).length));}"
+    "else{console.log(Buffer.byteLength(a[1]));}"
+)
+
+
+def build_request(size_kb: int) -> dict:
+    """A BridgeHub-shaped request whose history is roughly size_kb"""
+
+    message = {"role": "user", "content": "x" * 1000}
+    history = [message] * max(1, size_kb)
+
+    return {
+        "version": "bridgehub/1.0",
+        "action": "freeform",
+        "capsule": "/Users/Ty/BuilderOS",
+        "session": "bench-session",
+        "payload": {
+            "message": "benchmark",
+            "intent": "mobile_claude_query",
+            "direction": "codex_to_claude",
+            "context": [{
+                "title": "Conversation History",
+                "role": "note",
+                "content": json.dumps(history)
+            }],
+            "metadata": {"source": "bench_spawn"}
+        }
+    }
+
+
+async def time_argv(command: List[str], request: dict) -> Optional[float]:
+    """Spawn with the request as an argument; None if the OS refuses it"""
+
+    start = time.perf_counter()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command, "--request", encode_request(request).decode('utf-8'),
+            stdout=asyncio.subprocess.PIPE
+        )
+    except OSError:
+        return None  # E2BIG: over ARG_MAX / MAX_ARG_STRLEN
+
+    await process.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    await process.wait()
+    return elapsed
+
+
+async def time_stdin(command: List[str], request: dict) -> float:
+    """Spawn and stream the request over stdin"""
+
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *command, *STDIN_REQUEST_ARGS,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE
+    )
+    writer = asyncio.create_task(write_request(process.stdin, encode_request(request)))
+
+    await process.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    await writer
+    await process.wait()
+    return elapsed
+
+
+async def time_spawn_before(limiter: ProcessLimiter, program: str, script: str) -> float:
+    """Spawn the way the pool and client used to: per-call env, PATH lookup, preexec_fn"""
+
+    start = time.perf_counter()
+    env = os.environ.copy()
+    env["PATH"] = f"/opt/homebrew/bin:/opt/homebrew/sbin:/usr/local/bin:{env.get('PATH', '')}"
+    Path(script).exists()
+
+    process = await limiter.spawn("bench", program, script, limit_after_spawn=False, env=env, **NEW_PROCESS_GROUP)
+    await process.wait()
+    return (time.perf_counter() - start) * 1000
+
+
+async def time_spawn_after(limiter: ProcessLimiter, launcher: BridgeHubLauncher) -> float:
+    """Spawn through the launcher with limits applied after exec"""
+
+    start = time.perf_counter()
+    process = await limiter.spawn("bench", *launcher.command(), env=launcher.env, **NEW_PROCESS_GROUP)
+    await process.wait()
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_overhead(runs: int, ballast_mb: int):
+    """Compare spawn overhead before and after the launcher"""
+
+    program = shutil.which("true")
+    if not program:
+        sys.exit("true not found on PATH")
+
+    # Resident memory the server would hold (sessions, caches, buffers)
+    ballast = bytearray(ballast_mb * 1024 * 1024)
+    for offset in range(0, len(ballast), 4096):
+        ballast[offset] = 1
+
+    # An rlimit children do not inherit (so one is always set), no cgroup:
+    # isolates the spawn primitive
+    limiter = ProcessLimiter(ResourceLimits(cpu_seconds=24 * 3600, cgroup_memory_mb=None, cgroup_cpu_percent=None))
+    launcher = BridgeHubLauncher(os.path.basename(program), __file__)
+
+    print(f"Child: {program} | {runs} runs | parent ballast {ballast_mb}MB")
+    for label, sample in (
+        ("before (fork + preexec)", lambda: time_spawn_before(limiter, os.path.basename(program), __file__)),
+        ("after (launcher)", lambda: time_spawn_after(limiter, launcher))
+    ):
+        await sample()  # Warm up
+        samples = sorted([await sample() for _ in range(runs)])
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(f"{label:<26} median {statistics.median(samples):6.2f}ms  p95 {p95:6.2f}ms")
+
+    del ballast
+
+
+def summarize(samples: List[Optional[float]]) -> str:
+    if any(sample is None for sample in samples):
+        return "E2BIG"
+    return f"{statistics.median(samples):8.1f}ms"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--sizes", default="1,16,64,120,512,2048",
+                        help="Comma-separated payload sizes in KB")
+    parser.add_argument("--node", action="store_true",
+                        help="Use a Node.js child instead of Python")
+    parser.add_argument("--overhead", action="store_true",
+                        help="Measure spawn overhead before and after the launcher")
+    parser.add_argument("--ballast", type=int, default=0,
+                        help="MB of memory to hold in this process (--overhead)")
+    args = parser.parse_args()
+
+    if args.overhead:
+        await run_overhead(args.runs, args.ballast)
+        return
+
+    if args.node:
+        node = shutil.which("node")
+        if not node:
+            sys.exit("node not found on PATH")
+        command = [node, "-e", NODE_CHILD, "--"]
+    else:
+        command = [sys.executable, "-c", PYTHON_CHILD]
+
+    print(f"Child: {'node' if args.node else 'python'} | median of {args.runs} runs")
+    print(f"{'payload':>10} {'bytes':>10} {'argv':>10} {'stdin':>10}")
+
+    for size_kb in (int(size) for size in args.sizes.split(",")):
+        request = build_request(size_kb)
+        encoded = len(encode_request(request))
+
+        argv_samples = [await time_argv(command, request) for _ in range(args.runs)]
+        stdin_samples = [await time_stdin(command, request) for _ in range(args.runs)]
+
+        print(
+            f"{size_kb:>8}KB {encoded:>10} "
+            f"{summarize(argv_samples):>10} {summarize(stdin_samples):>10}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,13 +2,32 @@
 """
 BridgeHub Integration Client for BuilderOS Mobile
 Connects mobile backend to BridgeHub relay for agent coordination
+
+Failures are raised as ExecutionError (never yielded as answer text), and
+spawn and parse failures feed a circuit breaker the same way they do in
+CLIProcessPool, so a broken BridgeHub fails fast here too. Children are
+started through the same ProcessLimiter as the pool's, so they get the same
+rlimits and cgroup caps.
 """
 
 import asyncio
-import json
 import logging
+import time
+from contextlib import aclosing
 from typing import Dict, Optional, AsyncIterator, List
-from pathlib import Path
+
+from admission_control import QueuePositionCallback, get_admission_controller
+from bridgehub_daemon import DaemonUnavailable, get_daemon_pool
+from bridgehub_launcher import DEFAULT_BRIDGEHUB_PATH, DEFAULT_NODE, get_launcher
+from bridgehub_events import ErrorEvent, FinalEvent, ResponseStream
+from bridgehub_protocol import FrameReader, ProtocolError, StdinRequestRejected, stdin_request_rejected, write_request
+from bridgehub_request import ENCODER, build_request, encode_request
+from circuit_breaker import BridgeHubFailure, CircuitBreaker
+from performance_trace import PerformanceTrace
+from process_control import NEW_PROCESS_GROUP, ExecutionError, kill_process_group
+from resource_limits import get_process_limiter
+from resource_usage import ExecutionUsage, UsageMeter, get_usage_ledger
+from stderr_capture import format_stderr, get_stderr_log
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +35,8 @@ logger = logging.getLogger(__name__)
 class BridgeHubClient:
     """Client for calling BridgeHub relay"""
 
-    BRIDGEHUB_PATH = "/Users/Ty/BuilderOS/tools/bridgehub/dist/bridgehub.js"
-    NODE_PATH = "/opt/homebrew/bin/node"  # Explicit path to Node.js (Homebrew install)
+    BRIDGEHUB_PATH = DEFAULT_BRIDGEHUB_PATH
+    NODE_PATH = DEFAULT_NODE  # Resolved on the Homebrew-first spawn PATH
     DEFAULT_TIMEOUT = 120  # 2 minutes
 
     @staticmethod
@@ -25,7 +44,10 @@ class BridgeHubClient:
         message: str,
         session_id: str,
         conversation_history: List[Dict],
-        system_context: str = ""
+        system_context: str = "",
+        device_id: str = "unknown-device",
+        on_queued: Optional[QueuePositionCallback] = None,
+        trace: Optional[PerformanceTrace] = None
     ) -> AsyncIterator[str]:
         """
         Call BridgeHub to execute Jarvis session via CLAUDE CODE
@@ -43,6 +65,9 @@ class BridgeHubClient:
             session_id: Persistent session ID
             conversation_history: Previous messages [{"role": "user", "content": "..."}]
             system_context: CLAUDE.md content
+            device_id: Device the message came from (fair queueing key)
+            on_queued: Called with the queue position while waiting for a slot
+            trace: Performance trace to record the encoded request size on
 
         Yields:
             Response chunks as strings
@@ -52,55 +77,29 @@ class BridgeHubClient:
         logger.debug(f"   Message: {message[:60]}...")
         logger.debug(f"   History: {len(conversation_history)} messages")
 
-        # Build BridgeHub request with correct payload format
-        # context must be an array of {title, role, content} objects
-        context_items = []
-
-        # Add conversation history as context
-        if conversation_history:
-            context_items.append({
-                "title": "Conversation History",
-                "role": "note",
-                "content": json.dumps(conversation_history, indent=2)
-            })
-
-        # NOTE: Do NOT send CLAUDE.md through BridgeHub
-        # The file is 35KB and causes the response payload to be too large (65KB+)
-        # which gets corrupted when reading line-by-line from stdout.
-        # BridgeHub/Codex already has access to CLAUDE.md in the filesystem.
-        # if system_context:
-        #     context_items.append({
-        #         "title": "System Context (CLAUDE.md)",
-        #         "role": "system",
-        #         "content": system_context
-        #     })
-
-        request = {
-            "version": "bridgehub/1.0",
-            "action": "freeform",
-            "capsule": "/Users/Ty/BuilderOS",
-            "session": session_id,
-            "payload": {
-                "message": message,
-                "intent": "mobile_session_query",
-                "direction": "codex_to_claude",  # Jarvis uses Claude Code, not Codex
-                "context": context_items,
-                "metadata": {
-                    "source": "builderos_mobile",
-                    "mode": "coordination"
-                }
-            }
-        }
+        # Jarvis uses Claude Code, not Codex (direction codex_to_claude)
+        request = build_request(
+            session_id=session_id,
+            agent_type="claude",
+            message=message,
+            conversation_history=conversation_history,
+            system_context=system_context,
+            intent="mobile_session_query",
+            metadata={"mode": "coordination"}
+        )
 
         # Call BridgeHub and stream response
-        async for chunk in BridgeHubClient._execute_bridgehub(request):
+        async for chunk in BridgeHubClient._execute_bridgehub(request, device_id, on_queued, trace):
             yield chunk
 
     @staticmethod
     async def call_codex(
         message: str,
         session_id: str,
-        conversation_history: List[Dict]
+        conversation_history: List[Dict],
+        device_id: str = "unknown-device",
+        on_queued: Optional[QueuePositionCallback] = None,
+        trace: Optional[PerformanceTrace] = None
     ) -> AsyncIterator[str]:
         """
         Call BridgeHub to execute Codex session via CODEX CLI
@@ -117,6 +116,9 @@ class BridgeHubClient:
             message: User's message
             session_id: Persistent session ID
             conversation_history: Previous messages
+            device_id: Device the message came from (fair queueing key)
+            on_queued: Called with the queue position while waiting for a slot
+            trace: Performance trace to record the encoded request size on
 
         Yields:
             Response chunks as strings
@@ -126,50 +128,127 @@ class BridgeHubClient:
         logger.debug(f"   Message: {message[:60]}...")
         logger.debug(f"   History: {len(conversation_history)} messages")
 
-        # Build BridgeHub request for Codex with correct payload format
-        context_items = []
-
-        # Add conversation history (Codex sees full context)
-        if conversation_history:
-            context_items.append({
-                "title": "Full Conversation History",
-                "role": "note",
-                "content": json.dumps(conversation_history, indent=2)
-            })
-
-        request = {
-            "version": "bridgehub/1.0",
-            "action": "freeform",
-            "capsule": "/Users/Ty/BuilderOS",
-            "session": session_id,
-            "payload": {
-                "message": message,
-                "intent": "mobile_codex_query",
-                "direction": "claude_to_codex",  # Codex uses Codex CLI with danger-full-access
-                "context": context_items,
-                "metadata": {
-                    "source": "builderos_mobile",
-                    "visibility": "full"
-                }
-            }
-        }
+        # Codex uses Codex CLI with danger-full-access and sees full context
+        request = build_request(
+            session_id=session_id,
+            agent_type="codex",
+            message=message,
+            conversation_history=conversation_history,
+            intent="mobile_codex_query",
+            metadata={"visibility": "full"},
+            history_title="Full Conversation History"
+        )
 
         # Call BridgeHub and stream response
-        async for chunk in BridgeHubClient._execute_bridgehub(request):
+        async for chunk in BridgeHubClient._execute_bridgehub(request, device_id, on_queued, trace):
             yield chunk
 
     @staticmethod
-    async def _execute_bridgehub(request: Dict) -> AsyncIterator[str]:
+    async def _execute_bridgehub(
+        request: Dict,
+        device_id: str = "unknown-device",
+        on_queued: Optional[QueuePositionCallback] = None,
+        trace: Optional[PerformanceTrace] = None
+    ) -> AsyncIterator[str]:
         """
         Execute BridgeHub subprocess and stream output
 
+        Uses the resident BridgeHub daemon when one is running, otherwise
+        spawns BridgeHub. Runs under the global admission controller, so it
+        shares the concurrency cap with CLIProcessPool.
+
         Args:
             request: BridgeHub request payload
+            device_id: Device the message came from (fair queueing key)
+            on_queued: Called with the queue position while waiting for a slot
+            trace: Performance trace to record request size and resource usage on
 
         Yields:
             Response chunks from BridgeHub
+
+        Raises:
+            ExecutionError: the execution failed (CircuitOpen at once, before
+                queueing, while BridgeHub is known to be broken)
         """
-        import time
+        body = encode_request(request)
+        payload = request.get("payload", {})
+        agent_type = "claude" if payload.get("direction") == "codex_to_claude" else "codex"
+
+        logger.debug(f"📦 Request encoded: {len(body)} bytes ({ENCODER})")
+        if trace:
+            trace.mark("request_encoded", {"bytes": len(body), "encoder": ENCODER})
+
+        if not get_daemon_pool().available:
+            get_breaker().check(trial=False)
+
+        async with get_admission_controller().slot(device_id, on_queued):
+            if get_daemon_pool().available:
+                try:
+                    chunks = BridgeHubClient._run_daemon(body, request.get("session", ""), agent_type, trace)
+                    async with aclosing(chunks):
+                        async for chunk in chunks:
+                            yield chunk
+                    return
+                except DaemonUnavailable as e:
+                    # Raised before any output, so spawning loses nothing
+                    logger.debug(f"🔌 {e}; spawning BridgeHub")
+
+            async for chunk in BridgeHubClient._run_bridgehub(body, request.get("session", ""), agent_type, trace):
+                yield chunk
+
+    @staticmethod
+    async def _run_daemon(
+        body: bytes,
+        session_id: str = "",
+        agent_type: str = "claude",
+        trace: Optional[PerformanceTrace] = None
+    ) -> AsyncIterator[str]:
+        """Send one request to the resident daemon and stream its output"""
+
+        start_time = time.time()
+        stream = ResponseStream()
+        bytes_read = 0
+        reached = False
+        records = get_daemon_pool().execute(body)
+
+        try:
+            async with aclosing(records):
+                async for kind, record in records:
+                    if not reached:
+                        reached = True
+                        logger.info(f"⏱️  First output from BridgeHub daemon in {(time.time() - start_time) * 1000:.0f}ms")
+                    bytes_read += len(record)
+
+                    for chunk in stream.feed(kind, record):
+                        yield chunk
+
+        except (ConnectionError, OSError, ProtocolError) as e:
+            reached = True
+            logger.error(f"❌ BridgeHub daemon request failed: {e}")
+            raise ExecutionError(str(e), code="connection_lost", details={"source": "daemon"}) from e
+
+        finally:
+            if reached:
+                usage = ExecutionUsage(
+                    wall_ms=(time.time() - start_time) * 1000,
+                    bytes_in=len(body),
+                    bytes_out=bytes_read,
+                    source="daemon"
+                )
+                get_usage_ledger().record(session_id, agent_type, usage)
+                if trace:
+                    trace.mark("resource_usage", usage.to_dict())
+
+    @staticmethod
+    async def _run_bridgehub(
+        body: bytes,
+        session_id: str = "",
+        agent_type: str = "claude",
+        trace: Optional[PerformanceTrace] = None
+    ) -> AsyncIterator[str]:
+        """Spawn BridgeHub for one request and stream its output (again, with the request as an argument, if it rejects stdin)"""
+
+        breaker = get_breaker()
 
         # Track timing
         start_time = time.time()
@@ -177,136 +256,174 @@ class BridgeHubClient:
         first_output_time = None
         first_chunk_time = None
 
-        # Verify BridgeHub exists
-        if not Path(BridgeHubClient.BRIDGEHUB_PATH).exists():
-            error_msg = f"BridgeHub not found at {BridgeHubClient.BRIDGEHUB_PATH}"
+        # Verify BridgeHub exists (resolved once, not on every call)
+        launcher = get_launcher(BridgeHubClient.NODE_PATH, BridgeHubClient.BRIDGEHUB_PATH)
+        request_args, via_stdin = launcher.request_args(body)
+        command = launcher.command(*request_args)
+        if not launcher.script_exists:
+            launcher.invalidate()  # Look again next time
+            error_msg = f"BridgeHub not found at {launcher.script}"
             logger.error(error_msg)
-            yield f"Error: {error_msg}"
-            return
-
-        # Serialize request
-        request_json = json.dumps(request)
+            failure = BridgeHubFailure(error_msg, code="spawn_failed", details=launcher.get_stats())
+            breaker.record_failure(failure)
+            raise failure
 
         logger.debug(f"🚀 Spawning BridgeHub process")
-        logger.debug(f"   Command: node {BridgeHubClient.BRIDGEHUB_PATH} --request '<json>'")
+        logger.debug(f"   Command: {' '.join(command[:3])} (request {'on stdin' if via_stdin else 'as argument'})")
+
+        process = None
+        request_writer = None
+        reader = None
+        meter = None
+        stderr = None
+        request_bytes = len(body)
+        stream = ResponseStream()
+        limiter = get_process_limiter()
+        answered = False  # Any chunk yielded
+        retry_with_argv = False
+
+        # Also reached as the daemon's fallback. Half-open, this spawn is the
+        # one trial the breaker lets through.
+        trial = breaker.check()
 
         try:
-            # Spawn BridgeHub process (use explicit Node.js path for background processes)
-            # CRITICAL: Pass environment with Homebrew paths so BridgeHub can spawn codex/claude
-            import os
-            env = os.environ.copy()
-            # Prepend Homebrew paths to ensure codex and node are found
-            homebrew_paths = "/opt/homebrew/bin:/opt/homebrew/sbin:/usr/local/bin"
-            env["PATH"] = f"{homebrew_paths}:{env.get('PATH', '')}"
-
-            process = await asyncio.create_subprocess_exec(
-                BridgeHubClient.NODE_PATH,
-                BridgeHubClient.BRIDGEHUB_PATH,
-                "--request",
-                request_json,
+            # The launcher's environment has the Homebrew paths first, so
+            # BridgeHub can spawn codex/claude from a background process
+            process = await limiter.spawn(
+                agent_type,
+                *command,
+                stdin=asyncio.subprocess.PIPE if via_stdin else asyncio.subprocess.DEVNULL,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                env=env
+                env=launcher.env,
+                **NEW_PROCESS_GROUP
             )
             spawn_time = time.time()
             spawn_duration_ms = (spawn_time - start_time) * 1000
             logger.info(f"⏱️  BridgeHub process spawned in {spawn_duration_ms:.0f}ms")
+            meter = UsageMeter(process)
 
-            # Read stdout line by line
-            if process.stdout:
-                async for line in process.stdout:
-                    line_str = line.decode('utf-8').strip()
-
-                    # Mark first output
-                    if first_output_time is None:
-                        first_output_time = time.time()
-                        first_output_ms = (first_output_time - start_time) * 1000
-                        logger.info(f"⏱️  First output from BridgeHub in {first_output_ms:.0f}ms")
-
-                    # Skip empty lines
-                    if not line_str:
-                        continue
-
-                    logger.debug(f"   BridgeHub output: {line_str[:80]}...")
-
-                    # Parse JARVIS_PAYLOAD response
-                    if line_str.startswith("JARVIS_PAYLOAD="):
-                        payload_buffer = line_str.replace("JARVIS_PAYLOAD=", "")
-
-                        try:
-                            payload = json.loads(payload_buffer)
+            # Drain stderr concurrently: a CLI that fills the pipe while we
+            # are still reading stdout would otherwise block forever
+            stderr = get_stderr_log().capture(process, "one-shot", agent_type, session_id)
 
-                            if payload.get("ok"):
-                                # Extract answer from data.output field
-                                data = payload.get("data", {})
-                                answer = data.get("output", "")
+            # Stream the request in while we read the answer
+            if via_stdin:
+                request_writer = asyncio.create_task(write_request(process.stdin, body))
 
-                                # Fallback to summary if output is empty
-                                if not answer:
-                                    answer = payload.get("summary", "No response")
-
-                                logger.info(f"✅ BridgeHub call successful")
-                                logger.debug(f"   Answer length: {len(answer)} chars")
+            # Read stdout records (framed or legacy lines)
+            if process.stdout:
+                reader = FrameReader(process.stdout)
+                events = stream.events(reader)
+
+                async with aclosing(events):
+                    async for event in events:
+                        # Mark first output
+                        if first_output_time is None:
+                            first_output_time = time.time()
+                            first_output_ms = (first_output_time - start_time) * 1000
+                            logger.info(f"⏱️  First output from BridgeHub in {first_output_ms:.0f}ms")
+
+                        if isinstance(event, FinalEvent):
+                            logger.info(f"✅ BridgeHub call successful")
+                            logger.debug(f"   Answer length: {len(event.output)} chars")
+
+                        for chunk in stream.chunks(event):
+                            # Mark first chunk time
+                            if first_chunk_time is None and not isinstance(event, ErrorEvent):
+                                first_chunk_time = time.time()
+                                first_chunk_ms = (first_chunk_time - start_time) * 1000
+                                logger.info(f"⏱️  First chunk yielded in {first_chunk_ms:.0f}ms")
+
+                            answered = True
+                            yield chunk
 
-                                # Yield answer in chunks for streaming
-                                chunk_size = 100
-                                for i in range(0, len(answer), chunk_size):
-                                    chunk = answer[i:i+chunk_size]
+            # Wait for process to complete
+            return_code = await process.wait()
+            await stderr.finish()
 
-                                    # Mark first chunk time
-                                    if first_chunk_time is None:
-                                        first_chunk_time = time.time()
-                                        first_chunk_ms = (first_chunk_time - start_time) * 1000
-                                        logger.info(f"⏱️  First chunk yielded in {first_chunk_ms:.0f}ms")
+            if not stream.complete and return_code != 0:
+                breach = limiter.check_exit(process)
+                if breach:
+                    breach.details["stderr"] = stderr.tail(5)
+                    raise breach
 
-                                    yield chunk
+                if via_stdin and not answered and stdin_request_rejected(return_code, stderr.tail()):
+                    raise StdinRequestRejected()
 
-                            else:
-                                # Error response
-                                reason = payload.get("reason", "Unknown error")
-                                details = payload.get("details", "")
+                # Process failed
+                stderr_tail = format_stderr(stderr.tail())
 
-                                error_msg = f"BridgeHub error: {reason}"
-                                if details:
-                                    error_msg += f" - {details}"
+                logger.error(f"❌ BridgeHub process failed (exit code {return_code})")
+                if stderr_tail:
+                    logger.error(f"   stderr: {stderr_tail}")
+                raise BridgeHubFailure(
+                    f"BridgeHub process failed (code {return_code})" + (f": {stderr_tail}" if stderr_tail else ""),
+                    details={"exit_code": return_code, "stderr": stderr.tail(5)}
+                )
+
+            if stream.complete:
+                breaker.record_success()
+
+        except StdinRequestRejected:
+            # An older BridgeHub: a missing feature, not a failure
+            launcher.reject_stdin_requests()
+            retry_with_argv = True
+
+        except BridgeHubFailure as e:
+            breaker.record_failure(e)
+            raise
+
+        except ExecutionError:
+            raise  # BridgeHub ran and reported the failure
+
+        except FileNotFoundError as e:
+            launcher.invalidate()
+            error_msg = "Node.js not found. Is Node.js installed?"
+            logger.error(error_msg)
+            failure = BridgeHubFailure(error_msg, code="spawn_failed", details=launcher.get_stats())
+            breaker.record_failure(failure)
+            raise failure from e
 
-                                logger.error(error_msg)
-                                yield f"Error: {reason}"
+        except ProtocolError as e:
+            logger.error(f"❌ BridgeHub sent a malformed frame: {e}")
+            failure = BridgeHubFailure(str(e), code="protocol_error")
+            breaker.record_failure(failure)
+            raise failure from e
 
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Failed to parse BridgeHub response: {e}")
-                            logger.error(f"   Payload length: {len(payload_buffer)} chars")
-                            logger.error(f"   First 200 chars: {payload_buffer[:200]}")
-                            logger.error(f"   Last 200 chars: {payload_buffer[-200:]}")
-                            logger.error(f"   Chars around error position: {payload_buffer[37300:37400]}")
-                            yield "Error: Invalid response from BridgeHub"
+        except Exception as e:
+            logger.error(f"❌ BridgeHub execution failed: {e}", exc_info=True)
+            raise ExecutionError(str(e)) from e
 
-                    else:
-                        # Other output (logs, debug info)
-                        logger.debug(f"   [BridgeHub] {line_str}")
+        finally:
+            if trial:
+                breaker.end_trial()
 
-            # Wait for process to complete
-            return_code = await process.wait()
+            if request_writer and not request_writer.done():
+                request_writer.cancel()
 
-            if return_code != 0:
-                # Process failed
-                stderr = await process.stderr.read() if process.stderr else b""
-                stderr_str = stderr.decode('utf-8').strip()
+            # Still running only if we were cancelled or failed mid-stream:
+            # take down BridgeHub and the CLI it spawned
+            if process and await kill_process_group(process):
+                logger.info("🛑 Killed BridgeHub process group")
 
-                logger.error(f"❌ BridgeHub process failed (exit code {return_code})")
-                if stderr_str:
-                    logger.error(f"   stderr: {stderr_str}")
+            if process:
+                limiter.release(process)
 
-                yield f"Error: BridgeHub process failed (code {return_code})"
+            if meter:
+                usage = meter.stop(request_bytes, reader.bytes_read if reader else 0)
+                get_usage_ledger().record(session_id, agent_type, usage)
+                if trace:
+                    trace.mark("resource_usage", usage.to_dict())
 
-        except FileNotFoundError:
-            error_msg = "Node.js not found. Is Node.js installed?"
-            logger.error(error_msg)
-            yield f"Error: {error_msg}"
+            if stderr and stderr.total_lines and trace:
+                trace.mark("stderr", {"lines": stderr.tail(20), "count": stderr.total_lines})
 
-        except Exception as e:
-            logger.error(f"❌ BridgeHub execution failed: {e}", exc_info=True)
-            yield f"Error: {str(e)}"
+        if retry_with_argv:
+            chunks = BridgeHubClient._run_bridgehub(body, session_id, agent_type, trace)
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    yield chunk
 
     @staticmethod
     async def health_check() -> Dict:
@@ -317,18 +434,24 @@ class BridgeHubClient:
             Health status dictionary
         """
 
-        # Check if BridgeHub file exists
-        bridgehub_exists = Path(BridgeHubClient.BRIDGEHUB_PATH).exists()
+        # Look again: this is where a fixed install gets noticed
+        launcher = get_launcher(BridgeHubClient.NODE_PATH, BridgeHubClient.BRIDGEHUB_PATH)
+        launcher.resolve()
+        bridgehub_exists = launcher.script_exists
 
-        # Check if Node.js is available (use explicit path)
+        # Check if Node.js is available (the resolved path spawns use)
+        limiter = get_process_limiter()
         try:
-            process = await asyncio.create_subprocess_exec(
-                BridgeHubClient.NODE_PATH,
+            process = await limiter.spawn(
+                "health",
+                launcher.node or launcher.node_path,
                 "--version",
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                env=launcher.env
             )
             stdout, _ = await process.communicate()
+            limiter.release(process)
             node_version = stdout.decode('utf-8').strip() if stdout else None
             node_available = process.returncode == 0
         except FileNotFoundError:
@@ -337,13 +460,30 @@ class BridgeHubClient:
 
         return {
             "bridgehub_exists": bridgehub_exists,
-            "bridgehub_path": str(BridgeHubClient.BRIDGEHUB_PATH),
+            "bridgehub_path": launcher.script,
+            "node_path": launcher.node,
             "node_available": node_available,
             "node_version": node_version,
-            "ready": bridgehub_exists and node_available
+            "ready": bridgehub_exists and node_available,
+            "circuit": get_breaker().get_stats()
         }
 
 
+# Circuit breaker for the client's BridgeHub spawns
+breaker: Optional[CircuitBreaker] = None
+
+
+def get_breaker() -> CircuitBreaker:
+    """Get or create the client's circuit breaker (probes through the shared launcher)"""
+    global breaker
+
+    if breaker is None:
+        launcher = get_launcher(BridgeHubClient.NODE_PATH, BridgeHubClient.BRIDGEHUB_PATH)
+        breaker = CircuitBreaker(launcher.probe)
+
+    return breaker
+
+
 async def main():
     """Test BridgeHub client"""
     logging.basicConfig(level=logging.DEBUG)
@@ -371,13 +511,16 @@ async def main():
     print("\nStreaming response:")
     print("-" * 60)
 
-    async for chunk in BridgeHubClient.call_jarvis(
-        message="What is BuilderOS?",
-        session_id="test-session-123",
-        conversation_history=conversation_history,
-        system_context="You are Jarvis, Ty's assistant."
-    ):
-        print(chunk, end='', flush=True)
+    try:
+        async for chunk in BridgeHubClient.call_jarvis(
+            message="What is BuilderOS?",
+            session_id="test-session-123",
+            conversation_history=conversation_history,
+            system_context="You are Jarvis, Ty's assistant."
+        ):
+            print(chunk, end='', flush=True)
+    except ExecutionError as e:
+        print(f"\n❌ {e.code}: {e}")
 
     print()
     print("-" * 60)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Resident BridgeHub Daemon Client for BuilderOS Mobile
+
+Every one-shot BridgeHub execution pays a Node.js start-up (100-300 ms) before
+the CLI is even launched. A resident daemon (`bridgehub.js --daemon --socket
+<path>`) keeps Node running and accepts requests over a Unix domain socket
+instead (see docs/BRIDGEHUB_WORKER_PROTOCOL.md, "Daemon mode").
+
+DaemonPool keeps a few open connections and multiplexes concurrent requests
+over them, tagging each request and its response frames with an id. When no
+daemon is listening, requests raise DaemonUnavailable before producing any
+output, so callers fall back to spawning BridgeHub; connecting is then not
+retried for a few seconds, which keeps the fallback cheap.
+
+The same protocol runs over TCP for worker nodes on other machines (see
+worker_nodes.py): `tls://host:port` with TLS, or plain `tcp://host:port`.
+Those connections authenticate with a shared token before the greeting. TLS
+verifies the node's certificate against the system CAs, or against
+BRIDGEHUB_NODE_CA (a CA bundle file) for nodes with private certificates.
+
+api/bridgehub_standin.py implements the daemon side for tests and benchmarks.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import ssl
+import time
+from contextlib import suppress
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from bridgehub_events import LogEvent
+from bridgehub_protocol import FrameReader, KIND_LOG, KIND_PAYLOAD, ProtocolError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.environ.get(
+    "BRIDGEHUB_SOCKET", "/Users/Ty/BuilderOS/tools/bridgehub/bridgehub.sock"
+)
+
+# Daemon protocol markers (must match bridgehub.js --daemon)
+DAEMON_READY_PREFIX = b"JARVIS_READY="
+DAEMON_REQUEST_PREFIX = "JARVIS_REQUEST="
+DAEMON_CANCEL_PREFIX = "JARVIS_CANCEL="
+DAEMON_AUTH_PREFIX = "JARVIS_AUTH="
+
+TCP_SCHEME = "tcp://"
+TLS_SCHEME = "tls://"
+NODE_CA_ENV = "BRIDGEHUB_NODE_CA"
+
+MAX_CONNECTIONS = 4
+MAX_STREAMS_PER_CONNECTION = 8  # Open another connection beyond this
+CONNECT_TIMEOUT = 2.0
+RETRY_INTERVAL = 5.0  # Seconds before reconnecting after a failed attempt
+
+
+_request_ids = itertools.count(1)
+
+
+class DaemonUnavailable(Exception):
+    """No daemon accepted the request; nothing was sent, so spawn instead"""
+
+
+def split_address(address: str) -> Tuple[str, str, int]:
+    """(scheme, host, port) of a tcp:// or tls:// address"""
+
+    scheme, _, rest = address.partition("://")
+    host, _, port = rest.rpartition(":")
+    return scheme + "://", host.strip("[]"), int(port)
+
+
+# TLS context for tls:// daemons, built on first use
+tls_context: Optional[ssl.SSLContext] = None
+
+
+def get_tls_context() -> ssl.SSLContext:
+    """Get or create the client TLS context (verifies against BRIDGEHUB_NODE_CA if set)"""
+    global tls_context
+
+    if tls_context is None:
+        tls_context = ssl.create_default_context(cafile=os.environ.get(NODE_CA_ENV) or None)
+
+    return tls_context
+
+
+async def open_daemon_connection(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to a daemon at a Unix socket path or a tcp:// or tls://host:port address"""
+
+    if address.startswith(TCP_SCHEME):
+        _, host, port = split_address(address)
+        return await asyncio.open_connection(host, port, limit=1024 * 1024)
+
+    if address.startswith(TLS_SCHEME):
+        _, host, port = split_address(address)
+        return await asyncio.open_connection(host, port, ssl=get_tls_context(), limit=1024 * 1024)
+
+    return await asyncio.open_unix_connection(address, limit=1024 * 1024)
+
+
+class DaemonConnection:
+    """
+    One socket to the daemon, carrying many requests at once
+
+    A reader task routes each tagged frame to the queue of its request.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.frames = FrameReader(reader)
+        self.streams: Dict[str, asyncio.Queue] = {}
+        self.closed = False
+        self.requests = 0
+        self.bytes_out = 0
+
+        self.reader_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def load(self) -> int:
+        return len(self.streams)
+
+    async def _read_loop(self):
+        """Dispatch frames until the daemon closes the connection"""
+
+        error: Optional[Exception] = None
+        try:
+            while True:
+                record = await self.frames.read_tagged()
+                if record is None:
+                    break
+
+                kind, body, request_id = record
+                queue = self.streams.get(request_id) if request_id else None
+                if queue:
+                    queue.put_nowait((kind, body))
+                elif kind == KIND_LOG:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"   [BridgeHub daemon] {LogEvent(body).text}")
+                else:
+                    logger.debug(f"Dropping {kind} frame for finished request {request_id}")
+
+        except asyncio.CancelledError:
+            raise
+        except (ProtocolError, ConnectionError, OSError) as e:
+            error = e
+            logger.warning(f"⚠️  BridgeHub daemon connection failed: {e}")
+
+        finally:
+            self.closed = True
+            for queue in self.streams.values():
+                queue.put_nowait(error or ConnectionError("BridgeHub daemon closed the connection"))
+
+    async def request(self, body: bytes) -> AsyncIterator[Tuple[str, bytes]]:
+        """
+        Send one encoded request and yield its (kind, body) records
+
+        Ends after the payload record. Closing the generator early tells the
+        daemon to cancel the request.
+        """
+
+        request_id = f"{next(_request_ids):x}"
+        queue: asyncio.Queue = asyncio.Queue()
+        self.streams[request_id] = queue
+        finished = False
+
+        try:
+            # Header and body are appended to the transport buffer back to
+            # back, so concurrent requests never interleave mid-frame
+            try:
+                self.writer.write(f"{DAEMON_REQUEST_PREFIX}{len(body)} {request_id}\n".encode('ascii'))
+                self.writer.write(body)
+                await self.writer.drain()
+            except (ConnectionError, OSError) as e:
+                # Stale connection (daemon restarted): the request never arrived
+                self.closed = True
+                raise DaemonUnavailable(f"BridgeHub daemon connection lost: {e}")
+            self.requests += 1
+
+            while True:
+                item = await queue.get()
+                if isinstance(item, Exception):
+                    raise item
+
+                kind, record_body = item
+                self.bytes_out += len(record_body)
+                if kind == KIND_PAYLOAD:
+                    finished = True
+                yield kind, record_body
+                if finished:
+                    return
+
+        finally:
+            del self.streams[request_id]
+            if not finished and not self.closed:
+                with suppress(ConnectionError, OSError):
+                    self.writer.write(f"{DAEMON_CANCEL_PREFIX}{request_id}\n".encode('ascii'))
+
+    async def close(self):
+        self.closed = True
+        self.reader_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self.reader_task
+        self.writer.close()
+        with suppress(ConnectionError, OSError):
+            await self.writer.wait_closed()
+
+
+class DaemonPool:
+    """
+    Pooled, multiplexed connections to the resident BridgeHub daemon
+
+    Usage:
+        async for kind, body in pool.execute(encoded_request):
+            ...
+    Raises DaemonUnavailable (before yielding) when there is no daemon.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        max_connections: int = MAX_CONNECTIONS,
+        max_streams: int = MAX_STREAMS_PER_CONNECTION,
+        token: Optional[str] = None
+    ):
+        self.socket_path = socket_path  # Unix socket path or tcp://host:port
+        self.token = token
+        self.max_connections = max_connections
+        self.max_streams = max_streams
+        self.connections: List[DaemonConnection] = []
+        self.connect_lock = asyncio.Lock()
+        self.retry_at = 0.0
+
+        self.requests = 0
+        self.fallbacks = 0
+        self.failures = 0
+
+    @property
+    def available(self) -> bool:
+        """Worth trying: connected, or not in the back-off after a failure"""
+        return bool(self.connections) or time.monotonic() >= self.retry_at
+
+    def _least_loaded(self) -> Tuple[Optional[DaemonConnection], bool]:
+        """(least-loaded live connection, whether it has room or no more may be opened)"""
+
+        self.connections = [conn for conn in self.connections if not conn.closed]
+        best = min(self.connections, key=lambda conn: conn.load, default=None)
+        usable = bool(best) and (best.load < self.max_streams or len(self.connections) >= self.max_connections)
+        return best, usable
+
+    async def _connection(self) -> DaemonConnection:
+        """Least-loaded live connection, opening another if all are busy"""
+
+        best, usable = self._least_loaded()
+        if usable:
+            return best
+
+        if time.monotonic() < self.retry_at:
+            if best:
+                return best
+            raise DaemonUnavailable(f"BridgeHub daemon unavailable (retrying in {self.retry_at - time.monotonic():.1f}s)")
+
+        async with self.connect_lock:
+            # Another request may have opened one while we waited
+            best, usable = self._least_loaded()
+            if usable:
+                return best
+
+            try:
+                connection = await self._connect()
+            except DaemonUnavailable:
+                if best:
+                    return best
+                raise
+
+            self.connections.append(connection)
+            return connection
+
+    async def _connect(self) -> DaemonConnection:
+        try:
+            reader, writer = await asyncio.wait_for(open_daemon_connection(self.socket_path), timeout=CONNECT_TIMEOUT)
+            if self.token:
+                writer.write(f"{DAEMON_AUTH_PREFIX}{self.token}\n".encode('utf-8'))
+            ready = await asyncio.wait_for(reader.readline(), timeout=CONNECT_TIMEOUT)
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            self.retry_at = time.monotonic() + RETRY_INTERVAL
+            raise DaemonUnavailable(f"Cannot reach BridgeHub daemon at {self.socket_path}: {e or 'timeout'}")
+
+        if not ready.startswith(DAEMON_READY_PREFIX):
+            writer.close()
+            self.retry_at = time.monotonic() + RETRY_INTERVAL
+            raise DaemonUnavailable(f"Unexpected BridgeHub daemon greeting: {ready[:80]!r}")
+
+        logger.info(f"🔌 Connected to BridgeHub daemon at {self.socket_path} ({len(self.connections) + 1}/{self.max_connections})")
+        return DaemonConnection(reader, writer)
+
+    async def execute(self, body: bytes) -> AsyncIterator[Tuple[str, bytes]]:
+        """
+        Run one encoded request on the daemon
+
+        Yields:
+            (kind, body) records, ending with the payload
+
+        Raises:
+            DaemonUnavailable: no daemon; nothing was sent
+            ConnectionError: the connection dropped mid-request
+        """
+
+        try:
+            connection = await self._connection()
+        except DaemonUnavailable:
+            self.fallbacks += 1
+            raise
+
+        self.requests += 1
+        records = connection.request(body)
+        try:
+            async for record in records:
+                yield record
+        except DaemonUnavailable:
+            self.fallbacks += 1
+            raise
+        except (ConnectionError, OSError, ProtocolError):
+            self.failures += 1
+            raise
+        finally:
+            await records.aclose()
+
+    async def close(self):
+        """Close all connections"""
+        for connection in self.connections:
+            await connection.close()
+        self.connections.clear()
+
+    def get_stats(self) -> Dict:
+        """Get daemon connection statistics"""
+
+        live = [conn for conn in self.connections if not conn.closed]
+        return {
+            "socket_path": self.socket_path,
+            "connected": bool(live),
+            "connections": len(live),
+            "active_requests": sum(conn.load for conn in live),
+            "requests": self.requests,
+            "fallbacks": self.fallbacks,
+            "failures": self.failures
+        }
+
+
+# Global daemon pool shared by CLIProcessPool and BridgeHubClient
+daemon_pool: Optional[DaemonPool] = None
+
+
+def get_daemon_pool() -> DaemonPool:
+    """Get or create the global daemon pool"""
+    global daemon_pool
+
+    if daemon_pool is None:
+        daemon_pool = DaemonPool()
+
+    return daemon_pool
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+BridgeHub Response Events for BuilderOS Mobile
+
+FrameReader splits BridgeHub's stdout into (kind, body) records; this module
+says what they mean. ResponseParser turns one request's records into typed
+events, the same way for every caller (workers, daemon, worker nodes,
+one-shot spawns in the pool and in BridgeHubClient):
+
+- ProgressEvent: BridgeHub status (e.g. the CLI started), not answer text
+- PartialEvent: answer text streamed as the CLI produces it
+- FinalEvent: the final payload, with only the text not streamed yet
+- ErrorEvent: a failed or unreadable final payload
+- LogEvent: any other stdout line
+
+ResponseStream turns those events into what every caller surfaces: answer
+chunks to forward, and an ExecutionError for a failure (BridgeHubFailure when
+the payload is unreadable, so it counts against the circuit breaker).
+
+Record bodies are parsed as bytes; log lines stay bytes until something
+actually reads LogEvent.text, so debug output that is switched off costs no
+decoding.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from bridgehub_protocol import KIND_LOG, KIND_PARTIAL, KIND_PAYLOAD, KIND_PROGRESS, FrameReader
+from circuit_breaker import BridgeHubFailure
+from process_control import ExecutionError
+from resource_usage import ExecutionUsage
+
+logger = logging.getLogger(__name__)
+
+# BridgeHub's failure reason when the CLI cannot resume a native session
+RESUME_FAILED_REASON = "resume_failed"
+
+# ErrorEvent codes
+ERROR_BRIDGEHUB = "bridgehub_error"  # BridgeHub answered ok:false
+ERROR_INVALID_RESPONSE = "invalid_response"  # The final payload is not JSON
+ERROR_RESUME_FAILED = "resume_failed"  # Resume refused before any output; retry with history
+
+
+@dataclass
+class ProgressEvent:
+    data: Dict[str, Any]
+
+
+@dataclass
+class PartialEvent:
+    text: str
+
+
+@dataclass
+class FinalEvent:
+    text: str  # Answer text not already sent as partials (may be empty)
+    output: str  # The complete answer
+    cli_session_id: Optional[str] = None
+
+
+@dataclass
+class ErrorEvent:
+    code: str
+    reason: str
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class LogEvent:
+    line: bytes
+
+    @property
+    def text(self) -> str:
+        return self.line.decode('utf-8', 'replace').rstrip()
+
+
+Event = Union[ProgressEvent, PartialEvent, FinalEvent, ErrorEvent, LogEvent]
+
+
+class ResponseParser:
+    """
+    Turns one request's BridgeHub records into events
+
+    Partial text is kept so the final payload only contributes what was not
+    streamed yet, which is the whole answer for BridgeHub builds that do not
+    stream.
+
+    Usage:
+        parser = ResponseParser()
+        async for event in parser.events(FrameReader(process.stdout)):
+            ...
+    """
+
+    def __init__(self):
+        self.streamed: List[str] = []
+        self.complete = False  # The final payload arrived
+        self.cli_session_id: Optional[str] = None
+
+    def parse(self, kind: str, body: bytes) -> Optional[Event]:
+        """Interpret one record; None for records that mean nothing (e.g. empty partials)"""
+
+        if kind == KIND_PARTIAL:
+            try:
+                text = json.loads(body).get("text", "")
+            except (json.JSONDecodeError, AttributeError) as e:
+                logger.warning(f"⚠️  Skipping malformed partial output: {e}")
+                return None
+
+            if not text:
+                return None
+
+            self.streamed.append(text)
+            return PartialEvent(text)
+
+        if kind == KIND_PAYLOAD:
+            self.complete = True
+            return self._final(body)
+
+        if kind == KIND_PROGRESS:
+            try:
+                data = json.loads(body)
+            except json.JSONDecodeError:
+                return None
+            return ProgressEvent(data) if isinstance(data, dict) else None
+
+        if kind == KIND_LOG:
+            return LogEvent(body)
+
+        logger.debug(f"Ignoring unknown BridgeHub record kind: {kind}")
+        return None
+
+    def _final(self, body: bytes) -> Union[FinalEvent, ErrorEvent]:
+        """Turn the final payload into the text still owed, or an error"""
+
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError as e:
+            logger.error(
+                f"❌ Failed to parse BridgeHub response ({len(body)} bytes): {e}; "
+                f"starts {body[:200]!r}, ends {body[-200:]!r}"
+            )
+            return ErrorEvent(ERROR_INVALID_RESPONSE, "Invalid response from BridgeHub", {
+                "bytes": len(body),
+                "error": str(e)
+            })
+
+        if not payload.get("ok"):
+            reason = payload.get("reason", "Unknown error")
+
+            if reason == RESUME_FAILED_REASON and not self.streamed:
+                # Nothing reached the client yet, so the caller can retry
+                # silently with the full history
+                return ErrorEvent(ERROR_RESUME_FAILED, reason, {"reason": reason})
+
+            details = payload.get("details")
+            logger.error(f"❌ BridgeHub error: {reason}" + (f" - {details}" if details else ""))
+            return ErrorEvent(ERROR_BRIDGEHUB, reason, {"reason": reason, **({"details": details} if details else {})})
+
+        data = payload.get("data", {})
+        answer = data.get("output", "")
+        self.cli_session_id = data.get("cli_session_id") or None
+
+        if not self.streamed:
+            return FinalEvent(answer or payload.get("summary", "No response"), answer, self.cli_session_id)
+
+        streamed = "".join(self.streamed)
+        if answer.startswith(streamed):
+            return FinalEvent(answer[len(streamed):], answer, self.cli_session_id)
+
+        logger.warning("⚠️  Final output differs from streamed output; keeping streamed text")
+        return FinalEvent("", answer, self.cli_session_id)
+
+    async def events(self, reader: FrameReader) -> AsyncIterator[Event]:
+        """
+        Parse records from a reader until EOF
+
+        Yields:
+            Events in stdout order; reading goes on after the final payload
+            so trailing log lines are drained
+        """
+
+        while True:
+            record = await reader.read()
+            if record is None:
+                return
+
+            event = self.parse(*record)
+            if event is not None:
+                yield event
+
+
+class ResponseStream(ResponseParser):
+    """
+    One request's BridgeHub records as response chunks, plus what it used
+
+    Partial and final text is forwarded; an error event is raised as the
+    ExecutionError the server sends to the client. A resume refusal for a
+    request that resumed only sets resume_failed, so the turn can be retried
+    with history; for any other request it is an error like the rest.
+
+    Usage:
+        stream = ResponseStream()
+        for chunk in stream.feed(kind, body):
+            yield chunk
+    """
+
+    def __init__(self, resumed: bool = False):
+        super().__init__()
+        self.resumed = resumed  # The request asked BridgeHub to resume a CLI session
+        self.resume_failed = False
+        self.usage: Optional[ExecutionUsage] = None
+        self.stderr: List[str] = []  # Stderr lines written during the request
+
+    def feed(self, kind: str, body: bytes) -> List[str]:
+        """Handle one stdout record, returning the chunks to forward"""
+        return self.chunks(self.parse(kind, body))
+
+    def chunks(self, event: Optional[Event]) -> List[str]:
+        """
+        Text to forward for one event
+
+        Raises:
+            BridgeHubFailure: the final payload was unreadable
+            ExecutionError: BridgeHub reported a failure
+        """
+
+        if isinstance(event, (PartialEvent, FinalEvent)):
+            return [event.text] if event.text else []
+
+        if isinstance(event, ErrorEvent):
+            if event.code == ERROR_RESUME_FAILED and self.resumed:
+                self.resume_failed = True
+                return []
+            if event.code == ERROR_INVALID_RESPONSE:
+                raise BridgeHubFailure(event.reason, code=event.code, details=event.details)
+            raise ExecutionError(event.reason, code=event.code, details=event.details)
+
+        if isinstance(event, ProgressEvent):
+            logger.debug(f"   [BridgeHub] progress: {event.data}")
+        elif isinstance(event, LogEvent) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"   [BridgeHub] {event.text}")
+
+        return []
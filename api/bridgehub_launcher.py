@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+BridgeHub Launcher for BuilderOS Mobile
+
+Everything about starting `node bridgehub.js` that does not change between
+spawns is worked out once per launcher instead of on every request:
+
+- the environment: ours, with the Homebrew directories put first on PATH
+  so a launchd-started server finds node, claude and codex
+- node, resolved to an absolute path on that PATH (a bare name makes every
+  exec walk PATH, and hardcoding /opt/homebrew/bin/node breaks elsewhere)
+- the script path and whether it exists
+
+invalidate() (after a failed spawn) and probe() (from the circuit breaker)
+resolve again, so installing node or BridgeHub is picked up without a
+restart.
+
+Whether the script takes one-shot requests on stdin (`--request -`) is also
+remembered here: after a rejection, request_args() passes requests as the
+argument again, and tries stdin once more after STDIN_RETRY_INTERVAL.
+
+CLIProcessPool and BridgeHubClient share launchers via get_launcher().
+"""
+
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from bridgehub_protocol import ARGV_REQUEST_FLAG, MAX_ARGV_REQUEST_BYTES, STDIN_REQUEST_ARGS
+from circuit_breaker import probe_bridgehub
+from process_control import ExecutionError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BRIDGEHUB_PATH = "/Users/Ty/BuilderOS/tools/bridgehub/dist/bridgehub.js"
+DEFAULT_NODE = "node"
+
+# Put first on the children's PATH (Homebrew on Apple silicon and Intel)
+HOMEBREW_PATHS = ("/opt/homebrew/bin", "/opt/homebrew/sbin", "/usr/local/bin")
+
+STDIN_RETRY_INTERVAL = 300.0  # Seconds before trying `--request -` again after it was rejected
+
+_spawn_env: Optional[Dict[str, str]] = None
+
+
+def spawn_environment() -> Dict[str, str]:
+    """Environment for BridgeHub children, built on first use"""
+    global _spawn_env
+
+    if _spawn_env is None:
+        env = os.environ.copy()
+        rest = [entry for entry in env.get("PATH", "").split(os.pathsep) if entry and entry not in HOMEBREW_PATHS]
+        env["PATH"] = os.pathsep.join([*HOMEBREW_PATHS, *rest])
+        _spawn_env = env
+
+    return _spawn_env
+
+
+class BridgeHubLauncher:
+    """
+    Resolved command line and environment for starting BridgeHub
+
+    Usage:
+        process = await create_subprocess_exec(*launcher.command("--serve"), env=launcher.env, ...)
+    """
+
+    def __init__(self, node_path: str = DEFAULT_NODE, bridgehub_path: str = DEFAULT_BRIDGEHUB_PATH):
+        self.node_path = node_path
+        self.bridgehub_path = bridgehub_path
+        self.env = spawn_environment()
+
+        self.node: Optional[str] = None
+        self.script = bridgehub_path
+        self.script_exists = False
+        self.resolved = False
+        self.resolutions = 0
+
+        # Cleared when the script rejects `--request -`
+        self.stdin_requests = True
+        self.stdin_retry_at = 0.0
+
+    def resolve(self):
+        """Look up node on the spawn PATH and check the script"""
+
+        self.node = shutil.which(self.node_path, path=self.env["PATH"])
+        self.script = str(Path(self.bridgehub_path).expanduser().absolute())
+        self.script_exists = Path(self.script).is_file()
+        self.resolved = True
+        self.resolutions += 1
+
+        if not self.node:
+            logger.warning(f"⚠️  {self.node_path} not found on the spawn PATH")
+        if not self.script_exists:
+            logger.warning(f"⚠️  BridgeHub not found at {self.script}")
+
+    def invalidate(self):
+        """Resolve again before the next spawn (e.g. after one failed)"""
+        self.resolved = False
+
+    @property
+    def ready(self) -> bool:
+        if not self.resolved:
+            self.resolve()
+        return bool(self.node) and self.script_exists
+
+    def command(self, *args: str) -> Tuple[str, ...]:
+        """node, the script and args; an unresolved node is left to fail at exec"""
+
+        if not self.resolved:
+            self.resolve()
+        return (self.node or self.node_path, self.script, *args)
+
+    def request_args(self, body: bytes) -> Tuple[Tuple[str, ...], bool]:
+        """
+        One-shot arguments for a request, and whether its body goes to stdin
+
+        Raises:
+            ExecutionError: the script needs the request as an argument and
+                it is over MAX_ARGV_REQUEST_BYTES
+        """
+
+        if not self.stdin_requests and time.monotonic() >= self.stdin_retry_at:
+            self.stdin_requests = True  # BridgeHub may have been upgraded
+
+        if self.stdin_requests:
+            return STDIN_REQUEST_ARGS, True
+
+        if len(body) > MAX_ARGV_REQUEST_BYTES:
+            raise ExecutionError(
+                f"Request is {len(body)} bytes; this BridgeHub takes requests as an argument, "
+                f"which is capped at {MAX_ARGV_REQUEST_BYTES} bytes",
+                code="request_too_large",
+                details={"bytes": len(body), "max_bytes": MAX_ARGV_REQUEST_BYTES}
+            )
+
+        return (ARGV_REQUEST_FLAG, body.decode('utf-8')), False
+
+    def reject_stdin_requests(self):
+        """Remember that the script rejected `--request -`"""
+
+        logger.warning(
+            f"⚠️  BridgeHub rejected '--request -'; passing requests as an argument "
+            f"for the next {STDIN_RETRY_INTERVAL:.0f}s"
+        )
+        self.stdin_requests = False
+        self.stdin_retry_at = time.monotonic() + STDIN_RETRY_INTERVAL
+
+    async def probe(self) -> bool:
+        """Resolve again and check that the script exists and node starts"""
+
+        self.resolve()
+        return bool(self.node) and await probe_bridgehub(self.node, self.script)
+
+    def get_stats(self) -> Dict:
+        return {
+            "node": self.node or self.node_path,
+            "bridgehub_path": self.script,
+            "ready": self.ready,
+            "resolutions": self.resolutions,
+            "stdin_requests": self.stdin_requests
+        }
+
+
+# Launchers by (node, script), shared by CLIProcessPool and BridgeHubClient
+launchers: Dict[Tuple[str, str], BridgeHubLauncher] = {}
+
+
+def get_launcher(node_path: str = DEFAULT_NODE, bridgehub_path: str = DEFAULT_BRIDGEHUB_PATH) -> BridgeHubLauncher:
+    """Get or create the launcher for a node / bridgehub.js pair"""
+
+    key = (node_path, str(bridgehub_path))
+    launcher = launchers.get(key)
+    if launcher is None:
+        launcher = launchers[key] = BridgeHubLauncher(node_path, str(bridgehub_path))
+
+    return launcher
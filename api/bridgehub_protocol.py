@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+BridgeHub stdio protocol for BuilderOS Mobile
+
+Requests go to BridgeHub on stdin (`bridgehub.js --request -`) instead of as
+a command-line argument, so long histories never hit ARG_MAX or get copied
+into the process table. A BridgeHub that only takes `--request <json>`
+rejects that (stdin_request_rejected()); callers then pass requests up to
+MAX_ARGV_REQUEST_BYTES as the argument again.
+
+BridgeHub writes a mix of log lines and protocol records to stdout. Records
+come in two shapes:
+
+- Length-prefixed frames (preferred, safe for multi-MB answers):
+      JARVIS_FRAME=<kind> <byte length>\\n<body, exactly byte-length bytes>
+- Legacy single lines (older BridgeHub builds):
+      JARVIS_PARTIAL=<json>\\n
+      JARVIS_PAYLOAD=<json>\\n
+
+A resident BridgeHub daemon multiplexes many requests over one socket, so its
+frames carry the request id as a third header field:
+      JARVIS_FRAME=<kind> <byte length> <request id>\\n<body>
+
+Frame bodies are read with a single readexactly() call and handed to
+json.loads() as bytes, so a large answer is held once rather than as line,
+decoded, stripped and sliced copies. Legacy lines are read without the
+asyncio StreamReader line limit, so a long JARVIS_PAYLOAD line no longer
+raises or gets cut at 64 KB. Lines keep their line ending (JSON allows the
+trailing whitespace), so a legacy record costs one slice and a log line
+none.
+
+What the records mean is bridgehub_events.ResponseParser's job.
+"""
+
+import asyncio
+import logging
+import re
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FRAME_PREFIX = b"JARVIS_FRAME="
+PARTIAL_PREFIX = b"JARVIS_PARTIAL="
+PAYLOAD_PREFIX = b"JARVIS_PAYLOAD="
+
+# Record kinds
+KIND_PARTIAL = "partial"
+KIND_PAYLOAD = "payload"
+KIND_PROGRESS = "progress"  # Frames only: BridgeHub status, e.g. {"stage": "cli_started"}
+KIND_LOG = "log"
+
+# Refuse absurd frame headers instead of trying to allocate them
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+
+# One-shot spawn arguments: read the request from stdin
+STDIN_REQUEST_ARGS = ("--request", "-")
+ARGV_REQUEST_FLAG = "--request"  # Older form: the request JSON is the next argument
+
+# How a BridgeHub without `--request -` rejects it: exit status 64 (EX_USAGE),
+# or a JSON parse error about "-" (or an unknown option message) on stderr
+STDIN_REQUEST_UNSUPPORTED_EXIT = 64
+STDIN_REQUEST_UNSUPPORTED_PATTERN = re.compile(
+    r"JSON|unexpected token|(unknown|unrecognized|unsupported|invalid)\b.*--request",
+    re.IGNORECASE
+)
+
+# Largest request passed as an argument; Linux caps one argument at 128 KB
+# (MAX_ARG_STRLEN, including the terminating NUL)
+MAX_ARGV_REQUEST_BYTES = 128 * 1024 - 1
+
+# Largest single write into a child's stdin before waiting for it to drain
+REQUEST_WRITE_CHUNK = 64 * 1024
+
+
+async def write_request(stdin: asyncio.StreamWriter, body: bytes) -> int:
+    """
+    Stream an encoded request into a one-shot BridgeHub's stdin and close it
+
+    Runs alongside the stdout reader, so a child that starts answering
+    before it has read everything cannot deadlock us.
+
+    Returns:
+        Number of bytes written
+    """
+
+    written = 0
+    view = memoryview(body)
+
+    try:
+        while written < len(body):
+            chunk = view[written:written + REQUEST_WRITE_CHUNK]
+            stdin.write(chunk)
+            written += len(chunk)
+            await stdin.drain()
+
+    except (BrokenPipeError, ConnectionResetError):
+        # Child exited early; its stdout/exit code explains why
+        logger.warning(f"⚠️  BridgeHub closed stdin after {written} request bytes")
+
+    finally:
+        stdin.close()
+
+    return written
+
+
+def stdin_request_rejected(code: Optional[int], stderr: List[str]) -> bool:
+    """
+    Whether a one-shot that exited without answering rejected `--request -`
+
+    Args:
+        code: The child's exit status
+        stderr: Its stderr lines
+    """
+
+    if code == STDIN_REQUEST_UNSUPPORTED_EXIT:
+        return True
+    return bool(code) and any(STDIN_REQUEST_UNSUPPORTED_PATTERN.search(line) for line in stderr)
+
+
+class StdinRequestRejected(Exception):
+    """A one-shot BridgeHub rejected `--request -`; retry with the request as an argument"""
+
+
+class ProtocolError(Exception):
+    """BridgeHub wrote something that violates the framing protocol"""
+
+
+class FrameReader:
+    """
+    Reads BridgeHub stdout as a sequence of (kind, body) records
+
+    kind is "partial", "payload", "progress" or "log"; body is the raw bytes
+    (JSON, or the log line with its line ending). Returns None at EOF.
+    read_tagged() also returns the request id of daemon frames.
+    """
+
+    def __init__(self, stream: asyncio.StreamReader):
+        self.stream = stream
+        self.bytes_read = 0
+
+    async def read(self) -> Optional[Tuple[str, bytes]]:
+        """Read the next record, or None when the stream is exhausted"""
+
+        record = await self.read_tagged()
+        return record[:2] if record else None
+
+    async def read_tagged(self) -> Optional[Tuple[str, bytes, Optional[str]]]:
+        """Read the next (kind, body, request id) record; the id is None when untagged"""
+
+        while True:
+            line = await self._read_line()
+            if line is None:
+                return None
+
+            if line.startswith(FRAME_PREFIX):
+                return await self._read_frame(line)
+
+            if line.startswith(PAYLOAD_PREFIX):
+                return KIND_PAYLOAD, line[len(PAYLOAD_PREFIX):], None
+
+            if line.startswith(PARTIAL_PREFIX):
+                return KIND_PARTIAL, line[len(PARTIAL_PREFIX):], None
+
+            if not line.isspace():
+                return KIND_LOG, line, None
+
+    async def _read_frame(self, header: bytes) -> Tuple[str, bytes, Optional[str]]:
+        """Read the body announced by a JARVIS_FRAME header line"""
+
+        try:
+            kind, length_text, *tag = header[len(FRAME_PREFIX):].decode('ascii').split()
+            length = int(length_text)
+            if len(tag) > 1:
+                raise ValueError
+        except (UnicodeDecodeError, ValueError):
+            raise ProtocolError(f"Malformed frame header: {header[:80]!r}")
+
+        if length < 0 or length > MAX_FRAME_BYTES:
+            raise ProtocolError(f"Frame length out of range: {length}")
+
+        try:
+            body = await self.stream.readexactly(length)
+        except asyncio.IncompleteReadError as e:
+            raise ProtocolError(
+                f"Stream ended {length - len(e.partial)} bytes into a {length}-byte {kind} frame"
+            )
+
+        self.bytes_read += length
+        return kind, body, tag[0] if tag else None
+
+    async def _read_line(self) -> Optional[bytes]:
+        """Read one line of any length, with its line ending (None at EOF)"""
+
+        parts = []
+
+        while True:
+            try:
+                part = await self.stream.readuntil(b"\n")
+            except asyncio.LimitOverrunError as e:
+                # Longer than the reader's buffer limit: take what is buffered
+                # and keep going instead of failing the whole response
+                part = await self.stream.readexactly(e.consumed)
+                parts.append(part)
+                self.bytes_read += len(part)
+                continue
+            except asyncio.IncompleteReadError as e:
+                part = e.partial  # EOF, possibly after an unterminated line
+                if not part and not parts:
+                    return None
+
+            parts.append(part)
+            self.bytes_read += len(part)
+            break
+
+        return parts[0] if len(parts) == 1 else b"".join(parts)
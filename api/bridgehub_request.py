@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+BridgeHub Request Builder for BuilderOS Mobile
+
+Single place that turns a chat turn into a BridgeHub request and encodes it,
+shared by CLIProcessPool and BridgeHubClient.
+
+Encoding is compact (no indentation, no spaces after separators) and uses
+orjson when it is installed, falling back to the standard library. Context
+items are still JSON strings inside the request, as BridgeHub expects, but
+they are encoded compactly once instead of pretty-printed.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+BRIDGEHUB_VERSION = "bridgehub/1.0"
+DEFAULT_CAPSULE = "/Users/Ty/BuilderOS"
+
+# Name of the encoder in use, reported in traces
+ENCODER = "orjson" if orjson else "json"
+
+
+def dumps_compact(value: Any) -> str:
+    """Encode a value as compact JSON text"""
+
+    if orjson:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_request(request: Dict[str, Any]) -> bytes:
+    """Encode a request as compact UTF-8 JSON bytes, ready for a pipe"""
+
+    if orjson:
+        return orjson.dumps(request)
+    return json.dumps(request, separators=(",", ":"), ensure_ascii=False).encode('utf-8')
+
+
+def build_request(
+    session_id: str,
+    agent_type: str,
+    message: str,
+    conversation_history: Optional[List[Dict[str, Any]]] = None,
+    system_context: str = "",
+    attachments: Optional[List[Dict[str, Any]]] = None,
+    resume_id: Optional[str] = None,
+    intent: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    history_title: str = "Conversation History"
+) -> Dict[str, Any]:
+    """
+    Build the BridgeHub request for a single turn
+
+    With resume_id the CLI already holds the conversation (and CLAUDE.md)
+    in its own session, so only the new message and its attachments are
+    sent: request size stays constant however long the chat gets.
+
+    Args:
+        session_id: Session identifier
+        agent_type: "claude" or "codex"
+        message: User message
+        conversation_history: Previous messages
+        system_context: CLAUDE.md content
+        attachments: Attachment metadata for this turn
+        resume_id: CLI-native session id to resume
+        intent: BridgeHub intent (defaults to mobile_<agent>_query)
+        metadata: Extra request metadata
+        history_title: Title of the history context item
+
+    Returns:
+        BridgeHub request dictionary
+    """
+
+    if resume_id:
+        system_context = ""
+        conversation_history = []
+
+    context_items = []
+    if system_context:
+        context_items.append({
+            "title": "System Context (CLAUDE.md)",
+            "role": "system",
+            "content": system_context
+        })
+
+    if conversation_history:
+        context_items.append({
+            "title": history_title,
+            "role": "note",
+            "content": dumps_compact(conversation_history)
+        })
+
+    if attachments:
+        context_items.append({
+            "title": "Attachments",
+            "role": "note",
+            "content": dumps_compact(attachments)
+        })
+
+    request_metadata: Dict[str, Any] = {
+        "source": "builderos_mobile",
+        "stream": True,  # Ask BridgeHub for partial output records
+        "framed": True  # Ask for length-prefixed JARVIS_FRAME records
+    }
+    request_metadata.update(metadata or {})
+
+    if attachments:
+        request_metadata["attachments"] = attachments
+
+    if resume_id:
+        request_metadata["resume"] = resume_id
+
+    return {
+        "version": BRIDGEHUB_VERSION,
+        "action": "freeform",
+        "capsule": DEFAULT_CAPSULE,
+        "session": session_id,
+        "payload": {
+            "message": message,
+            "intent": intent or f"mobile_{agent_type}_query",
+            # Claude sessions run Claude Code, Codex sessions run Codex CLI
+            "direction": "codex_to_claude" if agent_type == "claude" else "claude_to_codex",
+            "context": context_items,
+            "metadata": request_metadata
+        }
+    }
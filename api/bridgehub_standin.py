@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+BridgeHub Stand-in for BuilderOS Mobile
+
+A small Python implementation of the BridgeHub side of every protocol the API
+speaks (see docs/BRIDGEHUB_WORKER_PROTOCOL.md), for tests and benchmarks on
+machines without Node.js, BridgeHub or the CLIs:
+
+    bridgehub_standin.py --request -                  one-shot, request on stdin
+    bridgehub_standin.py --serve --agent claude       warm worker
+    bridgehub_standin.py --daemon --socket PATH       resident daemon
+    bridgehub_standin.py --daemon --socket tcp://HOST:PORT --token T
+                                                      worker node
+    bridgehub_standin.py --daemon --socket tls://HOST:PORT --tls-cert C --tls-key K
+                                                      worker node over TLS
+    bridgehub_standin.py --nodes 3 --base-port 7300   local cluster of nodes
+
+Instead of running a CLI it echoes the request's message back, optionally
+after a simulated CLI latency and as streamed partial output. Answers name
+the process that produced them and how many turns it has seen for the
+session, which shows where sessions landed and whether their state stayed
+warm. Messages can carry directives for tests:
+
+    sleep:<ms> <message>    answer <message> after an extra <ms> of latency
+    fail: <reason>          stream as usual, then answer {"ok": false, ...}
+
+Answers carry a CLI session id ("cli-<session>"); a request resuming one
+that starts with "expired" is refused with resume_failed before any output,
+as BridgeHub does when the CLI cannot resume.
+A daemon prints "cancelled <id>" when JARVIS_CANCEL stops a running request.
+BRIDGEHUB_STANDIN_STARTUP_MS delays a worker's ready line, like a slow CLI
+start, BRIDGEHUB_STANDIN_STREAM_MS=<ms> streams partial output (as --stream
+does) with that pause after each partial, and BRIDGEHUB_STANDIN_ARGV_ONLY=1 makes --request take only inline
+JSON, like BridgeHub builds from before `--request -`.
+
+Usage:
+    python3 bridgehub_standin.py --daemon --socket /tmp/bridgehub.sock --latency 50 --stream
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import ssl
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+PROTOCOL_VERSION = 1
+
+TCP_SCHEME = "tcp://"
+TLS_SCHEME = "tls://"
+
+FAIL_PREFIX = "fail:"  # Messages answered with ok:false
+SLEEP_PREFIX = "sleep:"  # Messages answered after extra latency
+EXPIRED_PREFIX = "expired"  # CLI session ids that can no longer be resumed
+STARTUP_ENV = "BRIDGEHUB_STANDIN_STARTUP_MS"  # Worker startup delay
+ARGV_ONLY_ENV = "BRIDGEHUB_STANDIN_ARGV_ONLY"  # No `--request -`
+STREAM_ENV = "BRIDGEHUB_STANDIN_STREAM_MS"  # Stream partials, pausing after each
+
+
+def partial_pause() -> Optional[float]:
+    """Seconds to pause after each partial, if STREAM_ENV asks for streaming"""
+
+    value = os.environ.get(STREAM_ENV)
+    return float(value) / 1000 if value else None
+
+
+def extra_latency(request: Dict) -> float:
+    """Seconds a "sleep:<ms>" directive adds to a request"""
+
+    message = request.get("payload", {}).get("message", "")
+    if not message.startswith(SLEEP_PREFIX):
+        return 0.0
+    return float(message[len(SLEEP_PREFIX):].split(" ", 1)[0]) / 1000
+
+
+# Session → turns answered by this process (stands in for warm CLI state)
+session_turns: Counter = Counter()
+
+
+def answer(request: Dict, stream: bool) -> list:
+    """(kind, body) records BridgeHub would produce for a request"""
+
+    payload = request.get("payload", {})
+    message = payload.get("message", "")
+    if message.startswith(SLEEP_PREFIX):
+        message = message.partition(" ")[2]
+    output = f"echo: {message}"
+
+    session_id = request.get("session", "")
+    records = [("progress", json.dumps({"stage": "cli_started"}).encode('utf-8'))]
+
+    resume = payload.get("metadata", {}).get("resume", "")
+    if resume.startswith(EXPIRED_PREFIX):
+        records.append(("payload", json.dumps({"ok": False, "reason": "resume_failed"}).encode('utf-8')))
+        return records
+
+    session_turns[session_id] += 1
+    if stream:
+        words = output.split(" ")
+        for i, word in enumerate(words):
+            text = word if i == len(words) - 1 else word + " "
+            records.append(("partial", json.dumps({"text": text}).encode('utf-8')))
+
+    if message.startswith(FAIL_PREFIX):
+        reason = message[len(FAIL_PREFIX):].strip()
+        records.append(("payload", json.dumps({"ok": False, "reason": reason}).encode('utf-8')))
+        return records
+
+    records.append(("payload", json.dumps({
+        "ok": True,
+        "summary": "stand-in",
+        "data": {
+            "output": output,
+            "cli_session_id": f"cli-{session_id}",
+            "worker": os.getpid(),
+            "session_turns": session_turns[session_id]
+        }
+    }).encode('utf-8')))
+    return records
+
+
+def frame(kind: str, body: bytes, request_id: Optional[str] = None) -> bytes:
+    tag = f" {request_id}" if request_id else ""
+    return f"JARVIS_FRAME={kind} {len(body)}{tag}\n".encode('ascii') + body + b"\n"
+
+
+def write_answer(out, request: Dict, args):
+    """Write a request's records to a binary stream, paced by STREAM_ENV"""
+
+    pause = partial_pause()
+    for kind, body in answer(request, args.stream or pause is not None):
+        out.write(frame(kind, body))
+        if kind == "partial" and pause:
+            out.flush()
+            time.sleep(pause)
+    out.flush()
+
+
+def run_one_shot(args):
+    """--request -: read one request from stdin, answer on stdout"""
+
+    stdin = args.request == "-" and not os.environ.get(ARGV_ONLY_ENV)
+    request = json.loads(sys.stdin.buffer.read() if stdin else args.request)
+    time.sleep(args.latency / 1000 + extra_latency(request))
+    write_answer(sys.stdout.buffer, request, args)
+
+
+def run_worker(args):
+    """--serve: answer framed requests on stdin until EOF"""
+
+    time.sleep(float(os.environ.get(STARTUP_ENV, "0")) / 1000)
+
+    out = sys.stdout.buffer
+    out.write(b'JARVIS_READY={"protocol":%d}\n' % PROTOCOL_VERSION)
+    out.flush()
+
+    while True:
+        header = sys.stdin.buffer.readline()
+        if not header:
+            return
+
+        length = int(header.decode('ascii').split("=", 1)[1])
+        request = json.loads(sys.stdin.buffer.read(length))
+        time.sleep(args.latency / 1000 + extra_latency(request))
+        write_answer(out, request, args)
+
+
+async def run_daemon(args):
+    """--daemon: serve multiplexed requests on a Unix socket, TCP or TLS"""
+
+    async def handle_request(writer: asyncio.StreamWriter, request_id: str, body: bytes):
+        request = json.loads(body)
+        await asyncio.sleep(args.latency / 1000 + extra_latency(request))
+        pause = partial_pause()
+        for kind, record in answer(request, args.stream or pause is not None):
+            writer.write(frame(kind, record, request_id))
+            if kind == "partial" and pause:
+                await writer.drain()
+                await asyncio.sleep(pause)
+        await writer.drain()
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks: Dict[str, asyncio.Task] = {}
+
+        if args.token:
+            auth = await reader.readline()
+            if auth.decode('utf-8', 'replace').strip() != f"JARVIS_AUTH={args.token}":
+                writer.close()
+                return
+
+        writer.write(b'JARVIS_READY={"protocol":%d,"multiplex":true,"pid":%d}\n' % (PROTOCOL_VERSION, os.getpid()))
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                key, _, value = line.decode('ascii').strip().partition("=")
+                if key == "JARVIS_REQUEST":
+                    length, request_id = value.split()
+                    body = await reader.readexactly(int(length))
+                    task = asyncio.create_task(handle_request(writer, request_id, body))
+                    tasks[request_id] = task
+                    task.add_done_callback(lambda _, rid=request_id: tasks.pop(rid, None))
+                elif key == "JARVIS_CANCEL":
+                    task = tasks.get(value)
+                    if task:
+                        task.cancel()
+                        print(f"cancelled {value}", flush=True)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            writer.close()
+
+    tcp = args.socket.startswith((TCP_SCHEME, TLS_SCHEME))
+    if tcp:
+        host, _, port = args.socket.partition("://")[2].rpartition(":")
+        context = None
+        if args.socket.startswith(TLS_SCHEME):
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(args.tls_cert, args.tls_key)
+        server = await asyncio.start_server(handle_connection, host, int(port), ssl=context, limit=1024 * 1024)
+    else:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        server = await asyncio.start_unix_server(handle_connection, path=args.socket, limit=1024 * 1024)
+    print(f"BridgeHub stand-in daemon listening on {args.socket}", flush=True)
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if not tcp and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+def run_cluster(args):
+    """--nodes N: run N daemons on consecutive local TCP ports until interrupted"""
+
+    addresses = [f"{TCP_SCHEME}127.0.0.1:{args.base_port + i}" for i in range(args.nodes)]
+    options = ["--latency", str(args.latency)] + (["--stream"] if args.stream else [])
+    if args.token:
+        options += ["--token", args.token]
+
+    nodes = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--daemon", "--socket", address, *options],
+            stdout=subprocess.PIPE
+        )
+        for address in addresses
+    ]
+    for node in nodes:
+        node.stdout.readline()  # Listening
+
+    print(f"BRIDGEHUB_NODES={','.join(addresses)}", flush=True)
+
+    try:
+        signal.sigwait({signal.SIGINT, signal.SIGTERM})
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for node in nodes:
+            node.terminate()
+        for node in nodes:
+            node.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--request", help="'-' to read the request from stdin")
+    parser.add_argument("--serve", action="store_true", help="Run as a warm worker")
+    parser.add_argument("--agent", default="claude")
+    parser.add_argument("--daemon", action="store_true", help="Run as a resident daemon")
+    parser.add_argument("--socket", default="/tmp/bridgehub.sock", help="Unix socket path, tcp://host:port or tls://host:port")
+    parser.add_argument("--token", help="Shared token worker node connections must send")
+    parser.add_argument("--tls-cert", help="Certificate chain for a tls:// socket")
+    parser.add_argument("--tls-key", help="Private key for a tls:// socket")
+    parser.add_argument("--nodes", type=int, help="Run this many daemons on local TCP ports")
+    parser.add_argument("--base-port", type=int, default=7300)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated CLI time in ms")
+    parser.add_argument("--stream", action="store_true", help="Emit partial output")
+    args = parser.parse_args()
+
+    if args.nodes:
+        run_cluster(args)
+    elif args.daemon:
+        try:
+            asyncio.run(run_daemon(args))
+        except KeyboardInterrupt:
+            pass
+    elif args.serve:
+        run_worker(args)
+    elif args.request:
+        run_one_shot(args)
+    else:
+        parser.error("one of --request, --serve or --daemon is required")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker for BuilderOS Mobile BridgeHub Spawns
+
+When node or bridgehub.js is missing or broken, every request would still
+spawn BridgeHub, wait for it and fail, one at a time, while the phone shows
+a spinner. The breaker counts consecutive spawn and parse failures:
+
+- closed: requests run normally
+- open (after FAILURE_THRESHOLD failures in a row): requests that would
+  spawn BridgeHub fail at once with CircuitOpen, a structured error frame
+  telling the client when the next attempt is due; a background probe
+  checks every PROBE_INTERVAL seconds whether node and bridgehub.js are
+  usable again
+- half-open (a probe passed): one request runs as a trial while the rest
+  are still refused; its success closes the breaker, its failure opens it
+  again, and a trial that ends saying neither (e.g. cancelled) lets the
+  next request try
+
+Failures that say nothing about BridgeHub itself (a CLI error answer, a
+resource limit, a cancelled turn) do not count.
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from process_control import ExecutionError
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = 3  # Consecutive spawn/parse failures that open the breaker
+PROBE_INTERVAL = 10.0  # Seconds between recovery probes while open
+PROBE_TIMEOUT = 5.0
+TRIAL_RETRY_IN = 2.0  # Retry hint for requests refused while a half-open trial runs
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class BridgeHubFailure(ExecutionError):
+    """BridgeHub could not be started or produced unreadable output"""
+
+    code = "bridgehub_failed"
+
+
+class CircuitOpen(ExecutionError):
+    """BridgeHub keeps failing; the request was refused without spawning it"""
+
+    code = "bridgehub_unavailable"
+
+
+async def probe_bridgehub(node_path: str, bridgehub_path: str) -> bool:
+    """Whether bridgehub.js exists and node starts (what a spawn needs)"""
+
+    if not Path(bridgehub_path).exists():
+        return False
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            node_path,
+            "--version",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+    except OSError:
+        return False
+
+    try:
+        return await asyncio.wait_for(process.wait(), timeout=PROBE_TIMEOUT) == 0
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return False
+
+
+class CircuitBreaker:
+    """
+    Fails BridgeHub spawns fast while BridgeHub is known to be broken
+
+    Usage:
+        trial = breaker.check()         # raises CircuitOpen while open
+        try:
+            ...spawn BridgeHub...
+            breaker.record_success()    # a turn completed
+        except BridgeHubFailure as e:
+            breaker.record_failure(e)   # spawn or parse failure
+        finally:
+            if trial:
+                breaker.end_trial()
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[bool]],
+        failure_threshold: int = FAILURE_THRESHOLD,
+        probe_interval: float = PROBE_INTERVAL
+    ):
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.opened_at = 0.0
+        self.next_probe_at = 0.0
+        self.probe_task: Optional[asyncio.Task] = None
+        self.trial_in_flight = False  # Half-open: the one request let through is running
+
+        self.trips = 0
+        self.rejected = 0
+        self.probes = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == STATE_OPEN
+
+    def check(self, trial: bool = True) -> bool:
+        """
+        Raise CircuitOpen if BridgeHub should not be spawned right now
+
+        Args:
+            trial: Half-open, let this call through as the trial. False for
+                an early check ahead of the call that spawns
+
+        Returns:
+            True if this call is the half-open trial (see end_trial())
+        """
+
+        if self.state == STATE_CLOSED:
+            return False
+
+        if self.state == STATE_HALF_OPEN and not self.trial_in_flight:
+            if trial:
+                self.trial_in_flight = True
+            return trial
+
+        self.rejected += 1
+        if self.state == STATE_HALF_OPEN:
+            retry_in = TRIAL_RETRY_IN
+            when = "a trial request is running"
+        else:
+            retry_in = max(0.0, self.next_probe_at - time.monotonic())
+            when = f"retrying in {retry_in:.0f}s"
+
+        raise CircuitOpen(
+            f"BridgeHub is not working ({self.last_error}); {when}",
+            details={
+                "retry_in": round(retry_in, 1),
+                "failures": self.consecutive_failures,
+                "last_error": self.last_error
+            }
+        )
+
+    def end_trial(self):
+        """The trial ended without a success or failure; let the next request try"""
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+        if self.state != STATE_CLOSED:
+            logger.info(f"✅ BridgeHub recovered after {time.monotonic() - self.opened_at:.0f}s; circuit closed")
+            self.state = STATE_CLOSED
+            self._stop_probing()
+
+    def record_failure(self, error: Exception):
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        self.last_error = str(error).splitlines()[0][:200] if str(error) else type(error).__name__
+
+        if self.state == STATE_HALF_OPEN or (
+            self.state == STATE_CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._trip()
+
+    def _trip(self):
+        self.state = STATE_OPEN
+        self.opened_at = time.monotonic()
+        self.next_probe_at = self.opened_at + self.probe_interval
+        self.trips += 1
+        logger.error(
+            f"🔌 Circuit open: BridgeHub failed {self.consecutive_failures} times in a row "
+            f"({self.last_error}); failing fast, probing every {self.probe_interval:.0f}s"
+        )
+
+        if self.probe_task is None or self.probe_task.done():
+            self.probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        """Probe until BridgeHub looks usable, then let trial requests through"""
+
+        while self.state == STATE_OPEN:
+            await asyncio.sleep(max(0.0, self.next_probe_at - time.monotonic()))
+            if self.state != STATE_OPEN:
+                return
+
+            self.probes += 1
+            try:
+                healthy = await self.probe()
+            except Exception as e:
+                logger.debug(f"BridgeHub probe failed: {e}")
+                healthy = False
+
+            if healthy:
+                self.state = STATE_HALF_OPEN
+                self.trial_in_flight = False
+                logger.info("🔌 BridgeHub probe passed; circuit half-open, next request is a trial")
+                return
+
+            self.next_probe_at = time.monotonic() + self.probe_interval
+
+    def _stop_probing(self):
+        if self.probe_task and not self.probe_task.done():
+            self.probe_task.cancel()
+        self.probe_task = None
+
+    async def close(self):
+        """Stop the background probe"""
+
+        task = self.probe_task
+        self._stop_probing()
+        if task:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker statistics"""
+
+        return {
+            "state": self.state,
+            "trial_in_flight": self.trial_in_flight,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "last_error": self.last_error,
+            "open_for_s": round(time.monotonic() - self.opened_at, 1) if self.state != STATE_CLOSED else 0.0,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "probes": self.probes
+        }
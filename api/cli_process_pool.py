@@ -6,33 +6,128 @@ Maintains persistent Claude Code and Codex CLI processes mapped to chat sessions
 Eliminates cold-start overhead by keeping CLI processes warm and reusing them.
 
 Architecture:
-- Each session_id maps to a dedicated CLI process
-- Processes stay alive for the duration of the chat session
-- Messages are sent to the existing process via subprocess communication
-- Processes are terminated when the session is closed
+- Each session_id maps to a dedicated BridgeHub worker (`bridgehub.js --serve`)
+- Workers stay alive for the duration of the chat session
+- Messages are sent to the existing worker as framed requests over stdin
+  (see docs/BRIDGEHUB_WORKER_PROTOCOL.md)
+- A `warm` event (the user opened a chat or started typing) reserves a
+  worker for the session ahead of its first message; unused reservations
+  expire after RESERVATION_TTL and the worker goes back to standby
+- Workers are terminated when the session is closed or goes idle: each
+  has an idle deadline in a heap and is evicted exactly when it passes.
+  Hot sessions stay warm longer while memory is plentiful, and the least
+  recently used idle workers are evicted early when it runs low
+- With worker nodes configured (BRIDGEHUB_NODES), sessions run on other
+  machines instead, placed by consistent hashing on session_id (see
+  worker_nodes.py). The choice is made per request from the nodes active
+  at the time: a session that moves to a node has its worker here
+  retired, and when no node is active sessions get workers here again.
+  Turns on a node are admitted by the node and take no slot here
+- Without a worker, messages go to the resident BridgeHub daemon over its
+  Unix socket when one is running (no Node.js start-up per message)
+- If BridgeHub does not support worker mode and no daemon is listening,
+  each message falls back to a one-shot `bridgehub.js --request -` spawn,
+  or `--request <json>` for a BridgeHub that rejects stdin requests
+- Background and batch turns take the same route as a session without a
+  worker, on children at lower OS priority; the session's worker is never
+  reniced, since it could not be reniced back for the next interactive turn
+- After repeated spawn or parse failures a circuit breaker fails requests
+  that would spawn BridgeHub at once, until a background probe sees it
+  working again (see circuit_breaker.py)
+- Failures reach the caller as ExecutionError (a structured error frame),
+  never as answer text
 """
 
 import asyncio
-import json
+import heapq
 import logging
+import os
+import re
 import time
-from typing import Dict, Optional, AsyncIterator, List, Any
-from dataclasses import dataclass
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from typing import Callable, Deque, Dict, Optional, AsyncIterator, List, Any, Set, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+from admission_control import (
+    PRIORITY_INTERACTIVE, PRIORITY_NICE, AdmissionController, QueuePositionCallback,
+    get_admission_controller, normalize_priority
+)
+from bridgehub_daemon import DaemonPool, DaemonUnavailable, get_daemon_pool
+from bridgehub_launcher import DEFAULT_BRIDGEHUB_PATH, get_launcher
+from bridgehub_events import ResponseStream
+from bridgehub_protocol import FrameReader, ProtocolError, StdinRequestRejected, stdin_request_rejected, write_request
+from bridgehub_request import ENCODER, build_request, encode_request
+from circuit_breaker import BridgeHubFailure, CircuitBreaker, CircuitOpen
+from performance_trace import PerformanceTrace
+from process_control import (
+    NEW_PROCESS_GROUP, ExecutionError, kill_process_group, set_group_priority, terminate_process_group,
+    terminate_process_groups
+)
+from resource_limits import ProcessLimiter, ResourceLimits, get_process_limiter
+from resource_usage import ExecutionUsage, UsageMeter, get_usage_ledger, host_memory
+from stderr_capture import format_stderr, get_stderr_log
+from worker_nodes import NodeCluster, get_node_cluster
+
 logger = logging.getLogger(__name__)
 
+AGENT_TYPES = ("claude", "codex")
+
+# Worker protocol markers (must match bridgehub.js --serve)
+WORKER_READY_PREFIX = "JARVIS_READY="
+WORKER_REQUEST_PREFIX = "JARVIS_REQUEST="
+
+# How a BridgeHub without worker mode rejects --serve: exit status 64
+# (EX_USAGE), or an "unknown option '--serve'" style message on stderr.
+# Any other exit before the ready line is a failure, not a missing feature
+SERVE_UNSUPPORTED_EXIT = 64
+SERVE_UNSUPPORTED_PATTERN = re.compile(r"(unknown|unrecognized|unsupported|invalid)\b.*--serve", re.IGNORECASE)
+SERVE_RETRY_INTERVAL = 300.0  # Seconds before trying --serve again after it was rejected
+
+# Session.metadata key holding the CLI-native conversation id
+CLI_SESSION_KEY = "cli_session_id"
+
+# Idle eviction under memory pressure
+MEMORY_CHECK_INTERVAL = 5.0  # Seconds between host memory checks
+MEMORY_LOW_WATERMARK_MB = 1024  # Evict LRU idle workers below this much available
+MEMORY_PLENTIFUL_FRACTION = 0.5  # Above this share available, hot sessions stay longer
+HOT_SESSION_MESSAGES = 5  # Sessions with this many turns count as hot
+HOT_IDLE_MULTIPLIER = 3.0  # Idle timeout multiplier for hot sessions
+
+SHUTDOWN_TIMEOUT = 5.0  # Seconds all workers share to exit before SIGKILL
+
+RESERVATION_TTL = 30.0  # Seconds a warmed worker waits for its session's first message
+MAX_RESERVATIONS = 4  # Workers warming or reserved for sessions at once; warm events are client-driven
+
+STANDBY_WORKERS_ENV = "BRIDGEHUB_STANDBY_WORKERS"
+DEFAULT_STANDBY_WORKERS = 1
+
+
+def _with_stderr(message: str, stderr: List[str]) -> str:
+    """Append the last stderr lines to an error message"""
+    tail = format_stderr(stderr)
+    return f"{message}: {tail}" if tail else message
+
 
 @dataclass
 class CLIProcess:
     """Represents a persistent CLI process for a session"""
     session_id: str
     agent_type: str  # "claude" or "codex"
-    process: asyncio.subprocess.Process
+    process: Optional[asyncio.subprocess.Process]
     created_at: float
     last_used: float
     message_count: int = 0
+    idle_deadline: float = 0.0  # When the worker is evicted if still idle
+    reserved: bool = False  # Warmed ahead of time; no message has used it yet
+    # Serializes turns: a worker handles one request at a time
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
 
 
 class CLIProcessPool:
@@ -42,53 +137,159 @@ class CLIProcessPool:
     Key features:
     - One process per session_id
     - Processes persist across messages
+    - Idle standby workers per agent type, handed to new sessions
+    - Global admission control shared with BridgeHubClient
     - Automatic cleanup on timeout or session close
     - Health monitoring and auto-restart
     """
 
     def __init__(
         self,
-        bridgehub_path: str = "/Users/Ty/BuilderOS/tools/bridgehub/dist/bridgehub.js",
-        idle_timeout: float = 600.0  # 10 minutes
+        bridgehub_path: str = DEFAULT_BRIDGEHUB_PATH,
+        idle_timeout: float = 600.0,  # 10 minutes
+        node_path: str = "node",
+        worker_start_timeout: float = 15.0,
+        standby_workers: int = DEFAULT_STANDBY_WORKERS,  # Idle pre-started workers per agent type
+        max_reservations: int = MAX_RESERVATIONS,  # Cap on workers warmed for sessions ahead of a message
+        admission: Optional[AdmissionController] = None,
+        limits: Optional[ResourceLimits] = None,  # Per-child rlimits / cgroup caps (default: the shared limiter's)
+        daemon: Optional[DaemonPool] = None,
+        cluster: Optional[NodeCluster] = None
     ):
         self.bridgehub_path = Path(bridgehub_path)
         self.idle_timeout = idle_timeout
+        self.node_path = node_path
+        self.worker_start_timeout = worker_start_timeout
+        self.standby_workers = standby_workers
+        self.max_reservations = max_reservations
+        self.admission = admission or get_admission_controller()
+        self.limiter = ProcessLimiter(limits) if limits else get_process_limiter()
+        self.daemon = daemon or get_daemon_pool()
+        self.cluster = cluster or get_node_cluster()
+        self.launcher = get_launcher(node_path, str(self.bridgehub_path))
+        self.breaker = CircuitBreaker(self._probe)
+
+        # Cleared when BridgeHub rejects --serve, so we stop paying a failed
+        # worker spawn in front of every one-shot request; tried again after
+        # SERVE_RETRY_INTERVAL or when a breaker probe passes
+        self.serve_supported = True
+        self.serve_retry_at = 0.0
 
         # Session → CLIProcess mapping
         self.processes: Dict[str, CLIProcess] = {}
 
-        # Background cleanup task
-        self.cleanup_task: Optional[asyncio.Task] = None
+        # Agent type → ready workers not yet bound to a session
+        self.standby: Dict[str, Deque[asyncio.subprocess.Process]] = {
+            agent_type: deque() for agent_type in AGENT_TYPES
+        }
+        self.refill_tasks: Dict[str, asyncio.Task] = {}
+        self.standby_hits = 0
+        self.standby_misses = 0
+
+        # Running one-shot children (one per turn), so stop() can reap them
+        self.one_shots: Set[asyncio.subprocess.Process] = set()
+
+        # Session → in-progress warm-up reserving a worker for it
+        self.warming: Dict[str, asyncio.Task] = {}
+        self.reservations = 0
+        self.reservation_hits = 0
+        self.reservations_expired = 0
+        self.reservations_refused = 0
+
+        # Idle deadlines: (deadline, session_id) min-heap. Entries are not
+        # removed when a session is used again; stale ones are skipped
+        self.idle_deadlines: List[Tuple[float, str]] = []
+        self.eviction_wakeup = asyncio.Event()
+        self.eviction_task: Optional[asyncio.Task] = None
+        self.last_memory_check = 0.0
+        self.memory: Optional[Tuple[float, float]] = None
+        self.idle_evictions = 0
+        self.pressure_evictions = 0
 
         logger.info("🏊 CLI Process Pool initialized")
 
+    @property
+    def worker_mode(self) -> bool:
+        """Whether sessions get warm workers here (not while worker nodes are active)"""
+        return self.serve_supported and not self.cluster.active
+
+    async def _probe(self) -> bool:
+        """Circuit breaker probe; a BridgeHub that works again may have --serve now"""
+
+        healthy = await self.launcher.probe()
+        if healthy and not self.serve_supported:
+            logger.info("🔁 BridgeHub probe passed; trying worker mode again")
+            self.serve_supported = True
+        return healthy
+
+    def _retry_serve(self):
+        """Try --serve again once SERVE_RETRY_INTERVAL has passed (BridgeHub may be upgraded)"""
+
+        if not self.serve_supported and time.monotonic() >= self.serve_retry_at:
+            self.serve_supported = True
+
     async def start(self):
         """Start the process pool and background tasks"""
-        self.cleanup_task = asyncio.create_task(self._cleanup_loop())
+        self.memory = host_memory()
+        self.eviction_task = asyncio.create_task(self._eviction_loop())
+
+        for agent_type in AGENT_TYPES:
+            self._schedule_refill(agent_type)
+
         logger.info("✅ Process pool started")
 
-    async def stop(self):
-        """Stop the process pool and clean up all processes"""
+    async def stop(self, timeout: float = SHUTDOWN_TIMEOUT) -> Dict[str, Any]:
+        """
+        Stop the process pool and clean up all processes
+
+        All workers are signalled at once and share one graceful-exit
+        deadline, so shutdown takes at most about `timeout` seconds however
+        many sessions are open.
+
+        Returns:
+            Shutdown report (process counts and duration)
+        """
         logger.info("🛑 Stopping process pool...")
+        start_time = time.monotonic()
 
-        # Cancel cleanup task
-        if self.cleanup_task:
-            self.cleanup_task.cancel()
-            try:
-                await self.cleanup_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel background tasks
+        for task in [self.eviction_task, *self.refill_tasks.values(), *self.warming.values()]:
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
-        # Kill all processes
-        for session_id in list(self.processes.keys()):
-            await self.kill_process(session_id)
+        await self.breaker.close()
 
-        logger.info("✅ Process pool stopped")
+        # Kill all processes together, one-shot turns still running included
+        processes = [cli_process.process for cli_process in self.processes.values() if cli_process.process]
+        for workers in self.standby.values():
+            processes.extend(workers)
+            workers.clear()
+        processes.extend(self.one_shots)
+        self.one_shots.clear()
+        self.processes.clear()
+
+        report = await terminate_process_groups(processes, timeout=timeout)
+
+        for process in processes:
+            self.limiter.release(process)
+        self.limiter.sweep()
+
+        report["duration_ms"] = round((time.monotonic() - start_time) * 1000, 1)
+        logger.info(
+            f"✅ Process pool stopped in {report['duration_ms']:.0f}ms "
+            f"({report['graceful']} exited, {report['killed']} force-killed)"
+        )
+        return report
 
     async def get_or_create_process(
         self,
         session_id: str,
-        agent_type: str
+        agent_type: str,
+        worker: bool = True
     ) -> CLIProcess:
         """
         Get existing CLI process for session or create a new one
@@ -96,45 +297,333 @@ class CLIProcessPool:
         Args:
             session_id: Unique session identifier
             agent_type: "claude" or "codex"
+            worker: Start a worker if the session has none (False for turns that will not use it)
 
         Returns:
             CLIProcess instance
         """
 
+        # A warm-up for this session may be mid-spawn: use its worker. Wait
+        # without inheriting its outcome, since kill_process may cancel the
+        # warm-up; then there is simply no worker yet and we spawn one
+        warming = self.warming.get(session_id)
+        if warming:
+            await asyncio.wait([warming])
+
         # Check if process exists and is alive
         if session_id in self.processes:
             cli_process = self.processes[session_id]
 
-            # Verify process is still running (if we have a process reference)
-            if cli_process.process and cli_process.process.returncode is None:
+            if cli_process.is_alive:
+                if cli_process.reserved and worker:
+                    cli_process.reserved = False
+                    self.reservation_hits += 1
+                    logger.info(f"⚡ Using {agent_type} worker warmed for session {session_id[:8]}")
+
                 # Update last used time
-                cli_process.last_used = time.time()
+                self._touch(cli_process)
                 logger.debug(f"♻️  Reusing existing {agent_type} process for session {session_id[:8]}")
                 return cli_process
             elif cli_process.process:
                 logger.warning(f"⚠️  Process for {session_id[:8]} died (exit code: {cli_process.process.returncode})")
-                # Remove dead process
-                del self.processes[session_id]
+            elif not (self.worker_mode and worker):
+                # No worker wanted: the entry only tracks session state
+                self._touch(cli_process)
+                return cli_process
 
         # Create new process
-        logger.info(f"🚀 Spawning new {agent_type} CLI process for session {session_id[:8]}")
-
-        # Note: We're creating a placeholder here. The actual process will be spawned
-        # when we send the first message, because the CLI takes the prompt as an argument.
-        # For now, we'll track the session but spawn on-demand.
-
-        # This is a temporary implementation - we'll optimize to keep processes warm
-        cli_process = CLIProcess(
-            session_id=session_id,
-            agent_type=agent_type,
-            process=None,  # Will be set on first message
-            created_at=time.time(),
-            last_used=time.time()
-        )
+        process = None
+        self._retry_serve()
+        if self.worker_mode and worker:
+            process = self._take_standby(agent_type)
+            if process:
+                self.standby_hits += 1
+                logger.info(f"⚡ Assigned standby {agent_type} worker (pid {process.pid}) to session {session_id[:8]}")
+                get_stderr_log().assign(process.pid, session_id)
+            else:
+                self.standby_misses += 1
+                logger.info(f"🚀 Spawning new {agent_type} CLI process for session {session_id[:8]}")
+                process = await self._spawn_worker(agent_type)
+                if process:
+                    get_stderr_log().assign(process.pid, session_id)
+
+            self._schedule_refill(agent_type)
+
+            current = self.processes.get(session_id)
+            if process and current and current.is_alive:
+                # Another turn or a warm-up attached a worker while we spawned
+                self.standby.setdefault(agent_type, deque()).append(process)
+                self._touch(current)
+                return current
+
+        return self._attach(session_id, agent_type, process)  # None → one-shot spawn per message
+
+    def _attach(
+        self,
+        session_id: str,
+        agent_type: str,
+        process: Optional[asyncio.subprocess.Process],
+        reserved: bool = False
+    ) -> CLIProcess:
+        """
+        Make a worker the session's process
 
-        self.processes[session_id] = cli_process
+        An existing entry (state only, or with a dead worker) is kept rather
+        than replaced: its lock serializes a turn that may still be running
+        on it, such as a background turn, and its message count carries over.
+        """
+
+        cli_process = self.processes.get(session_id)
+        if cli_process is None:
+            cli_process = CLIProcess(
+                session_id=session_id,
+                agent_type=agent_type,
+                process=process,
+                created_at=time.time(),
+                last_used=time.time()
+            )
+            self.processes[session_id] = cli_process
+        else:
+            cli_process.agent_type = agent_type
+            cli_process.process = process
+            cli_process.created_at = time.time()
+
+        cli_process.reserved = reserved
+        self._touch(cli_process)
         return cli_process
 
+    def warm(self, agent_type: str, session_id: Optional[str] = None) -> str:
+        """
+        Get a worker ready before the message that needs it arrives
+
+        Without a session, only tops up the agent's standby workers. With
+        one, reserves a worker for the session in the background, so its
+        first message finds it ready; the reservation expires after
+        RESERVATION_TTL if no message comes. At most max_reservations
+        sessions are warmed at once.
+
+        Args:
+            agent_type: "claude" or "codex"
+            session_id: Session the user is about to message
+
+        Returns:
+            "ready", "warming", "standby" (no session, or the cap is reached)
+            or "unavailable" (one-shot mode)
+        """
+
+        if not self.worker_mode:
+            return "unavailable"
+
+        if not session_id:
+            self._schedule_refill(agent_type)
+            return "standby"
+
+        cli_process = self.processes.get(session_id)
+        if cli_process and cli_process.is_alive:
+            if not cli_process.lock.locked():
+                self._touch(cli_process)  # Typing again: keep it (or its reservation) warm
+            return "ready"
+
+        if session_id in self.warming:
+            return "warming"
+
+        if self._reservation_count() >= self.max_reservations:
+            # Any client can send warm events for any session id; beyond the
+            # cap its first message gets a standby worker instead
+            self.reservations_refused += 1
+            logger.debug(f"🔥 Reservation cap reached; not warming session {session_id[:8]}")
+            self._schedule_refill(agent_type)
+            return "standby"
+
+        task = asyncio.create_task(self._reserve(session_id, agent_type))
+        self.warming[session_id] = task
+        task.add_done_callback(
+            lambda done: self.warming.pop(session_id) if self.warming.get(session_id) is done else None
+        )
+
+        return "warming"
+
+    def _reservation_count(self) -> int:
+        """Workers warming for a session or reserved and not yet used"""
+        return len(self.warming) + sum(
+            1 for cli_process in self.processes.values() if cli_process.reserved and cli_process.is_alive
+        )
+
+    async def _reserve(self, session_id: str, agent_type: str):
+        """Bind a standby or freshly spawned worker to a session ahead of time"""
+
+        try:
+            process = self._take_standby(agent_type)
+            if process:
+                self.standby_hits += 1
+            else:
+                self.standby_misses += 1
+                process = await self._spawn_worker(agent_type)
+            self._schedule_refill(agent_type)
+
+            if process is None:
+                return
+
+            current = self.processes.get(session_id)
+            if current and current.is_alive:
+                # Raced with a message that spawned its own worker
+                self.standby.setdefault(agent_type, deque()).append(process)
+                return
+
+            get_stderr_log().assign(process.pid, session_id)
+            self._attach(session_id, agent_type, process, reserved=True)
+            self.reservations += 1
+            logger.info(f"🔥 Reserved {agent_type} worker (pid {process.pid}) for session {session_id[:8]}")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error warming {agent_type} worker for session {session_id[:8]}: {e}", exc_info=True)
+
+    def _take_standby(self, agent_type: str) -> Optional[asyncio.subprocess.Process]:
+        """Pop a live standby worker for this agent type, if any"""
+
+        workers = self.standby.setdefault(agent_type, deque())
+        while workers:
+            process = workers.popleft()
+            if process.returncode is None:
+                return process
+            logger.warning(f"⚠️  Standby {agent_type} worker died (exit code: {process.returncode})")
+
+        return None
+
+    def _schedule_refill(self, agent_type: str):
+        """Top up the standby workers for an agent type in the background"""
+
+        if not self.worker_mode or self.standby_workers <= 0:
+            return
+
+        task = self.refill_tasks.get(agent_type)
+        if task and not task.done():
+            return
+
+        self.refill_tasks[agent_type] = asyncio.create_task(self._refill_standby(agent_type))
+
+    async def _refill_standby(self, agent_type: str):
+        """Spawn workers until the standby target is reached"""
+
+        workers = self.standby.setdefault(agent_type, deque())
+
+        try:
+            # Standby workers are the first to go under memory pressure, so
+            # do not refill them while memory is still low
+            while self.worker_mode and len(workers) < self.standby_workers and not self._memory_low():
+                process = await self._spawn_worker(agent_type)
+                if process is None:
+                    break
+
+                workers.append(process)
+                logger.debug(f"🧊 {agent_type} standby workers: {len(workers)}/{self.standby_workers}")
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error refilling {agent_type} standby workers: {e}", exc_info=True)
+
+    async def _spawn_worker(self, agent_type: str) -> Optional[asyncio.subprocess.Process]:
+        """
+        Spawn a long-lived BridgeHub worker and wait for its ready line
+
+        Returns:
+            The worker process, or None if none could be started (no worker mode, breaker open, failure)
+        """
+
+        try:
+            trial = self.breaker.check()
+        except CircuitOpen:
+            return None
+
+        start_time = time.time()
+
+        try:
+            process = await self.limiter.spawn(
+                agent_type,
+                *self.launcher.command("--serve", "--agent", agent_type),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self.launcher.env,
+                **NEW_PROCESS_GROUP
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to spawn BridgeHub worker: {e}")
+            self.launcher.invalidate()
+            self.breaker.record_failure(e)
+            return None
+
+        # Drained for the worker's whole life so a chatty CLI never blocks
+        stderr = get_stderr_log().capture(process, "worker", agent_type)
+        ready = False
+
+        try:
+            while True:
+                line = await asyncio.wait_for(
+                    process.stdout.readline(),
+                    timeout=self.worker_start_timeout
+                )
+
+                if not line:
+                    code = await process.wait()
+                    await stderr.finish()
+
+                    breach = self.limiter.check_exit(process)
+                    if breach:
+                        # Limits too tight to even start; worker mode still works
+                        logger.error(f"❌ BridgeHub worker could not start: {breach}")
+                        return None
+
+                    lines = stderr.tail()
+                    if code == SERVE_UNSUPPORTED_EXIT or any(SERVE_UNSUPPORTED_PATTERN.search(line) for line in lines):
+                        # This BridgeHub has no worker mode
+                        logger.warning(
+                            f"⚠️  BridgeHub rejected --serve (code {code}); one-shot spawns "
+                            f"for the next {SERVE_RETRY_INTERVAL:.0f}s"
+                        )
+                        self.serve_supported = False
+                        self.serve_retry_at = time.monotonic() + SERVE_RETRY_INTERVAL
+                        return None
+
+                    # Missing script, crash, bad node...: a failure like any other
+                    failure = BridgeHubFailure(
+                        _with_stderr(f"BridgeHub worker exited during startup (code {code})", lines),
+                        code="worker_exited",
+                        details={"exit_code": code, "stderr": lines[-5:]}
+                    )
+                    logger.error(f"❌ {failure}")
+                    self.launcher.invalidate()
+                    self.breaker.record_failure(failure)
+                    return None
+
+                if line.decode('utf-8').startswith(WORKER_READY_PREFIX):
+                    ready = True
+                    break
+
+        except asyncio.TimeoutError:
+            logger.error(f"❌ BridgeHub worker not ready after {self.worker_start_timeout:.0f}s")
+            return None
+
+        finally:
+            if not ready:
+                # Exited, timed out or the pool is shutting down mid-spawn:
+                # the worker is in no list yet, so nothing else releases it
+                await kill_process_group(process)
+                self.limiter.release(process)
+                if trial:
+                    self.breaker.end_trial()
+
+        if trial:
+            # A worker that starts is the trial's answer: BridgeHub runs again
+            self.breaker.record_success()
+
+        ready_duration = (time.time() - start_time) * 1000
+        logger.info(f"⏱️  {agent_type} worker ready in {ready_duration:.0f}ms (pid {process.pid})")
+        return process
+
     async def execute_message(
         self,
         session_id: str,
@@ -142,13 +631,34 @@ class CLIProcessPool:
         message: str,
         conversation_history: list,
         system_context: str = "",
-        attachments: Optional[List[Dict[str, Any]]] = None
+        attachments: Optional[List[Dict[str, Any]]] = None,
+        device_id: str = "unknown-device",
+        on_queued: Optional[QueuePositionCallback] = None,
+        session_state: Optional[Dict[str, Any]] = None,
+        trace: Optional[PerformanceTrace] = None,
+        priority: str = PRIORITY_INTERACTIVE,
+        on_complete: Optional[Callable[[], None]] = None
     ) -> AsyncIterator[str]:
         """
         Execute a message in the CLI process for this session
 
-        Currently spawns a new process per message (same as before),
-        but tracks session state for future optimization.
+        Sends the request to the session's warm worker. Falls back to a
+        one-shot BridgeHub spawn when no worker is available. Turns that run
+        on this host wait for an admission slot first when too many
+        executions are running; turns sent to a worker node do not.
+
+        When session_state holds a CLI-native session id, only the new
+        message is sent and the CLI resumes its own conversation. If the
+        resume fails, the turn is retried once with the full history.
+
+        Interactive executions are admitted ahead of background and batch
+        ones, whose BridgeHub/CLI children also run at a lower OS priority.
+        Those turns never use the session's warm worker: an unprivileged
+        process cannot renice it back up for the next interactive turn, so
+        they run on the daemon, a node or a one-shot child instead.
+
+        Raises CircuitOpen at once, without queueing, when the turn would
+        spawn BridgeHub while it is known to be broken.
 
         Args:
             session_id: Session identifier
@@ -156,131 +666,498 @@ class CLIProcessPool:
             message: User message
             conversation_history: Previous messages
             system_context: CLAUDE.md content
+            device_id: Device the message came from (fair queueing key)
+            on_queued: Called with the queue position while waiting for a slot
+            session_state: Session.metadata; reads and stores the CLI session id
+            trace: Performance trace to record request size and resource usage on
+            priority: "interactive", "background" or "batch"
+            on_complete: Called once BridgeHub's final payload reported success
 
         Yields:
             Response chunks
+
+        Raises:
+            ExecutionError: the turn failed (code and details for the client)
         """
 
+        priority = normalize_priority(priority)
+        interactive = priority == PRIORITY_INTERACTIVE
+
+        if self._spawns_bridgehub(session_id, interactive):
+            self.breaker.check(trial=False)
+
         # Get or create process entry (tracks session)
-        cli_process = await self.get_or_create_process(session_id, agent_type)
-        cli_process.message_count += 1
+        cli_process = await self.get_or_create_process(
+            session_id, agent_type, worker=interactive and not self.cluster.route(session_id)
+        )
+
+        async with cli_process.lock, self._turn_slot(session_id, device_id, on_queued, priority) as on_node:
+            cli_process.message_count += 1
+
+            if on_node and cli_process.is_alive:
+                await self._retire_worker(cli_process)
+
+            logger.info(
+                f"📨 Executing {priority} message #{cli_process.message_count} "
+                f"for {agent_type} session {session_id[:8]}"
+            )
+            if attachments:
+                logger.info(f"📎 Forwarding {len(attachments)} attachment(s) to BridgeHub")
+
+            resume_id = (session_state or {}).get(CLI_SESSION_KEY)
+            turn_usage: Optional[ExecutionUsage] = None
+
+            try:
+                while True:
+                    request = build_request(
+                        session_id=session_id,
+                        agent_type=agent_type,
+                        message=message,
+                        conversation_history=conversation_history,
+                        system_context=system_context,
+                        attachments=attachments,
+                        resume_id=resume_id,
+                        metadata={"message_count": cli_process.message_count, "priority": priority}
+                    )
+                    body = encode_request(request)
+
+                    logger.info(f"📦 Request encoded: {len(body)} bytes ({ENCODER}{', resumed' if resume_id else ''})")
+                    if trace:
+                        trace.mark("request_encoded", {
+                            "bytes": len(body),
+                            "encoder": ENCODER,
+                            "resumed": bool(resume_id)
+                        })
+
+                    stream = ResponseStream(resumed=bool(resume_id))
+                    if cli_process.is_alive and interactive:
+                        chunks = self._execute_in_worker(cli_process, body, stream)
+                    elif on_node:
+                        chunks = self._execute_on_node(agent_type, body, stream, session_id, priority, device_id, on_queued)
+                    elif self.daemon.available:
+                        # The daemon is shared; BridgeHub sees the priority in the metadata
+                        chunks = self._execute_on_daemon(agent_type, body, stream, session_id, priority)
+                    else:
+                        chunks = self._execute_one_shot(agent_type, body, stream, session_id, priority)
+
+                    try:
+                        async with aclosing(chunks):
+                            async for chunk in chunks:
+                                yield chunk
+                    finally:
+                        if stream.usage:
+                            turn_usage = turn_usage.combine(stream.usage) if turn_usage else stream.usage
+                        if stream.stderr and trace:
+                            trace.mark("stderr", {"lines": stream.stderr[-20:], "count": len(stream.stderr)})
+
+                    if resume_id and stream.resume_failed:
+                        logger.warning(
+                            f"⚠️  Could not resume CLI session {resume_id[:8]} "
+                            f"for {session_id[:8]}; resending full history"
+                        )
+                        resume_id = None
+                        if session_state is not None:
+                            session_state.pop(CLI_SESSION_KEY, None)
+                        continue
+
+                    break
+
+            finally:
+                # Cancelled turns used the machine too
+                if turn_usage:
+                    get_usage_ledger().record(session_id, agent_type, turn_usage)
+                    if trace:
+                        trace.mark("resource_usage", turn_usage.to_dict())
+
+                # The eviction loop skips busy workers without rescheduling
+                # them, so every turn, failed or not, sets the next deadline
+                self._touch(cli_process)
+
+            if stream.cli_session_id and session_state is not None:
+                session_state[CLI_SESSION_KEY] = stream.cli_session_id
+
+            if stream.complete and on_complete:
+                on_complete()
+
+    @asynccontextmanager
+    async def _turn_slot(
+        self,
+        session_id: str,
+        device_id: str,
+        on_queued: Optional[QueuePositionCallback],
+        priority: str
+    ):
+        """
+        Decide where a turn runs, holding an admission slot only if it runs here
+
+        Nodes come and go between turns, so the route is chosen now. A worker
+        node admits its own work; holding one of this host's slots for it
+        would cap the whole cluster at this host's limit.
+
+        Yields:
+            Whether the turn runs on a worker node
+        """
+
+        if self.cluster.route(session_id) is not None:
+            yield True
+            return
+
+        async with self.admission.slot(device_id, on_queued, priority):
+            yield False
+
+    def _spawns_bridgehub(self, session_id: str, interactive: bool = True) -> bool:
+        """Whether the session's next turn would have to start BridgeHub here"""
 
-        # For now, we still spawn a new BridgeHub process per message
-        # TODO: Optimize to reuse warm CLI processes
+        if self.cluster.route(session_id):
+            return False
+
+        cli_process = self.processes.get(session_id)
+        if interactive and cli_process and cli_process.is_alive:
+            return False
+        return not self.daemon.available
+
+    async def _retire_worker(self, cli_process: CLIProcess):
+        """Stop a session's local worker once its turns run on a worker node"""
 
         logger.info(
-            f"📨 Executing message #{cli_process.message_count} "
-            f"for {agent_type} session {session_id[:8]}"
+            f"🖥️  Session {cli_process.session_id[:8]} moved to a worker node; "
+            f"retiring its local {cli_process.agent_type} worker (pid {cli_process.process.pid})"
         )
-        if attachments:
-            logger.info(f"📎 Forwarding {len(attachments)} attachment(s) to BridgeHub")
-
-        # Build BridgeHub request
-        context_items = []
-        if conversation_history:
-            context_items.append({
-                "title": "Conversation History",
-                "role": "note",
-                "content": json.dumps(conversation_history, indent=2)
-            })
+        process = cli_process.process
+        cli_process.process = None  # The entry keeps tracking the session
+        cli_process.reserved = False
+        await terminate_process_group(process)
+        self.limiter.release(process)
 
-        if attachments:
-            context_items.append({
-                "title": "Attachments",
-                "role": "note",
-                "content": json.dumps(attachments, indent=2)
-            })
+    async def _execute_in_worker(
+        self,
+        cli_process: CLIProcess,
+        body: bytes,
+        stream: ResponseStream
+    ) -> AsyncIterator[str]:
+        """Send one framed request to a warm worker and stream its answer"""
 
-        direction = "codex_to_claude" if agent_type == "claude" else "claude_to_codex"
+        process = cli_process.process
+        start_time = time.time()
+        header = f"{WORKER_REQUEST_PREFIX}{len(body)}\n".encode('utf-8')
+        reader = FrameReader(process.stdout)
+        meter = UsageMeter(process)
+        stderr = get_stderr_log().get(process.pid)
+        stderr_mark = stderr.mark() if stderr else 0
 
-        metadata: Dict[str, Any] = {
-            "source": "builderos_mobile",
-            "message_count": cli_process.message_count
-        }
+        try:
+            process.stdin.write(header + body)
+            await process.stdin.drain()
 
-        if attachments:
-            metadata["attachments"] = attachments
-
-        request = {
-            "version": "bridgehub/1.0",
-            "action": "freeform",
-            "capsule": "/Users/Ty/BuilderOS",
-            "session": session_id,
-            "payload": {
-                "message": message,
-                "intent": f"mobile_{agent_type}_query",
-                "direction": direction,
-                "context": context_items,
-                "metadata": metadata
-            }
-        }
+            # The worker answers each request with log and partial records
+            # followed by exactly one payload record, then waits for the
+            # next request
+            first_output = True
+            while not stream.complete:
+                record = await reader.read()
+                if record is None:
+                    code = await process.wait()
+                    if stderr:
+                        await stderr.finish()
+                        stream.stderr = stderr.lines_since(stderr_mark)
+
+                    breach = self.limiter.check_exit(process)
+                    if breach:
+                        breach.details["stderr"] = stream.stderr[-5:]
+                        raise breach
+
+                    raise BridgeHubFailure(
+                        _with_stderr(f"BridgeHub worker exited (code {code})", stream.stderr),
+                        code="worker_exited",
+                        details={"exit_code": code, "stderr": stream.stderr[-5:]}
+                    )
+
+                if first_output:
+                    first_output_duration = (time.time() - start_time) * 1000
+                    logger.info(f"⏱️  First output in {first_output_duration:.0f}ms (warm worker)")
+                    first_output = False
+
+                for chunk in stream.feed(*record):
+                    yield chunk
+
+            total_duration = (time.time() - start_time) * 1000
+            logger.info(f"✅ Message completed in {total_duration:.0f}ms")
+            self.breaker.record_success()
+
+        except BridgeHubFailure as e:
+            self.breaker.record_failure(e)
+            raise
+
+        except ExecutionError:
+            raise  # Structured: the server sends its code to the client
+
+        except ProtocolError as e:
+            logger.error(f"❌ Worker for session {cli_process.session_id[:8]} sent a malformed frame: {e}")
+            failure = BridgeHubFailure(str(e), code="protocol_error")
+            self.breaker.record_failure(failure)
+            raise failure from e
+
+        except Exception as e:
+            logger.error(f"❌ Worker for session {cli_process.session_id[:8]} failed: {e}")
+            raise ExecutionError(str(e), code="worker_failed") from e
+
+        finally:
+            stream.usage = meter.stop(len(header) + len(body), reader.bytes_read)
+            if stderr and not stream.stderr:
+                stream.stderr = stderr.lines_since(stderr_mark)
+
+            if not stream.complete:
+                # Cancelled or failed mid-turn. The rest of this turn is still
+                # in the pipe and would be read as the next turn's answer, so
+                # kill the worker's whole tree (BridgeHub + CLI) and drop it
+                if await kill_process_group(process):
+                    logger.info(f"🛑 Killed {cli_process.agent_type} worker for session {cli_process.session_id[:8]} mid-turn")
+                if self.processes.get(cli_process.session_id) is cli_process:
+                    del self.processes[cli_process.session_id]
+
+    def _execute_on_node(
+        self,
+        agent_type: str,
+        body: bytes,
+        stream: ResponseStream,
+        session_id: str,
+        priority: str = PRIORITY_INTERACTIVE,
+        device_id: str = "unknown-device",
+        on_queued: Optional[QueuePositionCallback] = None
+    ) -> AsyncIterator[str]:
+        """Run one request on the session's worker node, running it here if no node can"""
+
+        async def fallback() -> AsyncIterator[str]:
+            # Now it runs on this host after all, so it needs a slot here
+            async with self.admission.slot(device_id, on_queued, priority):
+                if self.daemon.available:
+                    chunks = self._execute_on_daemon(agent_type, body, stream, session_id, priority)
+                else:
+                    chunks = self._execute_one_shot(agent_type, body, stream, session_id, priority)
+
+                async with aclosing(chunks):
+                    async for chunk in chunks:
+                        yield chunk
 
-        request_json = json.dumps(request)
+        return self._execute_remote(self.cluster.execute(session_id, body), "node", body, stream, fallback)
+
+    def _execute_on_daemon(
+        self,
+        agent_type: str,
+        body: bytes,
+        stream: ResponseStream,
+        session_id: str = "",
+        priority: str = PRIORITY_INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """Run one request on the resident daemon, spawning BridgeHub if there is none"""
+
+        return self._execute_remote(
+            self.daemon.execute(body), "daemon", body, stream,
+            lambda: self._execute_one_shot(agent_type, body, stream, session_id, priority)
+        )
+
+    async def _execute_remote(
+        self,
+        records: AsyncIterator[Tuple[str, bytes]],
+        source: str,
+        body: bytes,
+        stream: ResponseStream,
+        fallback: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """Stream a daemon or worker node answer, switching to fallback if it was never sent"""
 
-        # Spawn BridgeHub process
         start_time = time.time()
+        bytes_read = 0
+        unavailable = False
 
         try:
-            process = await asyncio.create_subprocess_exec(
-                "node",
-                str(self.bridgehub_path),
-                "--request",
-                request_json,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
+            async with aclosing(records):
+                async for kind, record in records:
+                    if not bytes_read:
+                        first_output_duration = (time.time() - start_time) * 1000
+                        logger.info(f"⏱️  First output in {first_output_duration:.0f}ms ({source})")
+                    bytes_read += len(record)
+
+                    for chunk in stream.feed(kind, record):
+                        yield chunk
+
+            total_duration = (time.time() - start_time) * 1000
+            logger.info(f"✅ Message completed in {total_duration:.0f}ms")
+
+        except DaemonUnavailable as e:
+            logger.debug(f"🔌 {e}; running it elsewhere")
+            unavailable = True
+
+        except (ConnectionError, OSError, ProtocolError) as e:
+            logger.error(f"❌ BridgeHub {source} request failed: {e}")
+            raise ExecutionError(str(e), code="connection_lost", details={"source": source}) from e
+
+        finally:
+            if not unavailable:
+                # The work ran inside BridgeHub elsewhere; only wall time and bytes are ours to see
+                stream.usage = ExecutionUsage(
+                    wall_ms=(time.time() - start_time) * 1000,
+                    bytes_in=len(body),
+                    bytes_out=bytes_read,
+                    source=source
+                )
+
+        if unavailable:
+            chunks = fallback()
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    yield chunk
+
+    async def _execute_one_shot(
+        self,
+        agent_type: str,
+        body: bytes,
+        stream: ResponseStream,
+        session_id: str = "",
+        priority: str = PRIORITY_INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """Spawn a single-use BridgeHub process for one request (again, with the request as an argument, if it rejects stdin)"""
+
+        start_time = time.time()
+        process = None
+        request_writer = None
+        reader = None
+        meter = None
+        stderr = None
+        answered = False  # Any chunk forwarded
+        retry_with_argv = False
+        request_args, via_stdin = self.launcher.request_args(body)
+
+        # Also reached as the daemon's fallback, after execute_message's check.
+        # Half-open, this spawn is the one trial the breaker lets through.
+        trial = self.breaker.check()
 
+        try:
+            try:
+                process = await self.limiter.spawn(
+                    agent_type,
+                    *self.launcher.command(*request_args),
+                    stdin=asyncio.subprocess.PIPE if via_stdin else asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    env=self.launcher.env,
+                    **NEW_PROCESS_GROUP
+                )
+            except OSError as e:
+                self.launcher.invalidate()
+                raise BridgeHubFailure(
+                    f"Cannot start BridgeHub: {e}",
+                    code="spawn_failed",
+                    details=self.launcher.get_stats()
+                ) from e
+
+            self.one_shots.add(process)
             spawn_duration = (time.time() - start_time) * 1000
             logger.info(f"⏱️  BridgeHub spawned in {spawn_duration:.0f}ms")
+            meter = UsageMeter(process)
+
+            if PRIORITY_NICE[priority]:
+                set_group_priority(process, PRIORITY_NICE[priority])
+
+            # Drain stderr alongside stdout; read only after wait() a full
+            # pipe would block the child and hang the turn
+            stderr = get_stderr_log().capture(process, "one-shot", agent_type, session_id)
+
+            # Stream the request in while we read the answer
+            if via_stdin:
+                request_writer = asyncio.create_task(write_request(process.stdin, body))
 
             # Read and yield response chunks
+            reader = FrameReader(process.stdout)
             first_output = True
-            async for line in process.stdout:
+            while True:
+                record = await reader.read()
+                if record is None:
+                    break
+
                 if first_output:
                     first_output_duration = (time.time() - start_time) * 1000
                     logger.info(f"⏱️  First output in {first_output_duration:.0f}ms")
                     first_output = False
 
-                line_str = line.decode('utf-8').strip()
-                if not line_str:
-                    continue
+                # Forward partial output and the final payload
+                for chunk in stream.feed(*record):
+                    answered = True
+                    yield chunk
 
-                # Parse JARVIS_PAYLOAD response
-                if line_str.startswith("JARVIS_PAYLOAD="):
-                    payload_buffer = line_str.replace("JARVIS_PAYLOAD=", "")
+            # Wait for process completion
+            await process.wait()
+            await stderr.finish()
+            stream.stderr = stderr.tail()
 
-                    try:
-                        payload = json.loads(payload_buffer)
+            if not stream.complete and process.returncode != 0:
+                breach = self.limiter.check_exit(process)
+                if breach:
+                    breach.details["stderr"] = stream.stderr[-5:]
+                    raise breach
 
-                        if payload.get("ok"):
-                            data = payload.get("data", {})
-                            answer = data.get("output", "")
+                if via_stdin and not answered and stdin_request_rejected(process.returncode, stream.stderr):
+                    raise StdinRequestRejected()
 
-                            if not answer:
-                                answer = payload.get("summary", "No response")
+                logger.error(f"❌ BridgeHub process failed (exit code {process.returncode})")
+                raise BridgeHubFailure(
+                    _with_stderr(f"BridgeHub process failed (code {process.returncode})", stream.stderr),
+                    details={"exit_code": process.returncode, "stderr": stream.stderr[-5:]}
+                )
 
-                            # Yield in chunks
-                            chunk_size = 100
-                            for i in range(0, len(answer), chunk_size):
-                                yield answer[i:i+chunk_size]
-                        else:
-                            reason = payload.get("reason", "Unknown error")
-                            logger.error(f"❌ BridgeHub error: {reason}")
-                            yield f"Error: {reason}"
+            total_duration = (time.time() - start_time) * 1000
+            logger.info(f"✅ Message completed in {total_duration:.0f}ms")
+            if stream.complete:
+                self.breaker.record_success()
 
-                    except json.JSONDecodeError as e:
-                        logger.error(f"❌ Failed to parse BridgeHub response: {e}")
-                        yield "Error: Invalid response from BridgeHub"
+        except StdinRequestRejected:
+            # An older BridgeHub: a missing feature, not a failure
+            self.launcher.reject_stdin_requests()
+            retry_with_argv = True
 
-            # Wait for process completion
-            await process.wait()
+        except BridgeHubFailure as e:
+            self.breaker.record_failure(e)
+            raise
 
-            total_duration = (time.time() - start_time) * 1000
-            logger.info(f"✅ Message completed in {total_duration:.0f}ms")
+        except ExecutionError:
+            raise  # Structured: the server sends its code to the client
+
+        except ProtocolError as e:
+            logger.error(f"❌ BridgeHub sent a malformed frame: {e}")
+            failure = BridgeHubFailure(str(e), code="protocol_error")
+            self.breaker.record_failure(failure)
+            raise failure from e
 
         except Exception as e:
             logger.error(f"❌ Error executing message: {e}", exc_info=True)
-            yield f"Error: {str(e)}"
+            raise ExecutionError(str(e)) from e
+
+        finally:
+            if trial:
+                self.breaker.end_trial()
+
+            if request_writer and not request_writer.done():
+                request_writer.cancel()
+
+            # Still running only if we were cancelled or failed mid-stream
+            if process and await kill_process_group(process):
+                logger.info("🛑 Killed one-shot BridgeHub process group")
+
+            if process:
+                self.one_shots.discard(process)
+                self.limiter.release(process)
+
+            if stderr and not stream.stderr:
+                stream.stderr = stderr.tail()
+
+            if meter:
+                stream.usage = meter.stop(len(body), reader.bytes_read if reader else 0)
+
+        if retry_with_argv:
+            chunks = self._execute_one_shot(agent_type, body, stream, session_id, priority)
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    yield chunk
 
     async def kill_process(self, session_id: str) -> bool:
         """
@@ -293,6 +1170,12 @@ class CLIProcessPool:
             True if process was killed, False if not found
         """
 
+        warming = self.warming.pop(session_id, None)
+        if warming:
+            warming.cancel()
+
+        self.cluster.forget(session_id)
+
         if session_id not in self.processes:
             logger.debug(f"⚠️  No process found for session {session_id[:8]}")
             return False
@@ -300,62 +1183,178 @@ class CLIProcessPool:
         cli_process = self.processes[session_id]
 
         # Kill process if it's running
-        if cli_process.process and cli_process.process.returncode is None:
+        if cli_process.is_alive:
             logger.info(f"🔪 Killing {cli_process.agent_type} process for session {session_id[:8]}")
+            await terminate_process_group(cli_process.process)
+            logger.info(f"✅ Process killed for session {session_id[:8]}")
+
+        if cli_process.process:
+            self.limiter.release(cli_process.process)
+
+        # Remove from pool
+        del self.processes[session_id]
+        return True
+
+    def _idle_timeout_for(self, cli_process: CLIProcess) -> float:
+        """Idle timeout for a worker: longer for hot sessions when memory is plentiful"""
+
+        if cli_process.reserved:
+            return RESERVATION_TTL
+        if cli_process.message_count >= HOT_SESSION_MESSAGES and self._memory_plentiful():
+            return self.idle_timeout * HOT_IDLE_MULTIPLIER
+        return self.idle_timeout
+
+    def _touch(self, cli_process: CLIProcess):
+        """Mark a worker as used now and (re)schedule its idle eviction"""
+
+        cli_process.last_used = time.time()
+        self._schedule_eviction(cli_process, cli_process.last_used + self._idle_timeout_for(cli_process))
+
+    def _schedule_eviction(self, cli_process: CLIProcess, deadline: float):
+        """Push an idle deadline, waking the eviction loop if it is the earliest"""
 
+        earliest = self.idle_deadlines[0][0] if self.idle_deadlines else None
+        cli_process.idle_deadline = deadline
+        heapq.heappush(self.idle_deadlines, (deadline, cli_process.session_id))
+
+        if earliest is None or deadline < earliest:
+            self.eviction_wakeup.set()
+
+    def _memory_plentiful(self) -> bool:
+        if not self.memory:
+            return False
+        available_mb, total_mb = self.memory
+        return available_mb >= total_mb * MEMORY_PLENTIFUL_FRACTION
+
+    def _memory_low(self) -> bool:
+        return bool(self.memory) and self.memory[0] < MEMORY_LOW_WATERMARK_MB
+
+    async def _eviction_loop(self):
+        """Evict idle workers at their deadlines and under memory pressure"""
+
+        while True:
             try:
-                cli_process.process.terminate()
+                timeout = MEMORY_CHECK_INTERVAL
+                if self.idle_deadlines:
+                    timeout = min(timeout, max(0.0, self.idle_deadlines[0][0] - time.time()))
 
-                # Wait for graceful termination
+                # Not wait_for: on Python < 3.12 it swallows a cancel that
+                # arrives as the wakeup fires, and stop() then waits forever
+                wakeup = asyncio.ensure_future(self.eviction_wakeup.wait())
                 try:
-                    await asyncio.wait_for(cli_process.process.wait(), timeout=5.0)
-                except asyncio.TimeoutError:
-                    # Force kill if not terminated
-                    cli_process.process.kill()
-                    await cli_process.process.wait()
+                    await asyncio.wait([wakeup], timeout=timeout)
+                finally:
+                    wakeup.cancel()
+                self.eviction_wakeup.clear()
+
+                await self._evict_expired()
 
-                logger.info(f"✅ Process killed for session {session_id[:8]}")
+                if time.time() - self.last_memory_check >= MEMORY_CHECK_INTERVAL:
+                    self.last_memory_check = time.time()
+                    self.memory = host_memory()
+                    await self._relieve_memory_pressure()
 
+                # Workers that died or were killed mid-turn leave empty cgroups
+                self.limiter.sweep()
+
+            except asyncio.CancelledError:
+                break
             except Exception as e:
-                logger.error(f"❌ Error killing process: {e}")
+                logger.error(f"❌ Error in eviction loop: {e}", exc_info=True)
 
-        # Remove from pool
-        del self.processes[session_id]
-        return True
+    async def _evict_expired(self):
+        """Evict every worker whose idle deadline has passed"""
 
-    async def _cleanup_loop(self):
-        """Background task to clean up idle processes"""
+        now = time.time()
 
-        while True:
-            try:
-                await asyncio.sleep(60)  # Check every minute
+        while self.idle_deadlines and self.idle_deadlines[0][0] <= now:
+            deadline, session_id = heapq.heappop(self.idle_deadlines)
 
-                current_time = time.time()
-                idle_sessions = []
+            cli_process = self.processes.get(session_id)
+            if cli_process is None or cli_process.idle_deadline != deadline:
+                continue  # Closed, or used again since this entry was pushed
 
-                # Find idle sessions
-                for session_id, cli_process in self.processes.items():
-                    idle_time = current_time - cli_process.last_used
+            if cli_process.lock.locked():
+                continue  # Mid-turn; the turn's end (however it ends) schedules a new deadline
 
-                    if idle_time > self.idle_timeout:
-                        idle_sessions.append(session_id)
+            # Memory may have become plentiful since the deadline was set
+            extended = cli_process.last_used + self._idle_timeout_for(cli_process)
+            if extended > now:
+                self._schedule_eviction(cli_process, extended)
+                continue
 
-                # Kill idle processes
-                for session_id in idle_sessions:
-                    cli_process = self.processes[session_id]
-                    idle_minutes = (current_time - cli_process.last_used) / 60
+            if cli_process.reserved:
+                self.reservations_expired += 1
+                await self._release_reservation(cli_process)
+                continue
 
-                    logger.info(
-                        f"🧹 Cleaning up idle {cli_process.agent_type} process "
-                        f"for session {session_id[:8]} (idle for {idle_minutes:.1f} minutes)"
-                    )
+            idle_minutes = (now - cli_process.last_used) / 60
+            logger.info(
+                f"🧹 Cleaning up idle {cli_process.agent_type} process "
+                f"for session {session_id[:8]} (idle for {idle_minutes:.1f} minutes)"
+            )
 
-                    await self.kill_process(session_id)
+            self.idle_evictions += 1
+            await self.kill_process(session_id)
 
-            except asyncio.CancelledError:
+    async def _release_reservation(self, cli_process: CLIProcess):
+        """Return an unused reserved worker to standby, or kill it if standby is full"""
+
+        workers = self.standby.setdefault(cli_process.agent_type, deque())
+
+        if cli_process.is_alive and len(workers) < self.standby_workers:
+            # It never served a turn, so it is as good as a fresh standby worker
+            del self.processes[cli_process.session_id]
+            workers.append(cli_process.process)
+            logger.info(f"↩️  Reservation for session {cli_process.session_id[:8]} expired; worker back to standby")
+        else:
+            logger.info(f"🧹 Reservation for session {cli_process.session_id[:8]} expired")
+            await self.kill_process(cli_process.session_id)
+
+    async def _relieve_memory_pressure(self):
+        """Evict idle workers while host memory is low: standby first, then least recently used sessions"""
+
+        while self._memory_low():
+            process = self._pop_standby()
+            if process is None:
                 break
-            except Exception as e:
-                logger.error(f"❌ Error in cleanup loop: {e}", exc_info=True)
+
+            logger.warning(
+                f"🧠 Low memory ({self.memory[0]:.0f}MB available): "
+                f"stopping standby worker (pid {process.pid})"
+            )
+
+            self.pressure_evictions += 1
+            await terminate_process_group(process)
+            self.limiter.release(process)
+            self.memory = host_memory()
+
+        while self._memory_low():
+            idle = [
+                cli_process for cli_process in self.processes.values()
+                if cli_process.is_alive and not cli_process.lock.locked()
+            ]
+            if not idle:
+                return
+
+            victim = min(idle, key=lambda cli_process: cli_process.last_used)
+            logger.warning(
+                f"🧠 Low memory ({self.memory[0]:.0f}MB available): evicting "
+                f"{victim.agent_type} worker for session {victim.session_id[:8]} "
+                f"(idle {time.time() - victim.last_used:.0f}s)"
+            )
+
+            self.pressure_evictions += 1
+            await self.kill_process(victim.session_id)
+            self.memory = host_memory()
+
+    def _pop_standby(self) -> Optional[asyncio.subprocess.Process]:
+        """Take the oldest standby worker of any agent type, if any"""
+
+        for workers in self.standby.values():
+            if workers:
+                return workers.popleft()
+        return None
 
     def get_stats(self) -> Dict:
         """Get process pool statistics"""
@@ -364,6 +1363,43 @@ class CLIProcessPool:
 
         stats = {
             "total_processes": len(self.processes),
+            "one_shot_processes": len(self.one_shots),
+            "worker_mode": self.worker_mode,
+            "serve_supported": self.serve_supported,
+            "limits": self.limiter.get_stats(),
+            "launcher": self.launcher.get_stats(),
+            "circuit": self.breaker.get_stats(),
+            "daemon": self.daemon.get_stats(),
+            "worker_nodes": self.cluster.get_stats(),
+            "eviction": {
+                "idle_timeout": self.idle_timeout,
+                "next_deadline_in": round(min(
+                    (cli_process.idle_deadline for cli_process in self.processes.values()),
+                    default=current_time
+                ) - current_time, 1) if self.processes else None,
+                "idle_evictions": self.idle_evictions,
+                "pressure_evictions": self.pressure_evictions,
+                "memory_available_mb": round(self.memory[0]) if self.memory else None,
+                "memory_low": self._memory_low(),
+                "memory_plentiful": self._memory_plentiful()
+            },
+            "standby": {
+                "target_per_agent": self.standby_workers,
+                "claude": len(self.standby["claude"]),
+                "codex": len(self.standby["codex"]),
+                "hits": self.standby_hits,
+                "misses": self.standby_misses
+            },
+            "reservations": {
+                "ttl": RESERVATION_TTL,
+                "max": self.max_reservations,
+                "warming": len(self.warming),
+                "active": sum(1 for cli_process in self.processes.values() if cli_process.reserved),
+                "total": self.reservations,
+                "hits": self.reservation_hits,
+                "expired": self.reservations_expired,
+                "refused": self.reservations_refused
+            },
             "by_agent": {
                 "claude": 0,
                 "codex": 0
@@ -385,12 +1421,32 @@ class CLIProcessPool:
                 "message_count": cli_process.message_count,
                 "age_seconds": int(current_time - cli_process.created_at),
                 "idle_seconds": int(idle_seconds),
-                "is_alive": cli_process.process.returncode is None if cli_process.process else False
+                "is_alive": cli_process.is_alive,
+                "reserved": cli_process.reserved,
+                "usage": get_usage_ledger().session_stats(session_id)
             })
 
         return stats
 
 
+def standby_workers_from_env() -> int:
+    """Standby workers per agent type from BRIDGEHUB_STANDBY_WORKERS (0 disables them)"""
+
+    value = os.environ.get(STANDBY_WORKERS_ENV, "").strip()
+    if not value:
+        return DEFAULT_STANDBY_WORKERS
+
+    try:
+        count = int(value)
+        if count < 0:
+            raise ValueError
+    except ValueError:
+        logger.warning(f"⚠️  Ignoring {STANDBY_WORKERS_ENV}={value!r}; using {DEFAULT_STANDBY_WORKERS}")
+        return DEFAULT_STANDBY_WORKERS
+
+    return count
+
+
 # Global process pool instance
 cli_pool: Optional[CLIProcessPool] = None
 
@@ -400,7 +1456,7 @@ async def get_cli_pool() -> CLIProcessPool:
     global cli_pool
 
     if cli_pool is None:
-        cli_pool = CLIProcessPool()
+        cli_pool = CLIProcessPool(standby_workers=standby_workers_from_env())
         await cli_pool.start()
 
     return cli_pool
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+In-flight Message Registry for BuilderOS Mobile
+
+When the phone reconnects over the Cloudflare tunnel it often resends the
+last message. Messages carrying a client `message_id` are registered here
+while they execute, so a resend attaches to the running stream instead of
+spawning a second BridgeHub/CLI execution. Finished messages are found in
+the session history instead (see Session.find_turn) and replayed from there.
+
+The owner of a message publishes every frame it sends its own WebSocket;
+followers get the text streamed so far as one catch-up frame, then every
+later frame in order, ending with the owner's completion or error frame.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InflightMessage:
+    """One executing message and the followers attached to its stream"""
+
+    def __init__(self, message_id: str, session_id: str):
+        self.message_id = message_id
+        self.session_id = session_id
+        self.task: Optional[asyncio.Task] = None  # Owner's execution task
+
+        self.text_parts: List[str] = []
+        self.final_frame: Optional[Dict[str, Any]] = None
+        self.finished = False
+        self.followers: List[asyncio.Queue] = []
+
+    def publish(self, frame: Dict[str, Any]):
+        """Record a frame the owner sent and fan it out to followers"""
+
+        if frame.get("type") == "message":
+            self.text_parts.append(frame.get("content", ""))
+        elif frame.get("type") in ("complete", "error"):
+            self.final_frame = frame
+
+        for queue in self.followers:
+            queue.put_nowait(frame)
+
+    def finish(self):
+        """Mark the execution as over and release every follower"""
+
+        self.finished = True
+        for queue in self.followers:
+            queue.put_nowait(None)
+
+    async def follow(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream this message to another connection
+
+        Yields:
+            A catch-up frame with the text so far, then live frames
+        """
+
+        queue: asyncio.Queue = asyncio.Queue()
+        backlog = "".join(self.text_parts)
+
+        # Snapshot and subscribe with no await in between, so nothing is lost
+        if not self.finished:
+            self.followers.append(queue)
+
+        try:
+            if backlog:
+                yield {
+                    "type": "message",
+                    "content": backlog,
+                    "timestamp": datetime.now().isoformat()
+                }
+
+            if self.finished:
+                if self.final_frame:
+                    yield self.final_frame
+                return
+
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    return
+                yield frame
+
+        finally:
+            if queue in self.followers:
+                self.followers.remove(queue)
+
+
+class InflightRegistry:
+    """Message id → executing message"""
+
+    def __init__(self):
+        self.messages: Dict[str, InflightMessage] = {}
+
+        self.started = 0
+        self.coalesced = 0
+        self.replayed = 0
+
+    def get(self, message_id: str) -> Optional[InflightMessage]:
+        """The executing message with this id, if any"""
+
+        inflight = self.messages.get(message_id)
+        if inflight:
+            self.coalesced += 1
+            logger.info(f"🔗 Duplicate message {message_id[:8]} attached to running execution")
+        return inflight
+
+    def start(self, message_id: str, session_id: str) -> InflightMessage:
+        """Register a message that is about to execute"""
+
+        inflight = InflightMessage(message_id, session_id)
+        self.messages[message_id] = inflight
+        self.started += 1
+        return inflight
+
+    def finish(self, inflight: InflightMessage):
+        """Unregister a message once its reply is in the session"""
+
+        inflight.finish()
+        if self.messages.get(inflight.message_id) is inflight:
+            del self.messages[inflight.message_id]
+
+    def record_replay(self, message_id: str):
+        """Count a duplicate answered from session history"""
+
+        self.replayed += 1
+        logger.info(f"🔁 Duplicate message {message_id[:8]} replayed from session history")
+
+    def get_stats(self) -> Dict:
+        """Get registry statistics"""
+
+        return {
+            "in_flight": len(self.messages),
+            "followers": sum(len(inflight.followers) for inflight in self.messages.values()),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "replayed": self.replayed
+        }
+
+
+# Global in-flight registry
+inflight_registry: Optional[InflightRegistry] = None
+
+
+def get_inflight_registry() -> InflightRegistry:
+    """Get or create the global in-flight registry"""
+    global inflight_registry
+
+    if inflight_registry is None:
+        inflight_registry = InflightRegistry()
+
+    return inflight_registry
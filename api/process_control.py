@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Process Control Helpers for BuilderOS Mobile
+
+BridgeHub spawns the Claude/Codex CLI, which may spawn its own tools. Every
+BridgeHub child is therefore started in its own session (process group), so a
+cancel or shutdown can take down the whole tree instead of orphaning the CLI.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import time
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pass to asyncio.create_subprocess_exec for every BridgeHub child
+NEW_PROCESS_GROUP = {"start_new_session": True}
+
+KILL_REAP_TIMEOUT = 2.0  # Seconds to wait for SIGKILLed children to be reaped
+
+
+def signal_process_group(process: asyncio.subprocess.Process, sig: int = signal.SIGKILL) -> bool:
+    """
+    Send a signal to a child's whole process group
+
+    Args:
+        process: Child started with NEW_PROCESS_GROUP
+        sig: Signal to send (SIGKILL by default)
+
+    Returns:
+        True if the signal was delivered, False if the group is already gone
+    """
+
+    if process.returncode is not None:
+        return False
+
+    try:
+        os.killpg(process.pid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Not a group leader we own (e.g. spawned without a new session)
+        try:
+            process.send_signal(sig)
+            return True
+        except ProcessLookupError:
+            return False
+
+
+async def kill_process_group(process: asyncio.subprocess.Process) -> bool:
+    """
+    SIGKILL a child's process group and reap the child
+
+    Reaping here, rather than leaving it to the child watcher, closes the
+    child's pipes while the event loop is still running.
+
+    Returns:
+        True if the group was still running
+    """
+
+    killed = signal_process_group(process)
+    try:
+        await asyncio.wait_for(process.wait(), timeout=KILL_REAP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.error(f"❌ pid {process.pid} did not exit after SIGKILL")
+    return killed
+
+
+def set_group_priority(process: asyncio.subprocess.Process, nice: int) -> bool:
+    """
+    Set the nice value of a child's whole process group
+
+    Children the CLI starts later inherit it. Raising priority again (a
+    lower nice value) needs privileges, so that usually fails.
+
+    Returns:
+        True if the priority was set
+    """
+
+    if process.returncode is not None:
+        return False
+
+    try:
+        os.setpriority(os.PRIO_PGRP, process.pid, nice)
+        return True
+    except (ProcessLookupError, PermissionError) as e:
+        logger.debug(f"Could not set nice {nice} for pid {process.pid}: {e}")
+        return False
+
+
+async def terminate_process_group(process: asyncio.subprocess.Process, timeout: float = 5.0):
+    """Stop a child's process group gracefully, force-killing it after a timeout"""
+
+    await terminate_process_groups([process], timeout=timeout)
+
+
+async def terminate_process_groups(
+    processes: Iterable[asyncio.subprocess.Process],
+    timeout: float = 5.0
+) -> Dict[str, Any]:
+    """
+    Stop many children's process groups at once under a single deadline
+
+    Every group gets SIGTERM (and its stdin closed) up front, all of them are
+    waited on together, and whatever is still running when the deadline
+    passes is SIGKILLed. Waiting on each child reaps it, so no zombies are
+    left behind.
+
+    Args:
+        processes: Children started with NEW_PROCESS_GROUP
+        timeout: Seconds allowed for graceful exit, for all children together
+
+    Returns:
+        Counts of children that exited gracefully and that had to be killed,
+        and how long it took
+    """
+
+    start_time = time.monotonic()
+    running = [process for process in processes if process.returncode is None]
+
+    for process in running:
+        try:
+            # Closing stdin lets a worker finish its loop and exit cleanly
+            if process.stdin:
+                process.stdin.close()
+        except Exception as e:
+            logger.debug(f"Could not close stdin of pid {process.pid}: {e}")
+        signal_process_group(process, signal.SIGTERM)
+
+    waiters = {asyncio.ensure_future(process.wait()): process for process in running}
+    killed = 0
+
+    if waiters:
+        _, pending = await asyncio.wait(waiters, timeout=timeout)
+
+        for waiter in pending:
+            if signal_process_group(waiters[waiter], signal.SIGKILL):
+                killed += 1
+
+        if pending:
+            # SIGKILL cannot be ignored; this only waits for the kernel
+            _, unreaped = await asyncio.wait(pending, timeout=KILL_REAP_TIMEOUT)
+            for waiter in unreaped:
+                waiter.cancel()
+                logger.error(f"❌ pid {waiters[waiter].pid} did not exit after SIGKILL")
+
+    # A leader that exited on SIGTERM may have left tools running in its group
+    for process in running:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    return {
+        "processes": len(running),
+        "graceful": len(running) - killed,
+        "killed": killed,
+        "duration_ms": round((time.monotonic() - start_time) * 1000, 1)
+    }
+
+
+class ExecutionError(Exception):
+    """
+    A BridgeHub execution failed in a way the client should be told about
+
+    Carries a machine-readable code and details, which the server forwards
+    in its error frame instead of just a message string.
+    """
+
+    code = "execution_failed"
+
+    def __init__(self, message: str, code: Optional[str] = None, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        if code:
+            self.code = code
+        self.details = details or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "code": self.code,
+            "message": str(self),
+            "details": self.details
+        }
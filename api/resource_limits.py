@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Resource Limits for BuilderOS Mobile BridgeHub Children
+
+One runaway Codex run must not take all the memory on the host and stall
+every other session. CLIProcessPool and BridgeHubClient start each BridgeHub
+child (and so the CLI it spawns) through one shared ProcessLimiter, under:
+
+- rlimits: address space, CPU time, open files
+- optionally, its own cgroup v2 with memory.max / cpu.max caps. They are off
+  unless configured (BRIDGEHUB_CGROUP_MEMORY_MB, BRIDGEHUB_CGROUP_CPU_PERCENT)
+  and only work on Linux when the server's own cgroup is delegated to it
+  (e.g. systemd Delegate=yes): child cgroups are created under that cgroup,
+  never under the root. Elsewhere they are skipped with a warning
+
+On Linux both are applied from the parent right after exec (prlimit and a
+cgroup.procs write), while Node is still starting and long before BridgeHub
+can start a CLI. Without a preexec_fn, CPython can spawn with vfork instead
+of copying the server's page tables with fork.
+
+macOS has no prlimit. There the server raises its own open-files soft limit
+to the configured value once, so children inherit it, and limits a child
+inherits anyway are never set again; with the defaults no preexec_fn is
+needed. Address space and CPU limits, or an open-files limit below the
+server's own, are still set in the child before exec, at the cost of a fork.
+
+When a child dies because of a limit, the pool raises ResourceLimitExceeded
+instead of returning a bare "Error:" string, so the client gets a structured
+error frame with the limit that was hit.
+
+Notes:
+- RLIMIT_CPU counts a process's whole lifetime, so for a warm worker it caps
+  the CPU of every turn the worker serves, not one turn.
+- Node reserves large virtual address ranges up front; an address space
+  limit below a few GB stops it from starting. Prefer the cgroup memory cap.
+"""
+
+import asyncio
+import logging
+import os
+import resource
+import signal
+import sys
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from process_control import ExecutionError
+
+logger = logging.getLogger(__name__)
+
+CGROUP_V2_ROOT = Path("/sys/fs/cgroup")
+CGROUP_PARENT = "builderos-mobile"  # Under our own cgroup; holds one cgroup per child
+CGROUP_SERVER_LEAF = "server"  # Where the server moves so its cgroup can delegate controllers
+CGROUP_CPU_PERIOD_US = 100_000
+
+# ResourceLimits field → environment variable that sets it
+LIMIT_ENV = {
+    "address_space_mb": "BRIDGEHUB_ADDRESS_SPACE_MB",
+    "cpu_seconds": "BRIDGEHUB_CPU_SECONDS",
+    "open_files": "BRIDGEHUB_OPEN_FILES",
+    "cgroup_memory_mb": "BRIDGEHUB_CGROUP_MEMORY_MB",
+    "cgroup_cpu_percent": "BRIDGEHUB_CGROUP_CPU_PERCENT"
+}
+
+# Apply limits from the parent after spawn instead of in a preexec_fn
+LIMIT_AFTER_SPAWN = hasattr(resource, "prlimit")
+
+# Exit signals that mean "could not get memory" under an address space limit
+_ALLOCATION_FAILURE_SIGNALS = (signal.SIGABRT, signal.SIGSEGV, signal.SIGBUS)
+
+
+@dataclass
+class ResourceLimits:
+    """Per-child limits; None disables a limit"""
+    address_space_mb: Optional[int] = None  # RLIMIT_AS
+    cpu_seconds: Optional[int] = None  # RLIMIT_CPU (SIGXCPU when exceeded)
+    open_files: Optional[int] = 4096  # RLIMIT_NOFILE
+    cgroup_memory_mb: Optional[int] = None  # cgroup v2 memory.max
+    cgroup_cpu_percent: Optional[int] = None  # cgroup v2 cpu.max (100 = one core)
+
+    @classmethod
+    def from_env(cls) -> 'ResourceLimits':
+        """Defaults overridden by BRIDGEHUB_* variables ("none" disables a limit)"""
+
+        limits = cls()
+        for name, variable in LIMIT_ENV.items():
+            value = os.environ.get(variable, "").strip()
+            if not value:
+                continue
+            if value.lower() == "none":
+                setattr(limits, name, None)
+                continue
+            try:
+                setattr(limits, name, int(value))
+            except ValueError:
+                logger.warning(f"⚠️  Ignoring {variable}={value!r}")
+
+        return limits
+
+    @property
+    def has_rlimits(self) -> bool:
+        return any(limit is not None for limit in (self.address_space_mb, self.cpu_seconds, self.open_files))
+
+    @property
+    def has_cgroup_caps(self) -> bool:
+        return self.cgroup_memory_mb is not None or self.cgroup_cpu_percent is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "address_space_mb": self.address_space_mb,
+            "cpu_seconds": self.cpu_seconds,
+            "open_files": self.open_files,
+            "cgroup_memory_mb": self.cgroup_memory_mb,
+            "cgroup_cpu_percent": self.cgroup_cpu_percent
+        }
+
+
+def _own_cgroup() -> Optional[Path]:
+    """This process's cgroup v2 directory, from /proc/self/cgroup"""
+
+    try:
+        for line in Path("/proc/self/cgroup").read_text().splitlines():
+            if line.startswith("0::"):
+                return CGROUP_V2_ROOT / line[3:].strip().lstrip("/")
+    except OSError:
+        pass
+    return None
+
+
+class ResourceLimitExceeded(ExecutionError):
+    """A BridgeHub child was killed for exceeding one of its limits"""
+
+    code = "resource_limit_exceeded"
+
+    def __init__(self, limit: str, value: Any, detail: str):
+        super().__init__(
+            f"Agent process exceeded its {limit.replace('_', ' ')} limit ({detail})",
+            details={"limit": limit, "value": value}
+        )
+        self.limit = limit
+
+
+class _Cgroup:
+    """A per-child cgroup v2 directory"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.oom_kills_at_start = 0
+
+    def oom_kills(self) -> int:
+        """Number of OOM kills recorded in memory.events"""
+        try:
+            for line in (self.path / "memory.events").read_text().splitlines():
+                key, _, value = line.partition(" ")
+                if key == "oom_kill":
+                    return int(value)
+        except (OSError, ValueError):
+            pass
+        return 0
+
+    def remove(self):
+        """Remove the cgroup once its processes are gone (best effort)"""
+        try:
+            self.path.rmdir()
+        except OSError:
+            pass
+
+
+class ProcessLimiter:
+    """
+    Applies ResourceLimits to spawned children and explains their deaths
+
+    Usage:
+        process = await limiter.spawn("codex", node, script, ..., stdout=PIPE)
+        ...
+        error = limiter.check_exit(process)   # after process.wait()
+        limiter.release(process)
+    """
+
+    def __init__(self, limits: Optional[ResourceLimits] = None):
+        self.limits = limits or ResourceLimits()
+        self.cgroups: Dict[int, _Cgroup] = {}
+        self.breaches: Dict[str, int] = {}
+
+        self.cgroup_parent = self._init_cgroup_parent() if self.limits.has_cgroup_caps else None
+
+        if not LIMIT_AFTER_SPAWN and self.limits.open_files is not None:
+            self._inherit_open_files()
+
+    def _inherit_open_files(self):
+        """Without prlimit, raise our own soft open-files limit so children inherit it without a preexec_fn"""
+
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        target = self.limits.open_files if hard == resource.RLIM_INFINITY else min(self.limits.open_files, hard)
+        if soft != resource.RLIM_INFINITY and soft >= target:
+            return
+
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        except (ValueError, OSError) as e:
+            logger.warning(f"⚠️  Could not raise the open-files limit to {target} ({e}); children set it themselves")
+
+    def _init_cgroup_parent(self) -> Optional[Path]:
+        """Create our cgroup parent under the server's own delegated cgroup, or None"""
+
+        if not sys.platform.startswith("linux") or not (CGROUP_V2_ROOT / "cgroup.controllers").exists():
+            logger.warning("⚠️  cgroup caps configured but cgroup v2 is not available; applying rlimits only")
+            return None
+
+        own = _own_cgroup()
+        if own is None or own == CGROUP_V2_ROOT:
+            logger.warning("⚠️  cgroup caps need a delegated cgroup, but this server is in the root cgroup; skipped")
+            return None
+
+        try:
+            missing = {"memory", "cpu"} - set((own / "cgroup.controllers").read_text().split())
+        except OSError:
+            missing = {"memory", "cpu"}
+        if missing:
+            logger.warning(f"⚠️  {' and '.join(sorted(missing))} not delegated to {own}; applying rlimits only")
+            return None
+
+        parent = own / CGROUP_PARENT
+        try:
+            # cgroup v2 only lets a cgroup without processes of its own hand
+            # controllers to children, so the server moves into a leaf first
+            leaf = own / CGROUP_SERVER_LEAF
+            leaf.mkdir(exist_ok=True)
+            (leaf / "cgroup.procs").write_text(str(os.getpid()))
+            (own / "cgroup.subtree_control").write_text("+memory +cpu")
+            parent.mkdir(exist_ok=True)
+            (parent / "cgroup.subtree_control").write_text("+memory +cpu")
+        except OSError as e:
+            logger.warning(f"⚠️  Cannot use cgroup v2 caps under {own} ({e}); applying rlimits only")
+            return None
+
+        logger.info(f"🧱 cgroup v2 caps enabled under {parent}")
+        return parent
+
+    async def spawn(
+        self,
+        name: str,
+        *command: str,
+        limit_after_spawn: Optional[bool] = None,
+        **kwargs
+    ) -> asyncio.subprocess.Process:
+        """
+        create_subprocess_exec() with the limits applied to the child
+
+        Args:
+            name: Label for the child's cgroup (e.g. the agent type)
+            command: Program and arguments
+            limit_after_spawn: Apply limits from the parent after exec (default
+                where prlimit exists) or False for a preexec_fn in the child
+            kwargs: Passed through to create_subprocess_exec
+        """
+
+        after = LIMIT_AFTER_SPAWN if limit_after_spawn is None else limit_after_spawn and LIMIT_AFTER_SPAWN
+
+        cgroup = self._create_cgroup(name) if self.cgroup_parent else None
+        rlimits = self._rlimits()
+        if (rlimits or cgroup) and not after:
+            kwargs["preexec_fn"] = self._preexec(cgroup, rlimits)
+
+        try:
+            process = await asyncio.create_subprocess_exec(*command, **kwargs)
+        except Exception:
+            if cgroup:
+                cgroup.remove()
+            raise
+
+        if after:
+            self._limit_spawned(process.pid, cgroup, rlimits)
+
+        if cgroup:
+            cgroup.oom_kills_at_start = cgroup.oom_kills()
+            self.cgroups[process.pid] = cgroup
+
+        return process
+
+    def _create_cgroup(self, name: str) -> Optional[_Cgroup]:
+        path = self.cgroup_parent / f"{name}-{uuid.uuid4().hex[:8]}"
+        try:
+            path.mkdir()
+            if self.limits.cgroup_memory_mb is not None:
+                (path / "memory.max").write_text(str(self.limits.cgroup_memory_mb * 1024 * 1024))
+                swap_max = path / "memory.swap.max"
+                if swap_max.exists():
+                    swap_max.write_text("0")
+            if self.limits.cgroup_cpu_percent is not None:
+                quota = self.limits.cgroup_cpu_percent * CGROUP_CPU_PERIOD_US // 100
+                (path / "cpu.max").write_text(f"{quota} {CGROUP_CPU_PERIOD_US}")
+        except OSError as e:
+            logger.warning(f"⚠️  Could not create cgroup {path.name}: {e}")
+            _Cgroup(path).remove()
+            return None
+
+        return _Cgroup(path)
+
+    def _rlimits(self) -> List[Tuple[int, Tuple[int, int]]]:
+        """(resource, (soft, hard)) pairs for the configured rlimits children do not already inherit"""
+
+        limits = self.limits
+        rlimits = []
+
+        if limits.address_space_mb is not None:
+            size = limits.address_space_mb * 1024 * 1024
+            rlimits.append((resource.RLIMIT_AS, (size, size)))
+
+        if limits.cpu_seconds is not None:
+            # Soft limit sends SIGXCPU; the hard limit a little later SIGKILL
+            rlimits.append((resource.RLIMIT_CPU, (limits.cpu_seconds, limits.cpu_seconds + 5)))
+
+        if limits.open_files is not None:
+            _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+            soft = limits.open_files if hard == resource.RLIM_INFINITY else min(limits.open_files, hard)
+            rlimits.append((resource.RLIMIT_NOFILE, (soft, hard)))
+
+        return [(limit, values) for limit, values in rlimits if resource.getrlimit(limit) != values]
+
+    def _preexec(self, cgroup: Optional[_Cgroup], rlimits: List[Tuple[int, Tuple[int, int]]]) -> Callable[[], None]:
+        """Build the function the child runs between fork and exec"""
+
+        procs_file = str(cgroup.path / "cgroup.procs") if cgroup else None
+
+        def apply_limits():
+            if procs_file:
+                with open(procs_file, "w") as f:
+                    f.write(str(os.getpid()))
+
+            for limit, values in rlimits:
+                resource.setrlimit(limit, values)
+
+        return apply_limits
+
+    def _limit_spawned(self, pid: int, cgroup: Optional[_Cgroup], rlimits: List[Tuple[int, Tuple[int, int]]]):
+        """Move a just-spawned child into its cgroup and set its rlimits"""
+
+        try:
+            if cgroup:
+                (cgroup.path / "cgroup.procs").write_text(str(pid))
+
+            for limit, values in rlimits:
+                resource.prlimit(pid, limit, values)
+
+        except ProcessLookupError:
+            pass  # Already exited; check_exit() explains why
+        except OSError as e:
+            logger.warning(f"⚠️  Could not apply limits to pid {pid}: {e}")
+
+    def check_exit(self, process) -> Optional[ResourceLimitExceeded]:
+        """
+        If an exited child was killed by one of its limits, say which
+
+        Call before release(). The OOM killer usually picks the CLI, not
+        BridgeHub, which then exits with an ordinary error code, so the
+        cgroup's OOM count is checked whatever the code. A SIGKILL while a
+        CPU limit is set is taken as RLIMIT_CPU's hard limit, which follows
+        the ignored SIGXCPU after 5 seconds.
+        """
+
+        code = process.returncode
+        if not code:
+            return None
+
+        breach = None
+        cgroup = self.cgroups.get(process.pid)
+
+        if cgroup and cgroup.oom_kills() > cgroup.oom_kills_at_start:
+            breach = ResourceLimitExceeded("memory", self.limits.cgroup_memory_mb, "cgroup OOM kill")
+        elif code > 0:
+            return None
+        elif -code == signal.SIGXCPU:
+            breach = ResourceLimitExceeded("cpu_time", self.limits.cpu_seconds, f"signal {-code}")
+        elif -code == signal.SIGKILL and self.limits.cpu_seconds is not None:
+            breach = ResourceLimitExceeded("cpu_time", self.limits.cpu_seconds, "SIGKILL at the hard limit")
+        elif -code in _ALLOCATION_FAILURE_SIGNALS and self.limits.address_space_mb is not None:
+            breach = ResourceLimitExceeded("address_space", self.limits.address_space_mb, f"signal {-code}")
+
+        if breach:
+            self.breaches[breach.limit] = self.breaches.get(breach.limit, 0) + 1
+            logger.error(f"🧱 pid {process.pid}: {breach}")
+
+        return breach
+
+    def release(self, process):
+        """Forget an exited child and remove its cgroup"""
+
+        cgroup = self.cgroups.pop(process.pid, None)
+        if cgroup:
+            cgroup.remove()
+
+    def sweep(self) -> int:
+        """Remove cgroups whose processes have all exited; returns how many"""
+
+        removed = 0
+        for pid, cgroup in list(self.cgroups.items()):
+            try:
+                empty = not (cgroup.path / "cgroup.procs").read_text().strip()
+            except OSError:
+                empty = True
+
+            if empty:
+                cgroup.remove()
+                del self.cgroups[pid]
+                removed += 1
+
+        return removed
+
+    def get_stats(self) -> Dict:
+        """Get limit configuration and breach counts"""
+
+        return {
+            "limits": self.limits.to_dict(),
+            "cgroup_v2": self.cgroup_parent is not None,
+            "active_cgroups": len(self.cgroups),
+            "breaches": dict(self.breaches)
+        }
+
+
+# Global limiter shared by CLIProcessPool and BridgeHubClient
+process_limiter: Optional[ProcessLimiter] = None
+
+
+def get_process_limiter() -> ProcessLimiter:
+    """Get or create the global limiter, with limits from the BRIDGEHUB_* variables"""
+    global process_limiter
+
+    if process_limiter is None:
+        process_limiter = ProcessLimiter(ResourceLimits.from_env())
+
+    return process_limiter
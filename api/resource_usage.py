@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Resource Accounting for BuilderOS Mobile BridgeHub Executions
+
+Measures what each BridgeHub/CLI execution costs the Mac (user and system
+CPU, peak RSS, wall time, request and response bytes) and aggregates it per
+session and per agent type, so /api/health can show which chats are eating
+the machine.
+
+Measurement:
+- With psutil installed, the child's process tree is sampled while the turn
+  runs: CPU is the tree's delta (including reaped descendants), RSS is the
+  peak tree total. Works for warm workers that outlive the turn; for a
+  one-shot child that already exited, the reaped-children rusage covers the
+  tail after the last sample.
+- Without psutil, CPU and max RSS come from getrusage(RUSAGE_CHILDREN),
+  which only sees reaped children and, for RSS, keeps the largest one ever
+  reaped. They are reported only when they can belong to this execution: a
+  one-shot child reaped before stop() while no other execution was metered
+  (and, for RSS, only if the lifetime maximum rose). Otherwise they are None:
+  warm workers are never reaped mid-turn, and overlapping executions would
+  share the numbers.
+"""
+
+import asyncio
+import logging
+import re
+import resource
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+try:
+    import psutil
+except ImportError:  # Optional: precise per-tree accounting
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+USAGE_SOURCE = "psutil" if psutil else "rusage"
+
+RSS_SAMPLE_INTERVAL = 0.25  # Seconds between process tree samples
+MAX_TRACKED_SESSIONS = 200
+
+# ru_maxrss is bytes on macOS, kilobytes on Linux
+_MAXRSS_BYTES = 1 if sys.platform == "darwin" else 1024
+
+# vm_stat page counts that can be handed out without swapping
+_VM_STAT_AVAILABLE = ("Pages free", "Pages inactive", "Pages speculative")
+
+_memory_warned = False
+
+# Meters between start and stop, to tell whether reaped-children rusage is one execution's
+_running_meters: Set['UsageMeter'] = set()
+
+
+@dataclass
+class ExecutionUsage:
+    """Resources used by one BridgeHub/CLI execution (None: not measurable)"""
+    user_cpu_s: Optional[float] = None
+    system_cpu_s: Optional[float] = None
+    max_rss_mb: Optional[float] = None
+    wall_ms: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    source: str = USAGE_SOURCE
+
+    def combine(self, other: 'ExecutionUsage') -> 'ExecutionUsage':
+        """Usage of two attempts of the same turn (e.g. a resume retry)"""
+        return ExecutionUsage(
+            user_cpu_s=_sum_known(self.user_cpu_s, other.user_cpu_s),
+            system_cpu_s=_sum_known(self.system_cpu_s, other.system_cpu_s),
+            max_rss_mb=_max_known(self.max_rss_mb, other.max_rss_mb),
+            wall_ms=self.wall_ms + other.wall_ms,
+            bytes_in=self.bytes_in + other.bytes_in,
+            bytes_out=self.bytes_out + other.bytes_out,
+            source=self.source
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "user_cpu_s": _round(self.user_cpu_s, 3),
+            "system_cpu_s": _round(self.system_cpu_s, 3),
+            "max_rss_mb": _round(self.max_rss_mb, 1),
+            "wall_ms": round(self.wall_ms, 1),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "source": self.source
+        }
+
+
+def _sum_known(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """a + b, or whichever is known; None only if neither is"""
+    return b if a is None else a if b is None else a + b
+
+
+def _max_known(a: Optional[float], b: Optional[float]) -> Optional[float]:
+    """max(a, b) of the known values; None only if neither is"""
+    return b if a is None else a if b is None else max(a, b)
+
+
+def _round(value: Optional[float], digits: int) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def _children_rusage() -> Tuple[float, float, float]:
+    """(user CPU s, system CPU s, max RSS MB) of all reaped children"""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime, usage.ru_stime, usage.ru_maxrss * _MAXRSS_BYTES / 1e6
+
+
+def _tree_sample(root) -> Optional[Tuple[float, float, float]]:
+    """(user CPU s, system CPU s, RSS MB) of a psutil process and its descendants"""
+    try:
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None
+
+    user = system = rss = 0.0
+    for process in processes:
+        try:
+            cpu = process.cpu_times()
+            user += cpu.user + cpu.children_user
+            system += cpu.system + cpu.children_system
+            rss += process.memory_info().rss / 1e6
+        except psutil.Error:
+            continue  # Exited between listing and sampling
+
+    return user, system, rss
+
+
+def _proc_meminfo() -> Tuple[float, float]:
+    """(available MB, total MB) from /proc/meminfo (Linux)"""
+
+    fields = {}
+    with open("/proc/meminfo") as meminfo:
+        for line in meminfo:
+            key, _, value = line.partition(":")
+            fields[key] = int(value.split()[0])  # kB
+    return fields["MemAvailable"] / 1e3, fields["MemTotal"] / 1e3
+
+
+def _darwin_memory() -> Tuple[float, float]:
+    """(available MB, total MB) from `sysctl hw.memsize` and `vm_stat` (macOS)"""
+
+    def run(*command: str) -> str:
+        return subprocess.run(command, capture_output=True, text=True, check=True, timeout=2).stdout
+
+    total = int(run("sysctl", "-n", "hw.memsize"))
+    vm_stat = run("vm_stat")
+
+    page_size = int(re.search(r"page size of (\d+) bytes", vm_stat).group(1))
+    pages = {}
+    for line in vm_stat.splitlines()[1:]:
+        key, _, value = line.partition(":")
+        pages[key.strip()] = int(value.strip().rstrip("."))
+
+    available = sum(pages.get(key, 0) for key in _VM_STAT_AVAILABLE) * page_size
+    return available / 1e6, total / 1e6
+
+
+def host_memory() -> Optional[Tuple[float, float]]:
+    """
+    (available MB, total MB) on this host, or None if it cannot be read
+
+    Without it the pool neither evicts under memory pressure nor keeps hot
+    sessions longer, so the first failure is logged.
+    """
+    global _memory_warned
+
+    if psutil:
+        memory = psutil.virtual_memory()
+        return memory.available / 1e6, memory.total / 1e6
+
+    try:
+        return _darwin_memory() if sys.platform == "darwin" else _proc_meminfo()
+    except (OSError, subprocess.SubprocessError, AttributeError, KeyError, ValueError, IndexError) as e:
+        if not _memory_warned:
+            _memory_warned = True
+            logger.warning(
+                f"⚠️  Cannot read host memory ({e}); memory-pressure eviction and "
+                f"hot-session extension are off. Install psutil to fix this."
+            )
+        return None
+
+
+class UsageMeter:
+    """
+    Measures one execution of a BridgeHub child
+
+    Usage:
+        meter = UsageMeter(process)
+        ... run the turn ...
+        usage = meter.stop(bytes_in, bytes_out)
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.start_time = time.time()
+        self.root = None
+        self.sampler: Optional[asyncio.Task] = None
+        self.baseline: Optional[Tuple[float, float, float]] = None
+        self.last: Optional[Tuple[float, float, float]] = None
+        self.peak_rss_mb = 0.0
+        self.children_baseline = _children_rusage()
+
+        # Another execution's children may be reaped while we measure
+        self.overlapped = bool(_running_meters)
+        for meter in _running_meters:
+            meter.overlapped = True
+        _running_meters.add(self)
+
+        if psutil:
+            try:
+                self.root = psutil.Process(process.pid)
+                self.baseline = self.last = _tree_sample(self.root)
+            except psutil.Error:
+                self.root = None
+
+        if self.root and self.baseline:
+            self.sampler = asyncio.create_task(self._sample_loop())
+
+    async def _sample_loop(self):
+        """Track the tree's latest CPU and peak RSS while the turn runs"""
+        while True:
+            sample = _tree_sample(self.root)
+            if sample is None:
+                return
+            self.last = sample
+            self.peak_rss_mb = max(self.peak_rss_mb, sample[2])
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+
+    def stop(self, bytes_in: int = 0, bytes_out: int = 0) -> ExecutionUsage:
+        """Finish the measurement and return what the execution used"""
+
+        _running_meters.discard(self)
+
+        usage = ExecutionUsage(
+            wall_ms=(time.time() - self.start_time) * 1000,
+            bytes_in=bytes_in,
+            bytes_out=bytes_out
+        )
+
+        user, system, max_rss_mb = _children_rusage()
+        # Reaped-children rusage is ours only if our child was reaped and nothing overlapped
+        attributable = self.process.returncode is not None and not self.overlapped
+        reaped = (user - self.children_baseline[0], system - self.children_baseline[1])
+
+        if self.sampler:
+            self.sampler.cancel()
+            sample = _tree_sample(self.root)
+
+            if sample is None:
+                # Exited (one-shot): the reaped child's rusage includes the
+                # tail after our last sample
+                sample = self.last
+                usage.user_cpu_s = sample[0] - self.baseline[0]
+                usage.system_cpu_s = sample[1] - self.baseline[1]
+                if attributable:
+                    usage.user_cpu_s = max(usage.user_cpu_s, reaped[0])
+                    usage.system_cpu_s = max(usage.system_cpu_s, reaped[1])
+            else:
+                usage.user_cpu_s = max(0.0, sample[0] - self.baseline[0])
+                usage.system_cpu_s = max(0.0, sample[1] - self.baseline[1])
+
+            usage.max_rss_mb = max(self.peak_rss_mb, sample[2])
+        else:
+            usage.source = "rusage"
+            if attributable:
+                usage.user_cpu_s, usage.system_cpu_s = reaped
+                # A lifetime maximum: it is this child's peak only if it rose
+                if max_rss_mb > self.children_baseline[2]:
+                    usage.max_rss_mb = max_rss_mb
+
+        return usage
+
+
+class UsageTotals:
+    """Running totals for a group of executions (CPU and RSS over the measured ones)"""
+
+    def __init__(self):
+        self.executions = 0
+        self.unmeasured = 0
+        self.user_cpu_s = 0.0
+        self.system_cpu_s = 0.0
+        self.wall_ms = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.peak_rss_mb = 0.0
+
+    @property
+    def cpu_s(self) -> float:
+        return self.user_cpu_s + self.system_cpu_s
+
+    def add(self, usage: ExecutionUsage):
+        self.executions += 1
+        if usage.user_cpu_s is None:
+            self.unmeasured += 1
+        else:
+            self.user_cpu_s += usage.user_cpu_s
+            self.system_cpu_s += usage.system_cpu_s or 0.0
+        self.wall_ms += usage.wall_ms
+        self.bytes_in += usage.bytes_in
+        self.bytes_out += usage.bytes_out
+        if usage.max_rss_mb is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb, usage.max_rss_mb)
+
+    def to_dict(self) -> Dict:
+        return {
+            "executions": self.executions,
+            "unmeasured": self.unmeasured,
+            "user_cpu_s": round(self.user_cpu_s, 3),
+            "system_cpu_s": round(self.system_cpu_s, 3),
+            "wall_s": round(self.wall_ms / 1000, 2),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "peak_rss_mb": round(self.peak_rss_mb, 1)
+        }
+
+
+class UsageLedger:
+    """Aggregates execution usage per session and per agent type"""
+
+    def __init__(self, max_sessions: int = MAX_TRACKED_SESSIONS):
+        self.max_sessions = max_sessions
+        self.total = UsageTotals()
+        self.by_agent: Dict[str, UsageTotals] = {}
+
+        # Most recently active sessions last
+        self.by_session: "OrderedDict[str, UsageTotals]" = OrderedDict()
+
+    def record(self, session_id: str, agent_type: str, usage: ExecutionUsage):
+        """Add one execution's usage to the totals"""
+
+        self.total.add(usage)
+        self.by_agent.setdefault(agent_type, UsageTotals()).add(usage)
+
+        totals = self.by_session.pop(session_id, None) or UsageTotals()
+        totals.add(usage)
+        self.by_session[session_id] = totals
+
+        while len(self.by_session) > self.max_sessions:
+            self.by_session.popitem(last=False)
+
+        cpu = "n/a" if usage.user_cpu_s is None else f"{usage.user_cpu_s + (usage.system_cpu_s or 0.0):.2f}s"
+        rss = "n/a" if usage.max_rss_mb is None else f"{usage.max_rss_mb:.0f}MB"
+        logger.info(
+            f"📊 {agent_type} session {session_id[:8]}: "
+            f"cpu {cpu}, rss {rss}, wall {usage.wall_ms:.0f}ms, "
+            f"{usage.bytes_in}B in / {usage.bytes_out}B out"
+        )
+
+    def session_stats(self, session_id: str) -> Optional[Dict]:
+        """Totals for one session, if it has run anything"""
+
+        totals = self.by_session.get(session_id)
+        return totals.to_dict() if totals else None
+
+    def get_stats(self, top: int = 10) -> Dict:
+        """Get usage statistics, with the heaviest sessions by CPU"""
+
+        heaviest = sorted(self.by_session.items(), key=lambda item: item[1].cpu_s, reverse=True)
+
+        return {
+            "source": USAGE_SOURCE,
+            "total": self.total.to_dict(),
+            "by_agent": {agent: totals.to_dict() for agent, totals in self.by_agent.items()},
+            # Ids cut like the pool's: /api/health is unauthenticated
+            "top_sessions": [
+                {"session_id": session_id[:16] + "...", **totals.to_dict()}
+                for session_id, totals in heaviest[:top]
+            ]
+        }
+
+
+# Global usage ledger shared by CLIProcessPool and BridgeHubClient
+usage_ledger: Optional[UsageLedger] = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Get or create the global usage ledger"""
+    global usage_ledger
+
+    if usage_ledger is None:
+        usage_ledger = UsageLedger()
+
+    return usage_ledger
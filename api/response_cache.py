@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Response Cache for BuilderOS Mobile
+
+Quick actions fire the same status-style prompts ("what's running", "system
+status") many times a day, and each one costs a full BridgeHub/CLI run. A
+client can opt a message into this cache; a hit is replayed straight into the
+WebSocket stream without spawning anything.
+
+Entries are keyed by a hash of agent type, prompt, working directory and a
+context fingerprint, expire after a TTL, and are evicted least-recently-used
+once the cache is full. Only complete, non-cancelled answers are stored.
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300.0
+MAX_TTL_SECONDS = 3600.0
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass
+class CacheOptions:
+    """What a message asked of the cache"""
+    ttl: float = DEFAULT_TTL_SECONDS
+    fingerprint: str = ""  # Client-chosen context fingerprint, if any
+
+    @classmethod
+    def from_message(cls, value: Any) -> Optional['CacheOptions']:
+        """
+        Parse the "cache" field of a WebSocket message
+
+        Accepts `true` or `{"ttl": seconds, "fingerprint": "..."}`; anything
+        else (including a missing field) means the message is not cached.
+        """
+        if value is True:
+            return cls()
+
+        if not isinstance(value, dict):
+            return None
+
+        options = cls()
+        ttl = value.get("ttl")
+        if isinstance(ttl, (int, float)) and ttl > 0:
+            options.ttl = min(float(ttl), MAX_TTL_SECONDS)
+
+        fingerprint = value.get("fingerprint")
+        if isinstance(fingerprint, str):
+            options.fingerprint = fingerprint
+
+        return options
+
+
+def context_fingerprint(*parts: str) -> str:
+    """Short digest of context (e.g. CLAUDE.md) that should invalidate entries"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def cache_key(agent_type: str, prompt: str, cwd: str, fingerprint: str = "") -> str:
+    """Hash of everything that determines a cacheable answer"""
+    return context_fingerprint(agent_type, prompt.strip(), cwd, fingerprint)
+
+
+@dataclass
+class _Entry:
+    response: str
+    expires_at: float
+    created_at: float
+
+
+class ResponseCache:
+    """TTL + LRU cache of complete agent responses"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None if missing or expired"""
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.time():
+            del self.entries[key]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        logger.info(f"♻️  Response cache hit ({key[:8]}, {time.time() - entry.created_at:.0f}s old)")
+        return entry.response
+
+    def put(self, key: str, response: str, ttl: float = DEFAULT_TTL_SECONDS):
+        """Store a complete response, evicting the least recently used entries"""
+
+        now = time.time()
+        self.entries[key] = _Entry(response=response, expires_at=now + ttl, created_at=now)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+        logger.debug(f"♻️  Response cached ({key[:8]}, {len(response)} chars, ttl {ttl:.0f}s)")
+
+    def purge_expired(self) -> int:
+        """Drop expired entries; returns how many were removed"""
+
+        now = time.time()
+        expired = [key for key, entry in self.entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self.entries[key]
+        return len(expired)
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+
+        self.purge_expired()
+        lookups = self.hits + self.misses
+
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+# Global response cache
+response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the global response cache"""
+    global response_cache
+
+    if response_cache is None:
+        response_cache = ResponseCache()
+
+    return response_cache
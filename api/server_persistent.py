@@ -14,18 +14,30 @@ import json
 import logging
 import os
 import sys
+from contextlib import aclosing
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Set, Optional, List, Dict, Any
+from typing import AsyncIterator, Awaitable, Callable, Set, Optional, List, Dict, Any
 
 from aiohttp import web, WSMsgType
 
 # Import session management, BridgeHub client, and CLI process pool
 sys.path.insert(0, str(Path(__file__).parent))
-from session_manager import SessionManager, Session
+from session_manager import DEFAULT_HISTORY_TOKENS, Message, SessionManager, Session
 from bridgehub_client import BridgeHubClient
+from bridgehub_daemon import get_daemon_pool
 from performance_trace import create_trace, cleanup_old_traces
 from cli_process_pool import get_cli_pool, CLIProcessPool
+from admission_control import PRIORITY_INTERACTIVE, QueuePositionCallback, get_admission_controller, normalize_priority
+from bridgehub_request import DEFAULT_CAPSULE
+from response_cache import CacheOptions, cache_key, context_fingerprint, get_response_cache
+from inflight_messages import InflightMessage, get_inflight_registry
+from resource_usage import get_usage_ledger
+from process_control import ExecutionError
+from stderr_capture import get_stderr_log
+from stream_buffer import buffered, get_backpressure_stats
+from worker_nodes import get_node_cluster
 import uuid
 
 # Configure logging
@@ -88,12 +100,311 @@ async def authenticate_websocket(ws: web.WebSocketResponse) -> bool:
         return False
 
 
+def completion_message(
+    session: Session,
+    cancelled: bool = False,
+    cached: bool = False,
+    replayed: bool = False
+) -> Dict[str, Any]:
+    """Build the message that ends a streamed response"""
+
+    return {
+        "type": "complete",
+        "content": "Response cancelled" if cancelled else "Response complete",
+        "timestamp": datetime.now().isoformat(),
+        "message_count": len(session.messages),
+        "cancelled": cancelled,
+        "cached": cached,
+        "replayed": replayed
+    }
+
+
+def error_message(error: Exception) -> Dict[str, Any]:
+    """Build the message that reports a failed response"""
+
+    message = {
+        "type": "error",
+        "content": f"Error: {str(error)}",
+        "timestamp": datetime.now().isoformat()
+    }
+
+    # Structured failures (e.g. a resource limit) tell the client what happened
+    if isinstance(error, ExecutionError):
+        message["code"] = error.code
+        message["details"] = error.details
+
+    return message
+
+
+def turn_metadata(message_id: Optional[str], **fields) -> Optional[Dict[str, Any]]:
+    """Metadata for a session message: non-empty fields plus the client message id"""
+
+    metadata = {key: value for key, value in fields.items() if value}
+    if message_id:
+        metadata["message_id"] = message_id
+    return metadata or None
+
+
+async def send_frame(
+    ws: web.WebSocketResponse,
+    frame: Dict[str, Any],
+    inflight: Optional[InflightMessage] = None
+):
+    """
+    Send a frame to the client and to anyone following the same message
+
+    A closed socket is skipped rather than treated as an error: with a
+    message id the execution outlives the connection that started it.
+    """
+
+    if inflight:
+        inflight.publish(frame)
+
+    if ws.closed:
+        return
+
+    try:
+        await ws.send_json(frame)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to send {frame.get('type')} frame: {e}")
+
+
+async def replay_turn(
+    ws: web.WebSocketResponse,
+    session: Session,
+    reply: Message,
+    inflight: Optional[InflightMessage] = None
+):
+    """Answer a resent message from the reply already in the session"""
+
+    get_inflight_registry().record_replay(inflight.message_id if inflight else "")
+
+    await send_frame(ws, {
+        "type": "message",
+        "content": reply.content,
+        "timestamp": datetime.now().isoformat()
+    }, inflight)
+
+    cancelled = bool(reply.metadata and reply.metadata.get("cancelled"))
+    await send_frame(ws, completion_message(session, cancelled, replayed=True), inflight)
+
+
+async def follow_inflight(ws: web.WebSocketResponse, inflight: InflightMessage):
+    """Stream a resent message's running execution instead of starting another"""
+
+    try:
+        async for frame in inflight.follow():
+            await send_frame(ws, frame)
+
+    except asyncio.CancelledError:
+        # An explicit cancel from any attached client stops the execution
+        if inflight.task and not inflight.task.done():
+            inflight.task.cancel()
+        raise
+
+
+async def run_inflight(inflight: InflightMessage, handler: Callable[[], Awaitable[None]]):
+    """Run a message's handler, releasing followers once its reply is saved"""
+
+    try:
+        await handler()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        inflight.publish(error_message(e))
+        raise
+    finally:
+        get_inflight_registry().finish(inflight)
+
+
+def response_cache_key(agent_type: str, user_message: str, cache: CacheOptions, system_context: str = "") -> str:
+    """Cache key for an opted-in message; CLAUDE.md changes invalidate it"""
+
+    fingerprint = context_fingerprint(system_context, cache.fingerprint)
+    return cache_key(agent_type, user_message, DEFAULT_CAPSULE, fingerprint)
+
+
+async def replay_cached(response: str) -> AsyncIterator[str]:
+    """Stream a cached response the same way a live one is streamed"""
+
+    yield response
+
+
+def queue_position_notifier(ws: web.WebSocketResponse) -> QueuePositionCallback:
+    """Build a callback that tells the client where its message is queued"""
+
+    async def notify(position: int):
+        if ws.closed:
+            return
+
+        await ws.send_json({
+            "type": "queued",
+            "content": f"Waiting for a free agent slot (position {position})",
+            "position": position,
+            "timestamp": datetime.now().isoformat()
+        })
+
+    return notify
+
+
+class ConnectionTasks:
+    """
+    Runs a WebSocket connection's messages as cancellable tasks
+
+    Messages are still handled one at a time, in arrival order, but the
+    receive loop stays free to read control messages such as cancel.
+
+    Detached tasks are cancelled by an explicit cancel but keep running
+    when the connection closes, until the server shuts down.
+    """
+
+    # Detached tasks that outlived their connection
+    orphans: Set[asyncio.Task] = set()
+
+    def __init__(self, ws: web.WebSocketResponse):
+        self.ws = ws
+        self.tasks: List[asyncio.Task] = []
+        self.detached: Set[asyncio.Task] = set()
+
+    def submit(self, handler: Callable[[], Awaitable[None]], detached: bool = False) -> asyncio.Task:
+        """Queue a message handler behind any message already in flight"""
+
+        previous = self.tasks[-1] if self.tasks else None
+        task = asyncio.create_task(self._run_after(previous, handler))
+        self.tasks.append(task)
+        task.add_done_callback(self.tasks.remove)
+
+        if detached:
+            self.detached.add(task)
+            task.add_done_callback(self.detached.discard)
+
+        return task
+
+    async def _run_after(self, previous: Optional[asyncio.Task], handler: Callable[[], Awaitable[None]]):
+        if previous:
+            await asyncio.wait([previous])
+
+        try:
+            await handler()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error processing message: {e}", exc_info=True)
+            if not self.ws.closed:
+                await self.ws.send_json({
+                    "type": "error",
+                    "content": str(e),
+                    "timestamp": datetime.now().isoformat()
+                })
+
+    def cancel(self) -> int:
+        """Cancel the in-flight message and any queued behind it"""
+
+        pending = [task for task in self.tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        return len(pending)
+
+    async def close(self):
+        """Cancel attached work and wait for partial responses to be saved"""
+
+        pending = [task for task in self.tasks if task not in self.detached]
+        for task in pending:
+            task.cancel()
+
+        for task in self.detached:
+            ConnectionTasks.orphans.add(task)
+            task.add_done_callback(ConnectionTasks.orphans.discard)
+
+        if pending:
+            await asyncio.wait(pending)
+
+    @classmethod
+    async def cancel_orphans(cls, timeout: float = 5.0) -> int:
+        """
+        Cancel detached tasks that outlived their connections and wait for them
+
+        Called on shutdown, before the pool stops, so their partial responses
+        are saved and their children are not left running.
+
+        Returns:
+            Number of tasks cancelled
+        """
+
+        pending = [task for task in cls.orphans if not task.done()]
+        for task in pending:
+            task.cancel()
+
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        return len(pending)
+
+
+async def warm_session(ws: web.WebSocketResponse, agent_type: str, data: Dict[str, Any]):
+    """
+    Handle a warm event: the user opened a chat or started typing
+
+    Reserves a worker for the session in the background and acknowledges
+    at once with its status, so nothing is left to spawn when the message
+    arrives.
+    """
+
+    session_id = data.get("session_id")
+    if not isinstance(session_id, str) or not session_id:
+        session_id = None
+
+    cli_pool = await get_cli_pool()
+    status = cli_pool.warm(agent_type, session_id)
+    logger.debug(f"🔥 Warm {agent_type} session {(session_id or '-')[:8]}: {status}")
+
+    await send_frame(ws, {
+        "type": "warm",
+        "content": status,
+        "session_id": session_id,
+        "timestamp": datetime.now().isoformat()
+    })
+
+
+def submit_message(
+    tasks: ConnectionTasks,
+    ws: web.WebSocketResponse,
+    session_id: str,
+    message_id: Optional[str],
+    handler: Callable[..., Awaitable[None]]
+):
+    """
+    Queue a message handler, coalescing resends of the same message id
+
+    Messages with an id run detached from the connection, so a reconnect
+    that resends the message can attach to the execution still in flight.
+    """
+
+    if not message_id:
+        tasks.submit(handler)
+        return
+
+    registry = get_inflight_registry()
+    inflight = registry.get(message_id)
+    if inflight:
+        tasks.submit(partial(follow_inflight, ws, inflight), detached=True)
+        return
+
+    inflight = registry.start(message_id, session_id)
+    inflight.task = tasks.submit(
+        partial(run_inflight, inflight, partial(handler, inflight=inflight)),
+        detached=True
+    )
+
+
 async def handle_claude_session(
     ws: web.WebSocketResponse,
     user_message: str,
     session_id: str,
     device_id: str,
-    attachments: Optional[List[Dict[str, Any]]] = None
+    attachments: Optional[List[Dict[str, Any]]] = None,
+    cache: Optional[CacheOptions] = None,
+    inflight: Optional[InflightMessage] = None,
+    priority: str = PRIORITY_INTERACTIVE
 ):
     """
     Handle message in Claude (Jarvis) session
@@ -125,96 +436,127 @@ async def handle_claude_session(
 
     logger.info(f"📚 Session has {len(session.messages)} messages in history")
 
-    # Add user message to history
     attachment_metadata = attachments or []
     if attachment_metadata:
         logger.info(f"📎 Received {len(attachment_metadata)} attachment(s) for session {session_id}")
 
-    session.add_message(
-        role="user",
-        content=user_message,
-        metadata={"attachments": attachment_metadata} if attachment_metadata else None
-    )
+    # A resent message is answered once: replay a saved reply, and never
+    # add its user turn twice
+    message_id = inflight.message_id if inflight else None
+    user_turn, reply = session.find_turn(message_id) if message_id else (None, None)
+    if reply:
+        await replay_turn(ws, session, reply, inflight)
+        return
+
+    # Add user message to history
+    if user_turn:
+        logger.info(f"🔁 Re-running unanswered message {message_id[:8]}")
+    else:
+        session.add_message(
+            role="user",
+            content=user_message,
+            metadata=turn_metadata(message_id, attachments=attachment_metadata)
+        )
 
     # Get conversation history for context
-    conversation_history = session.get_conversation_history(max_messages=50)
+    conversation_history = session.get_conversation_history(max_tokens=DEFAULT_HISTORY_TOKENS)
     trace.mark("history_prepared")
 
+    # Opt-in response cache (quick actions); attachments make a turn unique
+    response_key = None
+    cached_response = None
+    if cache and not attachment_metadata:
+        response_key = response_cache_key("claude", user_message, cache, session.system_context)
+        cached_response = get_response_cache().get(response_key)
+
     # Call BridgeHub and stream response
     full_response = ""
     chunk_count = 0
+    turn_complete = asyncio.Event()  # Set by the pool once the final payload reports success
     first_chunk_received = False
+    cancelled = False
 
     try:
         trace.mark("bridgehub_call_start")
 
-        # Get CLI process pool
-        cli_pool = await get_cli_pool()
-
-        # Execute via process pool (manages persistent processes)
-        async for chunk in cli_pool.execute_message(
-            session_id=session_id,
-            agent_type="claude",
-            message=user_message,
-            conversation_history=conversation_history,
-            system_context=session.system_context,
-            attachments=attachment_metadata
-        ):
-            # Mark first chunk timing
-            if not first_chunk_received:
-                trace.mark("first_chunk_received")
-                first_chunk_received = True
-
-            # Stream chunk to iOS
-            chunk_msg = {
-                "type": "message",
-                "content": chunk,
-                "timestamp": datetime.now().isoformat()
-            }
-            await ws.send_json(chunk_msg)
-
-            # Accumulate for session history
-            full_response += chunk
-            chunk_count += 1
-
-            # Small delay to simulate streaming
-            await asyncio.sleep(0.05)
+        if cached_response is not None:
+            trace.mark("response_cache_hit")
+            source = replay_cached(cached_response)
+        else:
+            # Get CLI process pool
+            cli_pool = await get_cli_pool()
+
+            # Execute via process pool (manages persistent processes)
+            source = cli_pool.execute_message(
+                session_id=session_id,
+                agent_type="claude",
+                message=user_message,
+                conversation_history=conversation_history,
+                system_context=session.system_context,
+                attachments=attachment_metadata,
+                device_id=device_id,
+                on_queued=queue_position_notifier(ws),
+                session_state=session.metadata,
+                trace=trace,
+                priority=priority,
+                on_complete=turn_complete.set
+            )
+
+        # aclosing() makes a cancel kill the BridgeHub/CLI tree right away
+        # instead of whenever the generator is garbage collected. buffered()
+        # keeps reading the CLI while a slow phone is still being sent to.
+        async with aclosing(buffered(source, trace=trace)) as chunks:
+            async for chunk in chunks:
+                # Mark first chunk timing
+                if not first_chunk_received:
+                    trace.mark("first_chunk_received")
+                    first_chunk_received = True
+
+                # Stream chunk to iOS
+                chunk_msg = {
+                    "type": "message",
+                    "content": chunk,
+                    "timestamp": datetime.now().isoformat()
+                }
+                await send_frame(ws, chunk_msg, inflight)
+
+                # Accumulate for session history
+                full_response += chunk
+                chunk_count += 1
 
         trace.mark("bridgehub_call_complete")
         logger.info(f"✅ Streamed {chunk_count} chunks to client")
 
+    except asyncio.CancelledError:
+        # Keep the partial answer; the process tree is already gone
+        cancelled = True
+        trace.mark("execution_cancelled")
+        logger.info(f"🛑 Claude response cancelled after {chunk_count} chunks")
+
     except Exception as e:
         logger.error(f"❌ Error during BridgeHub call: {e}", exc_info=True)
 
-        # Only send error if WebSocket is still open
-        if not ws.closed:
-            error_msg = {
-                "type": "error",
-                "content": f"Error: {str(e)}",
-                "timestamp": datetime.now().isoformat()
-            }
-            try:
-                await ws.send_json(error_msg)
-            except Exception as send_error:
-                logger.error(f"❌ Failed to send error message: {send_error}")
+        await send_frame(ws, error_message(e), inflight)
         return
 
     # Add assistant response to history
-    session.add_message(role="assistant", content=full_response)
+    session.add_message(
+        role="assistant",
+        content=full_response,
+        metadata=turn_metadata(message_id, cancelled=cancelled)
+    )
     trace.mark("response_saved_to_session")
 
+    # Only answers whose final payload succeeded; a replayed hit never sets it
+    if response_key and turn_complete.is_set() and not cancelled and full_response:
+        get_response_cache().put(response_key, full_response, cache.ttl)
+
     # Persist session to database
     session_manager.persist_session(session)
     trace.mark("session_persisted_to_db")
 
     # Send completion message
-    complete_msg = {
-        "type": "complete",
-        "content": "Response complete",
-        "timestamp": datetime.now().isoformat(),
-        "message_count": len(session.messages)
-    }
-    await ws.send_json(complete_msg)
+    await send_frame(ws, completion_message(session, cancelled, cached_response is not None), inflight)
     trace.mark("completion_sent_to_client")
 
     logger.info(f"💾 Session persisted ({len(session.messages)} messages total)")
@@ -231,7 +573,10 @@ async def handle_codex_session(
     user_message: str,
     session_id: str,
     device_id: str,
-    attachments: Optional[List[Dict[str, Any]]] = None
+    attachments: Optional[List[Dict[str, Any]]] = None,
+    cache: Optional[CacheOptions] = None,
+    inflight: Optional[InflightMessage] = None,
+    priority: str = PRIORITY_INTERACTIVE
 ):
     """
     Handle message in Codex session
@@ -257,91 +602,108 @@ async def handle_codex_session(
 
     logger.info(f"📚 Session has {len(session.messages)} messages in history")
 
-    # Add user message to history
     attachment_metadata = attachments or []
     if attachment_metadata:
         logger.info(f"📎 (Codex) Received {len(attachment_metadata)} attachment(s) for session {session_id}")
 
-    session.add_message(
-        role="user",
-        content=user_message,
-        metadata={"attachments": attachment_metadata} if attachment_metadata else None
-    )
+    # A resent message is answered once: replay a saved reply, and never
+    # add its user turn twice
+    message_id = inflight.message_id if inflight else None
+    user_turn, reply = session.find_turn(message_id) if message_id else (None, None)
+    if reply:
+        await replay_turn(ws, session, reply, inflight)
+        return
+
+    # Add user message to history
+    if user_turn:
+        logger.info(f"🔁 Re-running unanswered message {message_id[:8]}")
+    else:
+        session.add_message(
+            role="user",
+            content=user_message,
+            metadata=turn_metadata(message_id, attachments=attachment_metadata)
+        )
 
     # Get conversation history
-    conversation_history = session.get_conversation_history(max_messages=50)
+    conversation_history = session.get_conversation_history(max_tokens=DEFAULT_HISTORY_TOKENS)
+
+    # Opt-in response cache (quick actions); attachments make a turn unique
+    response_key = None
+    cached_response = None
+    if cache and not attachment_metadata:
+        response_key = response_cache_key("codex", user_message, cache)
+        cached_response = get_response_cache().get(response_key)
 
     # Call BridgeHub and stream response
     full_response = ""
     chunk_count = 0
+    turn_complete = asyncio.Event()  # Set by the pool once the final payload reports success
+    cancelled = False
 
     try:
-        # Get CLI process pool
-        cli_pool = await get_cli_pool()
-
-        # Execute via process pool (manages persistent processes)
-        async for chunk in cli_pool.execute_message(
-            session_id=session_id,
-            agent_type="codex",
-            message=user_message,
-            conversation_history=conversation_history,
-            system_context="",  # Codex doesn't use CLAUDE.md
-            attachments=attachment_metadata
-        ):
-            # Check if WebSocket is still open before sending
-            if ws.closed:
-                logger.warning("⚠️ WebSocket closed during Codex response streaming")
-                break
-
-            # Stream chunk to iOS
-            chunk_msg = {
-                "type": "message",
-                "content": chunk,
-                "timestamp": datetime.now().isoformat()
-            }
-
-            try:
-                await ws.send_json(chunk_msg)
-            except Exception as send_error:
-                logger.error(f"❌ Failed to send chunk: {send_error}")
-                break
-
-            full_response += chunk
-            chunk_count += 1
-            await asyncio.sleep(0.05)
+        if cached_response is not None:
+            source = replay_cached(cached_response)
+        else:
+            # Get CLI process pool
+            cli_pool = await get_cli_pool()
+
+            # Execute via process pool (manages persistent processes)
+            source = cli_pool.execute_message(
+                session_id=session_id,
+                agent_type="codex",
+                message=user_message,
+                conversation_history=conversation_history,
+                system_context="",  # Codex doesn't use CLAUDE.md
+                attachments=attachment_metadata,
+                device_id=device_id,
+                on_queued=queue_position_notifier(ws),
+                session_state=session.metadata,
+                priority=priority,
+                on_complete=turn_complete.set
+            )
+
+        async with aclosing(buffered(source)) as chunks:
+            async for chunk in chunks:
+                # Stream chunk to iOS
+                chunk_msg = {
+                    "type": "message",
+                    "content": chunk,
+                    "timestamp": datetime.now().isoformat()
+                }
+                await send_frame(ws, chunk_msg, inflight)
+
+                full_response += chunk
+                chunk_count += 1
 
         logger.info(f"✅ Streamed {chunk_count} chunks to client")
 
+    except asyncio.CancelledError:
+        # Keep the partial answer; the process tree is already gone
+        cancelled = True
+        logger.info(f"🛑 Codex response cancelled after {chunk_count} chunks")
+
     except Exception as e:
         logger.error(f"❌ Error during BridgeHub call: {e}", exc_info=True)
 
-        # Only send error if WebSocket is still open
-        if not ws.closed:
-            error_msg = {
-                "type": "error",
-                "content": f"Error: {str(e)}",
-                "timestamp": datetime.now().isoformat()
-            }
-            try:
-                await ws.send_json(error_msg)
-            except Exception as send_error:
-                logger.error(f"❌ Failed to send error message: {send_error}")
+        await send_frame(ws, error_message(e), inflight)
         return
 
     # Add assistant response to history
-    session.add_message(role="assistant", content=full_response)
+    session.add_message(
+        role="assistant",
+        content=full_response,
+        metadata=turn_metadata(message_id, cancelled=cancelled)
+    )
+
+    # Only answers whose final payload succeeded; a replayed hit never sets it
+    if response_key and turn_complete.is_set() and not cancelled and full_response:
+        get_response_cache().put(response_key, full_response, cache.ttl)
 
     # Persist session
     session_manager.persist_session(session)
 
     # Send completion
-    complete_msg = {
-        "type": "complete",
-        "content": "Response complete",
-        "timestamp": datetime.now().isoformat(),
-        "message_count": len(session.messages)
-    }
-    await ws.send_json(complete_msg)
+    await send_frame(ws, completion_message(session, cancelled, cached_response is not None), inflight)
 
     logger.info(f"💾 Session persisted ({len(session.messages)} messages total)")
 
@@ -362,6 +724,7 @@ async def claude_websocket_handler(request):
 
     # Add to active connections
     claude_connections.add(ws)
+    tasks = ConnectionTasks(ws)
 
     # Send ready message
     ready_msg = {
@@ -371,22 +734,42 @@ async def claude_websocket_handler(request):
         "features": {
             "session_persistence": True,
             "bridgehub_integration": True,
-            "agent_coordination": True
+            "agent_coordination": True,
+            "response_cache": True,
+            "warm": True
         }
     }
     await ws.send_json(ready_msg)
 
+    # Connecting is the first sign a message is coming
+    (await get_cli_pool()).warm("claude")
+
     try:
         async for msg in ws:
             if msg.type == WSMsgType.TEXT:
                 try:
                     # Parse incoming message
                     data = json.loads(msg.data)
+
+                    if data.get("type") == "cancel":
+                        cancelled = tasks.cancel()
+                        logger.info(f"🛑 Claude cancel requested ({cancelled} in-flight)")
+                        continue
+
+                    if data.get("type") == "warm":
+                        await warm_session(ws, "claude", data)
+                        continue
+
                     user_message = data.get("content", "")
                     session_id = data.get("session_id", "default-claude-session")
                     device_id = data.get("device_id", "unknown-device")
                     raw_attachments = data.get("attachments", [])
 
+                    # Client id that makes resends idempotent (optional)
+                    message_id = data.get("message_id")
+                    if not isinstance(message_id, str) or not message_id:
+                        message_id = None
+
                     attachments: List[Dict[str, Any]] = []
                     if isinstance(raw_attachments, list):
                         attachments = [item for item in raw_attachments if isinstance(item, dict)]
@@ -397,14 +780,17 @@ async def claude_websocket_handler(request):
 
                     logger.info(f"📬 Claude received: {user_message[:60]}... (session: {session_id})")
 
-                    # Handle message in session
-                    await handle_claude_session(
+                    # Handle message in session (as a task, so cancel can interrupt it)
+                    submit_message(tasks, ws, session_id, message_id, partial(
+                        handle_claude_session,
                         ws=ws,
                         user_message=user_message,
                         session_id=session_id,
                         device_id=device_id,
-                        attachments=attachments
-                    )
+                        attachments=attachments,
+                        cache=CacheOptions.from_message(data.get("cache")),
+                        priority=normalize_priority(data.get("priority"))
+                    ))
 
                 except json.JSONDecodeError:
                     logger.warning("⚠️ Invalid JSON received")
@@ -428,6 +814,7 @@ async def claude_websocket_handler(request):
                 logger.error(f"❌ WebSocket error: {ws.exception()}")
 
     finally:
+        await tasks.close()
         claude_connections.discard(ws)
         logger.info("👋 Claude WebSocket disconnected")
 
@@ -450,6 +837,7 @@ async def codex_websocket_handler(request):
 
     # Add to active connections
     codex_connections.add(ws)
+    tasks = ConnectionTasks(ws)
 
     # Send ready message
     ready_msg = {
@@ -459,22 +847,42 @@ async def codex_websocket_handler(request):
         "features": {
             "session_persistence": True,
             "bridgehub_integration": True,
-            "independent_context": True
+            "independent_context": True,
+            "response_cache": True,
+            "warm": True
         }
     }
     await ws.send_json(ready_msg)
 
+    # Connecting is the first sign a message is coming
+    (await get_cli_pool()).warm("codex")
+
     try:
         async for msg in ws:
             if msg.type == WSMsgType.TEXT:
                 try:
                     # Parse incoming message
                     data = json.loads(msg.data)
+
+                    if data.get("type") == "cancel":
+                        cancelled = tasks.cancel()
+                        logger.info(f"🛑 Codex cancel requested ({cancelled} in-flight)")
+                        continue
+
+                    if data.get("type") == "warm":
+                        await warm_session(ws, "codex", data)
+                        continue
+
                     user_message = data.get("content", "")
                     session_id = data.get("session_id", "default-codex-session")
                     device_id = data.get("device_id", "unknown-device")
                     raw_attachments = data.get("attachments", [])
 
+                    # Client id that makes resends idempotent (optional)
+                    message_id = data.get("message_id")
+                    if not isinstance(message_id, str) or not message_id:
+                        message_id = None
+
                     attachments: List[Dict[str, Any]] = []
                     if isinstance(raw_attachments, list):
                         attachments = [item for item in raw_attachments if isinstance(item, dict)]
@@ -485,14 +893,17 @@ async def codex_websocket_handler(request):
 
                     logger.info(f"📬 Codex received: {user_message[:60]}... (session: {session_id})")
 
-                    # Handle message in session
-                    await handle_codex_session(
+                    # Handle message in session (as a task, so cancel can interrupt it)
+                    submit_message(tasks, ws, session_id, message_id, partial(
+                        handle_codex_session,
                         ws=ws,
                         user_message=user_message,
                         session_id=session_id,
                         device_id=device_id,
-                        attachments=attachments
-                    )
+                        attachments=attachments,
+                        cache=CacheOptions.from_message(data.get("cache")),
+                        priority=normalize_priority(data.get("priority"))
+                    ))
 
                 except json.JSONDecodeError:
                     logger.warning("⚠️ Invalid JSON received")
@@ -516,6 +927,7 @@ async def codex_websocket_handler(request):
                 logger.error(f"❌ WebSocket error: {ws.exception()}")
 
     finally:
+        await tasks.close()
         codex_connections.discard(ws)
         logger.info("👋 Codex WebSocket disconnected")
 
@@ -545,6 +957,11 @@ async def health_check(request):
         },
         "sessions": session_stats,
         "cli_processes": cli_pool_stats,
+        "admission": get_admission_controller().get_stats(),
+        "response_cache": get_response_cache().get_stats(),
+        "inflight_messages": get_inflight_registry().get_stats(),
+        "stream_backpressure": get_backpressure_stats().get_stats(),
+        "resources": get_usage_ledger().get_stats(),
         "bridgehub": bridgehub_health
     })
 
@@ -649,7 +1066,8 @@ async def sessions_endpoint(request):
             "device_id": session.device_id,
             "message_count": len(session.messages),
             "created_at": session.created_at.isoformat(),
-            "last_activity": session.last_activity.isoformat()
+            "last_activity": session.last_activity.isoformat(),
+            "usage": get_usage_ledger().session_stats(session.session_id)
         }
         for session in session_manager.sessions.values()
     ]
@@ -660,6 +1078,71 @@ async def sessions_endpoint(request):
     })
 
 
+async def stderr_debug_endpoint(request):
+    """Recent BridgeHub stderr, newest child first (for debugging)"""
+
+    api_key = request.headers.get("X-API-Key", "").strip()
+    if api_key != VALID_API_KEY:
+        return web.json_response({"ok": False, "error": "Unauthorized"}, status=401)
+
+    try:
+        lines = int(request.query.get("lines", "100"))
+    except ValueError:
+        return web.json_response({"ok": False, "error": "lines must be an integer"}, status=400)
+
+    children = get_stderr_log().snapshot(request.query.get("session_id"), lines=max(lines, 1))
+
+    return web.json_response({
+        "ok": True,
+        "total": len(children),
+        "children": children
+    })
+
+
+async def nodes_endpoint(request):
+    """Worker node status (GET), or add/drain/remove/rebalance (POST /api/nodes/{action})"""
+
+    api_key = request.headers.get("X-API-Key", "").strip()
+    if api_key != VALID_API_KEY:
+        return web.json_response({"ok": False, "error": "Unauthorized"}, status=401)
+
+    cluster = get_node_cluster()
+    action = request.match_info.get("action")
+    if request.method == "GET":
+        return web.json_response({"ok": True, **cluster.get_stats()})
+
+    if action == "rebalance":
+        return web.json_response({"ok": True, **cluster.rebalance()})
+
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        data = {}
+
+    address = data.get("node") if isinstance(data, dict) else None
+    if not address:
+        return web.json_response({"ok": False, "error": "Missing node"}, status=400)
+
+    if action == "add":
+        try:
+            cluster.add_node(address)
+        except ValueError as e:
+            return web.json_response({"ok": False, "error": str(e)}, status=400)
+        return web.json_response({"ok": True, **cluster.get_stats()})
+
+    if address not in cluster.nodes:
+        return web.json_response({"ok": False, "error": f"Unknown node: {address}"}, status=404)
+
+    if action == "drain":
+        return web.json_response({"ok": True, **(await cluster.drain(address))})
+
+    if action == "remove":
+        await cluster.remove_node(address)
+        return web.json_response({"ok": True, **cluster.get_stats()})
+
+    return web.json_response({"ok": False, "error": f"Unknown action: {action}"}, status=404)
+
+
 async def close_session_endpoint(request):
     """
     Close a chat session and cleanup CLI process
@@ -708,6 +1191,10 @@ async def on_startup(app):
 
 async def on_cleanup(app):
     """Cleanup resources on server shutdown"""
+    orphans = await ConnectionTasks.cancel_orphans()
+    if orphans:
+        logger.info(f"🛑 Cancelled {orphans} detached turn(s)")
+
     logger.info("🧹 Shutting down CLI process pool...")
 
     global cli_pool
@@ -716,6 +1203,9 @@ async def on_cleanup(app):
     if cli_pool:
         await cli_pool.stop()
 
+    await get_daemon_pool().close()
+    await get_node_cluster().close()
+
     logger.info("✅ Cleanup complete")
 
 
@@ -731,6 +1221,9 @@ def create_app():
     app.router.add_get('/api/health', health_check)
     app.router.add_get('/api/status', status_endpoint)
     app.router.add_get('/api/sessions', sessions_endpoint)
+    app.router.add_get('/api/debug/stderr', stderr_debug_endpoint)
+    app.router.add_get('/api/nodes', nodes_endpoint)
+    app.router.add_post('/api/nodes/{action}', nodes_endpoint)
     app.router.add_post('/api/files/upload', upload_file_handler)
     app.router.add_delete('/api/claude/session/{session_id}/close', close_session_endpoint)
     app.router.add_delete('/api/codex/session/{session_id}/close', close_session_endpoint)
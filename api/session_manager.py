@@ -5,15 +5,37 @@ Persistent conversation sessions with SQLite storage
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 import json
 import sqlite3
 from pathlib import Path
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Context window budget (estimated tokens, ~4 characters per token)
+DEFAULT_HISTORY_TOKENS = 16000
+MAX_MESSAGE_TOKENS = 4000  # A single huge paste is clipped to this
+EXCERPT_TOKENS = 1500  # Excerpts of turns that left the window; the oldest are dropped
+EXCERPT_CHARS = 240  # Each excerpt is the opening text of one turn
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the head and tail of text that is over a token budget"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    keep = max_tokens * 4 // 2
+    omitted = len(text) - 2 * keep
+    return f"{text[:keep]}\n\n[… {omitted} characters omitted …]\n\n{text[-keep:]}"
+
 
 @dataclass
 class Message:
@@ -56,6 +78,10 @@ class Session:
     last_activity: datetime = field(default_factory=datetime.now)
     metadata: Dict = field(default_factory=dict)
 
+    # One-line excerpts of (the newest of) the oldest `excerpts_cover` messages
+    history_excerpts: str = ""
+    excerpts_cover: int = 0
+
     def add_message(self, role: str, content: str, metadata: Optional[Dict] = None):
         """Add message to conversation history"""
         msg = Message(
@@ -67,44 +93,161 @@ class Session:
         self.messages.append(msg)
         self.last_activity = datetime.now()
 
-    def get_conversation_history(self, max_messages: Optional[int] = None) -> List[Dict]:
-        """Get conversation history formatted for Claude API"""
-        messages = self.messages[-max_messages:] if max_messages else self.messages
-        formatted: List[Dict[str, Any]] = []
-
-        for msg in messages:
-            content = msg.content
-            attachments = []
+    def find_turn(self, message_id: str) -> Tuple[Optional[Message], Optional[Message]]:
+        """
+        Find the user message and reply recorded for a client message id
 
-            if msg.metadata and isinstance(msg.metadata, dict):
-                raw_attachments = msg.metadata.get("attachments", [])
-                if isinstance(raw_attachments, list):
-                    attachments = [att for att in raw_attachments if isinstance(att, dict)]
+        Returns:
+            (user message, assistant reply); either may be None
+        """
+        user_message = None
+        reply = None
 
-            if attachments:
-                attachment_lines = []
-                for att in attachments:
-                    filename = att.get("filename", "file")
-                    attachment_type = att.get("type", "file")
-                    url = att.get("url", "")
-                    size = att.get("size")
+        for msg in reversed(self.messages):
+            if not msg.metadata or msg.metadata.get("message_id") != message_id:
+                continue
 
-                    size_display = ""
-                    if isinstance(size, (int, float)):
-                        size_display = f" ({size} bytes)"
+            if msg.role == "assistant" and reply is None:
+                reply = msg
+            elif msg.role == "user":
+                user_message = msg
+                break
 
-                    attachment_lines.append(
-                        f"- {filename} [{attachment_type}]{size_display} {url}".strip()
-                    )
+        return user_message, reply
 
-                content = f"{content}\n\nAttachments:\n" + "\n".join(attachment_lines)
-
-            formatted.append({
-                "role": msg.role,
-                "content": content
-            })
+    def get_conversation_history(
+        self,
+        max_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Get conversation history formatted for Claude API
+
+        With max_tokens, the window holds the newest messages that fit the
+        (estimated) token budget, each clipped to MAX_MESSAGE_TOKENS. Older
+        messages are sent as one first entry of excerpts: the opening
+        EXCERPT_CHARS of each, not a summary. The excerpts are bounded by
+        EXCERPT_TOKENS, so in a long session the oldest turns are lost
+        entirely. They are cached on the session and only extended when the
+        window slides past more messages.
+
+        Args:
+            max_messages: Most messages to include in the window
+            max_tokens: Token budget for the window plus excerpts
+
+        Returns:
+            List of {role, content} dictionaries
+        """
+        if max_tokens is None:
+            messages = self.messages[-max_messages:] if max_messages else self.messages
+            return [self._format_message(msg) for msg in messages]
+
+        budget = max_tokens - min(EXCERPT_TOKENS, max_tokens // 4)
+        window: List[Dict[str, Any]] = []
+        used = 0
+        start = len(self.messages)
+
+        # Walk back from the newest message until the budget is spent
+        while start > self.excerpts_cover:
+            if max_messages and len(window) >= max_messages:
+                break
+
+            formatted = self._format_message(self.messages[start - 1])
+            formatted["content"] = clip_to_tokens(formatted["content"], MAX_MESSAGE_TOKENS)
+            cost = estimate_tokens(formatted["content"])
+
+            # Always keep the newest message, even if it alone is over budget
+            if window and used + cost > budget:
+                break
+
+            window.append(formatted)
+            used += cost
+            start -= 1
+
+        window.reverse()
+        self._extend_excerpts(start)
+
+        if not self.history_excerpts:
+            return window
+
+        kept = self.history_excerpts.count("\n") + 1
+        dropped = f", the {self.excerpts_cover - kept} before them omitted" if kept < self.excerpts_cover else ""
+        excerpts = {
+            "role": "system",
+            "content": (
+                f"Opening lines of the {kept} messages before this window{dropped}:\n"
+                f"{self.history_excerpts}"
+            )
+        }
+        return [excerpts] + window
+
+    def _extend_excerpts(self, window_start: int):
+        """
+        Add an excerpt for each message that slid out of the window
+
+        Each excerpt is the message's opening EXCERPT_CHARS on one line.
+        Once the excerpts pass EXCERPT_TOKENS the oldest are dropped, so
+        this is a second, coarser window, not a summary of the session.
+        """
+        if self.excerpts_cover > len(self.messages):
+            # History was replaced underneath us; start over
+            self.history_excerpts = ""
+            self.excerpts_cover = 0
+
+        if window_start <= self.excerpts_cover:
+            return
+
+        lines = self.history_excerpts.splitlines() if self.history_excerpts else []
+        for msg in self.messages[self.excerpts_cover:window_start]:
+            text = re.sub(r"\s+", " ", msg.content).strip()
+            if len(text) > EXCERPT_CHARS:
+                text = text[:EXCERPT_CHARS].rstrip() + "…"
+            lines.append(f"- {msg.role}: {text}")
+
+        # Bounded: drop the oldest excerpts first
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > EXCERPT_TOKENS:
+            lines.pop(0)
+
+        logger.debug(
+            f"📝 Session '{self.session_id}' excerpts extended "
+            f"({self.excerpts_cover} → {window_start} messages, {len(lines)} kept)"
+        )
+        self.history_excerpts = "\n".join(lines)
+        self.excerpts_cover = window_start
+
+    @staticmethod
+    def _format_message(msg: Message) -> Dict[str, Any]:
+        """Format one message, listing its attachments after the text"""
+        content = msg.content
+        attachments = []
+
+        if msg.metadata and isinstance(msg.metadata, dict):
+            raw_attachments = msg.metadata.get("attachments", [])
+            if isinstance(raw_attachments, list):
+                attachments = [att for att in raw_attachments if isinstance(att, dict)]
+
+        if attachments:
+            attachment_lines = []
+            for att in attachments:
+                filename = att.get("filename", "file")
+                attachment_type = att.get("type", "file")
+                url = att.get("url", "")
+                size = att.get("size")
+
+                size_display = ""
+                if isinstance(size, (int, float)):
+                    size_display = f" ({size} bytes)"
+
+                attachment_lines.append(
+                    f"- {filename} [{attachment_type}]{size_display} {url}".strip()
+                )
+
+            content = f"{content}\n\nAttachments:\n" + "\n".join(attachment_lines)
 
-        return formatted
+        return {
+            "role": msg.role,
+            "content": content
+        }
 
     def to_dict(self) -> Dict:
         """Serialize session to dictionary"""
@@ -117,7 +260,9 @@ class Session:
             "capsule_context": self.capsule_context,
             "created_at": self.created_at.isoformat(),
             "last_activity": self.last_activity.isoformat(),
-            "metadata": self.metadata
+            "metadata": self.metadata,
+            "history_excerpts": self.history_excerpts,
+            "excerpts_cover": self.excerpts_cover
         }
 
     @classmethod
@@ -134,7 +279,10 @@ class Session:
             capsule_context=data.get("capsule_context", ""),
             created_at=datetime.fromisoformat(data["created_at"]),
             last_activity=datetime.fromisoformat(data["last_activity"]),
-            metadata=data.get("metadata", {})
+            metadata=data.get("metadata", {}),
+            # Sessions saved before the rename have the same excerpts under the old keys
+            history_excerpts=data.get("history_excerpts", data.get("history_summary", "")),
+            excerpts_cover=data.get("excerpts_cover", data.get("summary_covers", 0))
         )
 
 
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Stderr Capture for BuilderOS Mobile BridgeHub Children
+
+A child started with stderr=PIPE blocks as soon as it fills the pipe buffer
+(64 KB on Linux, 16 KB on macOS) if nobody reads it, and a chatty CLI then
+hangs the whole response stream. Every BridgeHub child's stderr is therefore
+drained concurrently, from spawn, into a bounded ring of recent lines.
+
+The ring feeds error messages and performance traces, and rings are kept in
+a log served by /api/debug/stderr: every live child's ring (a long-lived
+worker's ring is what its later turn errors quote), plus the most recent
+rings of children that have exited.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STDERR_RING_BYTES = 64 * 1024  # Per child
+STDERR_READ_CHUNK = 4096
+STDERR_LOG_ENTRIES = 50  # Exited children kept for the debug endpoint
+ERROR_TAIL_LINES = 5  # Lines of stderr included in error messages
+
+
+class StderrRing:
+    """
+    Drains a stream into a bounded buffer of its most recent lines
+
+    Lines are numbered as they arrive, so a long-lived worker's output for
+    one turn is `lines_since(mark)` with `mark = ring.mark()` taken at the
+    start of the turn.
+    """
+
+    def __init__(self, stream: Optional[asyncio.StreamReader], max_bytes: int = STDERR_RING_BYTES):
+        self.max_bytes = max_bytes
+        self.lines: Deque[str] = deque()
+        self.size = 0
+        self.total_lines = 0
+        self.dropped_lines = 0
+        self.partial = b""
+
+        self.task = asyncio.create_task(self._drain(stream)) if stream else None
+
+    async def _drain(self, stream: asyncio.StreamReader):
+        """Read until EOF; never blocks the child, whatever it writes"""
+
+        try:
+            while True:
+                chunk = await stream.read(STDERR_READ_CHUNK)
+                if not chunk:
+                    break
+
+                data = self.partial + chunk
+                *complete, self.partial = data.split(b"\n")
+                for line in complete:
+                    self._append(line)
+
+                # A line longer than the ring is cut rather than buffered
+                if len(self.partial) > self.max_bytes:
+                    self._append(self.partial[:self.max_bytes])
+                    self.partial = b""
+
+            if self.partial:
+                self._append(self.partial)
+                self.partial = b""
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Stderr drain stopped: {e}")
+
+    def _append(self, raw: bytes):
+        line = raw.decode('utf-8', 'replace').rstrip("\r")
+        self.lines.append(line)
+        self.size += len(line)
+        self.total_lines += 1
+
+        while self.size > self.max_bytes and len(self.lines) > 1:
+            self.size -= len(self.lines.popleft())
+            self.dropped_lines += 1
+
+    def mark(self) -> int:
+        """Position to pass to lines_since() later"""
+        return self.total_lines
+
+    def lines_since(self, mark: int) -> List[str]:
+        """Lines received after mark that are still in the ring"""
+        count = min(self.total_lines - mark, len(self.lines))
+        return list(self.lines)[-count:] if count > 0 else []
+
+    def tail(self, count: Optional[int] = None) -> List[str]:
+        """The most recent lines (all buffered lines by default)"""
+        lines = list(self.lines)
+        return lines[-count:] if count else lines
+
+    async def finish(self, timeout: float = 1.0):
+        """Wait briefly for the drain to reach EOF, then stop it"""
+
+        if not self.task or self.task.done():
+            return
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self.task), timeout=timeout)
+        except asyncio.TimeoutError:
+            # A grandchild may still hold the pipe open; keep what we have
+            self.task.cancel()
+
+
+def format_stderr(lines: List[str], count: int = ERROR_TAIL_LINES) -> str:
+    """Last lines of stderr for an error message ("" if there are none)"""
+    tail = [line for line in lines if line.strip()][-count:]
+    return " | ".join(tail)
+
+
+class StderrLog:
+    """Live and recently exited children's stderr rings, for errors and the debug endpoint"""
+
+    def __init__(self, max_entries: int = STDERR_LOG_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[int, Dict]" = OrderedDict()
+
+    def capture(
+        self,
+        process: asyncio.subprocess.Process,
+        kind: str,
+        agent_type: str,
+        session_id: str = ""
+    ) -> StderrRing:
+        """Start draining a child's stderr and remember its ring"""
+
+        ring = StderrRing(process.stderr)
+        self.entries.pop(process.pid, None)  # A reused pid is a new child
+        self.entries[process.pid] = {
+            "ring": ring,
+            "process": process,
+            "pid": process.pid,
+            "kind": kind,
+            "agent_type": agent_type,
+            "session_id": session_id,
+            "started_at": time.time()
+        }
+
+        self._trim()
+        return ring
+
+    def _trim(self):
+        """Forget the oldest exited children beyond max_entries; live children stay pinned"""
+
+        exited = [pid for pid, entry in self.entries.items() if entry["process"].returncode is not None]
+        for pid in exited[:max(0, len(exited) - self.max_entries)]:
+            del self.entries[pid]
+
+    def get(self, pid: int) -> Optional[StderrRing]:
+        entry = self.entries.get(pid)
+        return entry["ring"] if entry else None
+
+    def assign(self, pid: int, session_id: str):
+        """Record which session a standby worker was handed to"""
+        entry = self.entries.get(pid)
+        if entry:
+            entry["session_id"] = session_id
+
+    def snapshot(self, session_id: Optional[str] = None, lines: int = 100) -> List[Dict]:
+        """Recent rings, newest first, optionally for one session"""
+
+        result = []
+        for entry in reversed(self.entries.values()):
+            if session_id and entry["session_id"] != session_id:
+                continue
+
+            ring: StderrRing = entry["ring"]
+            result.append({
+                "pid": entry["pid"],
+                "kind": entry["kind"],
+                "agent_type": entry["agent_type"],
+                "session_id": entry["session_id"],
+                "started_at": entry["started_at"],
+                "draining": bool(ring.task and not ring.task.done()),
+                "total_lines": ring.total_lines,
+                "dropped_lines": ring.dropped_lines,
+                "lines": ring.tail(lines)
+            })
+
+        return result
+
+
+# Global stderr log shared by CLIProcessPool and BridgeHubClient
+stderr_log: Optional[StderrLog] = None
+
+
+def get_stderr_log() -> StderrLog:
+    """Get or create the global stderr log"""
+    global stderr_log
+
+    if stderr_log is None:
+        stderr_log = StderrLog()
+
+    return stderr_log
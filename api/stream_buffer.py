@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Stream Buffer for BuilderOS Mobile Responses
+
+The CLI reader and the WebSocket writer used to run in one coroutine, so a
+phone on a slow cellular link stalled reading the child's stdout and the
+child then stalled on a full pipe. buffered() runs the reader as its own
+producer task and hands chunks to the writer through a bounded per-stream
+buffer.
+
+When the buffer is full, its backpressure policy decides what happens:
+
+- coalesce: merge the new chunk into the last queued one. Response text is
+  appended by the client anyway, so this loses nothing and keeps the frame
+  count bounded; the byte bound still applies and pauses the producer
+- pause: make the producer wait until the writer catches up (the pipe, and
+  so the child, then waits too)
+- spill: queue further chunks in a temporary file on disk and stream them
+  from there once the in-memory chunks are sent
+
+The server's streams use BRIDGEHUB_STREAM_POLICY (default coalesce). Every
+policy event is counted, per policy, for /api/health.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import tempfile
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, BinaryIO, Deque, Dict, Optional
+
+from performance_trace import PerformanceTrace
+
+logger = logging.getLogger(__name__)
+
+POLICY_COALESCE = "coalesce"
+POLICY_PAUSE = "pause"
+POLICY_SPILL = "spill"
+BACKPRESSURE_POLICIES = (POLICY_COALESCE, POLICY_PAUSE, POLICY_SPILL)
+
+DEFAULT_POLICY = POLICY_COALESCE
+STREAM_POLICY_ENV = "BRIDGEHUB_STREAM_POLICY"
+MAX_BUFFERED_CHUNKS = 256
+MAX_BUFFERED_BYTES = 1024 * 1024
+
+_SPILL_HEADER = struct.Struct("!I")
+
+
+class BackpressureStats:
+    """How often each backpressure policy fired, across all streams"""
+
+    def __init__(self):
+        self.streams = 0
+        self.max_depth = 0
+        self.by_policy: Dict[str, Dict[str, float]] = {
+            policy: {
+                "streams": 0,
+                "coalesced": 0,
+                "pauses": 0,
+                "pause_ms": 0.0,
+                "spilled_chunks": 0,
+                "spilled_bytes": 0
+            }
+            for policy in BACKPRESSURE_POLICIES
+        }
+
+    def record(self, buffer: 'StreamBuffer'):
+        """Add one finished stream's counters"""
+
+        self.streams += 1
+        self.max_depth = max(self.max_depth, buffer.max_depth)
+
+        counters = self.by_policy[buffer.policy]
+        counters["streams"] += 1
+        for key, value in buffer.counters.items():
+            counters[key] += value
+
+    def get_stats(self) -> Dict:
+        return {
+            "policy": get_stream_policy(),
+            "streams": self.streams,
+            "max_depth": self.max_depth,
+            "limits": {"chunks": MAX_BUFFERED_CHUNKS, "bytes": MAX_BUFFERED_BYTES},
+            "by_policy": {
+                policy: {key: round(value, 1) for key, value in counters.items()}
+                for policy, counters in self.by_policy.items()
+            }
+        }
+
+
+class StreamBuffer:
+    """
+    Bounded queue of response chunks between one producer and one consumer
+
+    Usage:
+        await buffer.put(chunk)     # producer; may wait under "pause"
+        buffer.close(error=None)    # producer is done
+        chunk = await buffer.get()  # consumer; None once closed and drained
+    """
+
+    def __init__(
+        self,
+        policy: str = DEFAULT_POLICY,
+        max_chunks: int = MAX_BUFFERED_CHUNKS,
+        max_bytes: int = MAX_BUFFERED_BYTES
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+
+        self.policy = policy
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+
+        self.chunks: Deque[str] = deque()
+        self.size = 0
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        self.readable = asyncio.Event()
+        self.writable = asyncio.Event()
+        self.writable.set()
+
+        # Spill file: records are appended at the end and read from the front
+        self.spill: Optional[BinaryIO] = None
+        self.spill_read_pos = 0
+        self.spill_write_pos = 0
+        self.spilled = 0  # Records in the file not read yet
+
+        self.max_depth = 0
+        self.counters: Dict[str, float] = {
+            "coalesced": 0,
+            "pauses": 0,
+            "pause_ms": 0.0,
+            "spilled_chunks": 0,
+            "spilled_bytes": 0
+        }
+
+    @property
+    def depth(self) -> int:
+        return len(self.chunks) + self.spilled
+
+    def _full(self) -> bool:
+        return len(self.chunks) >= self.max_chunks or self.size >= self.max_bytes
+
+    async def put(self, chunk: str):
+        """Queue a chunk, applying the backpressure policy when full"""
+
+        if self.spilled or (self.policy == POLICY_SPILL and self._full()):
+            # Once spilling, everything goes to disk so order is kept
+            self._spill(chunk)
+
+        elif self.policy == POLICY_COALESCE and len(self.chunks) >= self.max_chunks and self.size < self.max_bytes:
+            self.chunks[-1] += chunk
+            self.size += len(chunk)
+            self.counters["coalesced"] += 1
+
+        else:
+            if self._full():
+                await self._wait_writable()
+            self.chunks.append(chunk)
+            self.size += len(chunk)
+
+        self.max_depth = max(self.max_depth, self.depth)
+        self.readable.set()
+
+    async def _wait_writable(self):
+        """Pause the producer until the consumer has made room"""
+
+        self.counters["pauses"] += 1
+        start_time = time.time()
+
+        while self._full() and not self.closed:
+            self.writable.clear()
+            await self.writable.wait()
+
+        self.counters["pause_ms"] += (time.time() - start_time) * 1000
+
+    def _spill(self, chunk: str):
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile(prefix="builderos-stream-")
+            logger.info(f"💽 Response stream spilling to disk ({len(self.chunks)} chunks queued)")
+
+        data = chunk.encode('utf-8')
+        self.spill.seek(self.spill_write_pos)
+        self.spill.write(_SPILL_HEADER.pack(len(data)) + data)
+        self.spill_write_pos = self.spill.tell()
+
+        self.spilled += 1
+        self.counters["spilled_chunks"] += 1
+        self.counters["spilled_bytes"] += len(data)
+
+    def _unspill(self) -> str:
+        self.spill.seek(self.spill_read_pos)
+        (length,) = _SPILL_HEADER.unpack(self.spill.read(_SPILL_HEADER.size))
+        data = self.spill.read(length)
+        self.spill_read_pos = self.spill.tell()
+        self.spilled -= 1
+
+        if not self.spilled:
+            # Drained: reuse the file from the start
+            self.spill.truncate(0)
+            self.spill_read_pos = self.spill_write_pos = 0
+
+        return data.decode('utf-8')
+
+    def close(self, error: Optional[BaseException] = None):
+        """Mark the end of the stream; get() raises error once drained"""
+
+        self.closed = True
+        self.error = error
+        self.readable.set()
+        self.writable.set()
+
+    async def get(self) -> Optional[str]:
+        """Next chunk in order, or None when the stream has ended"""
+
+        while True:
+            if self.chunks:
+                chunk = self.chunks.popleft()
+                self.size -= len(chunk)
+                if not self._full():
+                    self.writable.set()
+                return chunk
+
+            if self.spilled:
+                return self._unspill()
+
+            if self.closed:
+                if self.error:
+                    raise self.error
+                return None
+
+            self.readable.clear()
+            await self.readable.wait()
+
+    def discard(self):
+        """Drop anything still queued and remove the spill file"""
+
+        self.chunks.clear()
+        self.size = 0
+        self.spilled = 0
+        if self.spill:
+            self.spill.close()
+            self.spill = None
+
+
+async def buffered(
+    source: AsyncIterator[str],
+    policy: Optional[str] = None,
+    trace: Optional[PerformanceTrace] = None
+) -> AsyncIterator[str]:
+    """
+    Read a response source in its own task and yield its chunks
+
+    The source keeps being read while the caller is busy sending, up to the
+    buffer's bounds. Closing this generator (e.g. on cancel) closes the
+    source, which kills its process tree, before returning.
+
+    Args:
+        source: Response chunks (e.g. CLIProcessPool.execute_message)
+        policy: "coalesce", "pause" or "spill" (default: the configured policy)
+        trace: Performance trace to record backpressure events on
+
+    Yields:
+        Response chunks, possibly coalesced
+    """
+
+    policy = policy or get_stream_policy()
+    buffer = StreamBuffer(policy)
+
+    async def produce():
+        try:
+            async with aclosing(source) as chunks:
+                async for chunk in chunks:
+                    await buffer.put(chunk)
+        except asyncio.CancelledError:
+            buffer.close()
+            raise
+        except Exception as e:
+            buffer.close(e)
+        else:
+            buffer.close()
+
+    producer = asyncio.create_task(produce())
+
+    try:
+        while True:
+            chunk = await buffer.get()
+            if chunk is None:
+                break
+            yield chunk
+
+    finally:
+        if not producer.done():
+            producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+
+        buffer.discard()
+        get_backpressure_stats().record(buffer)
+        if trace and any(buffer.counters.values()):
+            trace.mark("stream_backpressure", {"policy": policy, "max_depth": buffer.max_depth, **buffer.counters})
+
+
+def stream_policy_from_env() -> str:
+    """Backpressure policy from BRIDGEHUB_STREAM_POLICY"""
+
+    value = os.environ.get(STREAM_POLICY_ENV, "").strip().lower()
+    if not value:
+        return DEFAULT_POLICY
+
+    if value not in BACKPRESSURE_POLICIES:
+        logger.warning(f"⚠️  Ignoring {STREAM_POLICY_ENV}={value!r}; using {DEFAULT_POLICY}")
+        return DEFAULT_POLICY
+
+    return value
+
+
+# Global backpressure policy for response streams
+stream_policy: Optional[str] = None
+
+
+def get_stream_policy() -> str:
+    """Get the configured backpressure policy (read from the environment once)"""
+    global stream_policy
+
+    if stream_policy is None:
+        stream_policy = stream_policy_from_env()
+
+    return stream_policy
+
+
+# Global backpressure statistics
+backpressure_stats: Optional[BackpressureStats] = None
+
+
+def get_backpressure_stats() -> BackpressureStats:
+    """Get or create the global backpressure statistics"""
+    global backpressure_stats
+
+    if backpressure_stats is None:
+        backpressure_stats = BackpressureStats()
+
+    return backpressure_stats
@@ -0,0 +1,83 @@
+"""
+Shared test fixtures
+
+Pools run api/bridgehub_standin.py under this Python instead of node and
+bridgehub.js, with no daemon and no worker nodes, so the tests need neither
+Node.js nor the CLIs. Tests are plain functions that drive asyncio.run().
+"""
+
+import asyncio
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+import bridgehub_launcher
+from admission_control import AdmissionController
+from bridgehub_daemon import DaemonPool
+from cli_process_pool import CLIProcessPool
+from worker_nodes import NodeCluster
+
+STANDIN = Path(__file__).resolve().parent.parent / "bridgehub_standin.py"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_node(token: str = "", scheme: str = "tcp", host: str = "127.0.0.1", options: tuple = ()) -> tuple:
+    """Start a stand-in worker node on a local port; returns (address, process)"""
+
+    address = f"{scheme}://{host}:{free_port()}"
+    options = [*options, *(["--token", token] if token else [])]
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(STANDIN), "--daemon", "--socket", address, *options,
+        stdout=asyncio.subprocess.PIPE
+    )
+    await process.stdout.readline()  # Listening
+    return address, process
+
+
+async def stop_node(process: asyncio.subprocess.Process):
+    process.terminate()
+    await process.wait()
+
+
+def offline_daemon(tmp_path: Path) -> DaemonPool:
+    """A daemon pool that never tries to connect"""
+
+    daemon = DaemonPool(str(tmp_path / "no-daemon.sock"))
+    daemon.retry_at = float("inf")
+    return daemon
+
+
+@pytest.fixture(autouse=True)
+def fresh_launchers(monkeypatch):
+    """Launchers remember what BridgeHub supports; start every test from scratch"""
+    monkeypatch.setattr(bridgehub_launcher, "launchers", {})
+
+
+@pytest.fixture
+def make_pool(tmp_path):
+    """Build CLIProcessPools around the stand-in (no standby workers unless asked)"""
+
+    def make(**options) -> CLIProcessPool:
+        options.setdefault("standby_workers", 0)
+        options.setdefault("daemon", offline_daemon(tmp_path))
+        options.setdefault("cluster", NodeCluster())
+        options.setdefault("bridgehub_path", str(STANDIN))
+        options.setdefault("admission", AdmissionController())
+        return CLIProcessPool(
+            node_path=sys.executable,
+            **options
+        )
+
+    return make
+
+
+async def collect(pool: CLIProcessPool, session_id: str, message: str, agent_type: str = "claude", **options) -> str:
+    """Run one turn and join its chunks"""
+    return "".join([chunk async for chunk in pool.execute_message(session_id, agent_type, message, [], **options)])
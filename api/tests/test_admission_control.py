@@ -0,0 +1,107 @@
+"""AdmissionController: per-device round-robin, priority classes, reserved slots"""
+
+import asyncio
+
+from admission_control import AdmissionController
+
+
+async def hold(controller: AdmissionController, device_id: str, order: list, release: asyncio.Event, **options):
+    async with controller.slot(device_id, **options):
+        order.append(device_id)
+        await release.wait()
+
+
+async def admit_in_turn(controller: AdmissionController, requests: list) -> list:
+    """Queue (device, priority) requests behind a held slot; the order they run in"""
+
+    order = []
+    gate = asyncio.Event()
+    holder = asyncio.create_task(hold(controller, "holder", [], gate))
+    await asyncio.sleep(0)
+
+    async def run(device_id, priority):
+        async with controller.slot(device_id, priority=priority):
+            order.append(device_id)
+
+    tasks = []
+    for device_id, priority in requests:
+        tasks.append(asyncio.create_task(run(device_id, priority)))
+        await asyncio.sleep(0)
+
+    gate.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+def test_devices_take_turns():
+    async def main():
+        controller = AdmissionController(max_concurrent=1)
+        order = await admit_in_turn(controller, [
+            ("a", "interactive"), ("a", "interactive"), ("a", "interactive"), ("b", "interactive"), ("c", "interactive")
+        ])
+
+        assert order == ["a", "b", "c", "a", "a"]
+
+    asyncio.run(main())
+
+
+def test_interactive_waiters_go_before_background_and_batch():
+    async def main():
+        controller = AdmissionController(max_concurrent=1)
+        order = await admit_in_turn(controller, [
+            ("batch", "batch"), ("build", "background"), ("chat", "interactive")
+        ])
+
+        assert order == ["chat", "build", "batch"]
+        assert controller.get_stats()["by_priority"]["batch"]["admitted"] == 1
+
+    asyncio.run(main())
+
+
+def test_background_work_leaves_a_slot_for_interactive():
+    async def main():
+        controller = AdmissionController(max_concurrent=2, interactive_reserved=1)
+        release = asyncio.Event()
+        order = []
+
+        builds = [asyncio.create_task(hold(controller, f"build{i}", order, release, priority="background")) for i in range(2)]
+        await asyncio.sleep(0)
+        assert order == ["build0"] and controller.queue_depth == 1
+
+        chat = asyncio.create_task(hold(controller, "chat", order, release))
+        await asyncio.sleep(0)
+        assert order == ["build0", "chat"]
+
+        release.set()
+        await asyncio.gather(chat, *builds)
+        assert controller.active == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiters_leave_the_queue_and_positions_update():
+    async def main():
+        controller = AdmissionController(max_concurrent=1)
+        release = asyncio.Event()
+        positions = []
+
+        async def on_queued(position):
+            positions.append(position)
+
+        holder = asyncio.create_task(hold(controller, "a", [], release))
+        await asyncio.sleep(0)
+        first = asyncio.create_task(hold(controller, "b", [], release))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(hold(controller, "c", [], release, on_queued=on_queued))
+        await asyncio.sleep(0)
+        assert positions == [2]
+
+        first.cancel()
+        await asyncio.sleep(0)
+        assert positions == [2, 1] and controller.queue_depth == 1
+
+        release.set()
+        await asyncio.gather(holder, second)
+        assert controller.active == 0 and controller.queue_depth == 0
+
+    asyncio.run(main())
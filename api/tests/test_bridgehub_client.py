@@ -0,0 +1,112 @@
+"""BridgeHubClient against the BridgeHub stand-in: failures raise and feed its circuit breaker"""
+
+import asyncio
+import sys
+
+import pytest
+
+import bridgehub_client
+from bridgehub_launcher import get_launcher
+from bridgehub_standin import ARGV_ONLY_ENV
+from bridgehub_client import BridgeHubClient
+from circuit_breaker import BridgeHubFailure, CircuitOpen
+from conftest import STANDIN, offline_daemon
+from process_control import ExecutionError
+from resource_limits import ProcessLimiter
+
+
+class RecordingLimiter(ProcessLimiter):
+    """A limiter that remembers what it spawned and released"""
+
+    def __init__(self):
+        super().__init__()
+        self.spawned = []
+        self.released = []
+
+    async def spawn(self, name, *command, **kwargs):
+        process = await super().spawn(name, *command, **kwargs)
+        self.spawned.append((name, kwargs))
+        return process
+
+    def release(self, process):
+        self.released.append(process)
+        super().release(process)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(BridgeHubClient, "NODE_PATH", sys.executable)
+    monkeypatch.setattr(BridgeHubClient, "BRIDGEHUB_PATH", str(STANDIN))
+    daemon = offline_daemon(tmp_path)
+    monkeypatch.setattr(bridgehub_client, "get_daemon_pool", lambda: daemon)
+    monkeypatch.setattr(bridgehub_client, "breaker", None)
+    return BridgeHubClient
+
+
+async def ask(client, message: str) -> str:
+    return "".join([chunk async for chunk in client.call_codex(message, "s1", [])])
+
+
+def test_answer_streams_and_keeps_the_circuit_closed(client):
+    async def main():
+        assert await ask(client, "hello") == "echo: hello"
+        assert bridgehub_client.get_breaker().get_stats()["state"] == "closed"
+
+    asyncio.run(main())
+
+
+def test_spawns_go_through_the_shared_limiter(client, monkeypatch):
+    limiter = RecordingLimiter()
+    monkeypatch.setattr(bridgehub_client, "get_process_limiter", lambda: limiter)
+
+    async def main():
+        assert await ask(client, "hello") == "echo: hello"
+
+    asyncio.run(main())
+
+    [(name, options)] = limiter.spawned
+    assert name == "codex"
+    assert "start_new_session" in options and "PATH" in options["env"]
+    assert len(limiter.released) == 1
+
+
+def test_bridgehub_error_is_raised_not_streamed(client):
+    async def main():
+        with pytest.raises(ExecutionError) as raised:
+            await ask(client, "fail: quota exceeded")
+
+        assert raised.value.code == "bridgehub_error"
+        assert str(raised.value) == "quota exceeded"
+        assert bridgehub_client.get_breaker().consecutive_failures == 0  # BridgeHub itself worked
+
+    asyncio.run(main())
+
+
+def test_missing_bridgehub_opens_the_circuit(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(BridgeHubClient, "BRIDGEHUB_PATH", str(tmp_path / "missing.js"))
+
+    async def main():
+        breaker = bridgehub_client.get_breaker()
+        try:
+            for _ in range(breaker.failure_threshold):
+                with pytest.raises(BridgeHubFailure):
+                    await ask(client, "hello")
+
+            with pytest.raises(CircuitOpen):
+                await ask(client, "hello")
+        finally:
+            await breaker.close()
+
+    asyncio.run(main())
+
+
+def test_rejected_stdin_request_is_retried_as_an_argument(client, monkeypatch):
+    launcher = get_launcher(client.NODE_PATH, client.BRIDGEHUB_PATH)
+    monkeypatch.setitem(launcher.env, ARGV_ONLY_ENV, "1")
+
+    async def main():
+        assert await ask(client, "hello") == "echo: hello"
+        assert not launcher.stdin_requests
+        assert bridgehub_client.get_breaker().consecutive_failures == 0
+
+    asyncio.run(main())
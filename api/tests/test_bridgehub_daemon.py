@@ -0,0 +1,106 @@
+"""CLIProcessPool turns on a stand-in resident daemon: multiplexing, cancellation and fallback"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from bridgehub_daemon import DaemonPool
+from conftest import STANDIN, collect, stop_node
+
+
+async def start_daemon(socket_path: str) -> asyncio.subprocess.Process:
+    """Start a stand-in daemon on a Unix socket"""
+
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(STANDIN), "--daemon", "--socket", socket_path,
+        stdout=asyncio.subprocess.PIPE
+    )
+    await process.stdout.readline()  # Listening
+    return process
+
+
+@pytest.fixture
+def make_daemon_pool(make_pool, tmp_path):
+    """One-shot pools (no warm workers), so turns go to the daemon at tmp_path/bridgehub.sock"""
+
+    def make(**options):
+        daemon = DaemonPool(str(tmp_path / "bridgehub.sock"))
+        pool = make_pool(daemon=daemon, **options)
+        pool.serve_supported = False
+        pool.serve_retry_at = float("inf")
+        return pool, daemon
+
+    return make
+
+
+def test_concurrent_turns_share_one_daemon_connection(make_daemon_pool):
+    async def main():
+        pool, daemon = make_daemon_pool()
+        process = await start_daemon(daemon.socket_path)
+        await pool.start()
+        try:
+            start = time.monotonic()
+            answers = await asyncio.gather(*(
+                collect(pool, f"s{i}", f"sleep:300 hello {i}") for i in range(4)
+            ))
+            elapsed = time.monotonic() - start
+
+            assert answers == [f"echo: hello {i}" for i in range(4)]
+            assert elapsed < 1.0  # Interleaved, not one after another
+            stats = daemon.get_stats()
+            assert stats["connections"] == 1
+            assert stats["requests"] == 4 and stats["fallbacks"] == 0
+            assert not pool.one_shots
+        finally:
+            await pool.stop()
+            await daemon.close()
+            await stop_node(process)
+
+    asyncio.run(main())
+
+
+def test_cancelled_turn_is_cancelled_on_the_daemon(make_daemon_pool):
+    async def main():
+        pool, daemon = make_daemon_pool()
+        process = await start_daemon(daemon.socket_path)
+        await pool.start()
+        try:
+            turn = asyncio.create_task(collect(pool, "s1", "sleep:10000 hello"))
+            while not daemon.get_stats()["active_requests"]:
+                await asyncio.sleep(0.01)
+            turn.cancel()
+            await asyncio.gather(turn, return_exceptions=True)
+
+            line = await asyncio.wait_for(process.stdout.readline(), timeout=2.0)
+            assert line.startswith(b"cancelled ")
+
+            # The connection carries on
+            assert await collect(pool, "s1", "again") == "echo: again"
+            assert daemon.get_stats()["connections"] == 1
+            assert pool.admission.active == 0
+        finally:
+            await pool.stop()
+            await daemon.close()
+            await stop_node(process)
+
+    asyncio.run(main())
+
+
+def test_turn_falls_back_to_a_one_shot_without_a_daemon(make_daemon_pool):
+    async def main():
+        pool, daemon = make_daemon_pool()
+        await pool.start()
+        try:
+            assert daemon.available  # Never tried yet
+            assert await collect(pool, "s1", "hello") == "echo: hello"
+
+            assert daemon.get_stats()["fallbacks"] == 1
+            assert not daemon.available  # Backing off, so the next turn spawns directly
+            assert await collect(pool, "s1", "again") == "echo: again"
+            assert daemon.get_stats()["fallbacks"] == 1
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
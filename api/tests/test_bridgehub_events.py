@@ -0,0 +1,94 @@
+"""ResponseParser and ResponseStream: partial/final dedupe, errors and resume failures"""
+
+import json
+
+import pytest
+
+from bridgehub_events import (
+    ERROR_BRIDGEHUB, ERROR_INVALID_RESPONSE, ERROR_RESUME_FAILED,
+    ErrorEvent, FinalEvent, LogEvent, PartialEvent, ProgressEvent, ResponseParser, ResponseStream
+)
+from circuit_breaker import BridgeHubFailure
+from process_control import ExecutionError
+
+
+def body(value) -> bytes:
+    return json.dumps(value).encode('utf-8')
+
+
+def test_final_payload_only_carries_text_not_streamed():
+    parser = ResponseParser()
+
+    assert parser.parse("progress", body({"stage": "cli_started"})) == ProgressEvent({"stage": "cli_started"})
+    assert parser.parse("partial", body({"text": "echo: "})) == PartialEvent("echo: ")
+    assert parser.parse("partial", body({"text": ""})) is None
+    final = parser.parse("payload", body({"ok": True, "data": {"output": "echo: hi", "cli_session_id": "c1"}}))
+
+    assert final == FinalEvent("hi", "echo: hi", "c1")
+    assert parser.complete and parser.cli_session_id == "c1"
+
+
+def test_final_payload_is_the_whole_answer_without_partials():
+    parser = ResponseParser()
+
+    assert parser.parse("payload", body({"ok": True, "data": {"output": "hi"}})) == FinalEvent("hi", "hi", None)
+
+
+def test_diverging_final_output_keeps_the_streamed_text():
+    parser = ResponseParser()
+    parser.parse("partial", body({"text": "abc"}))
+
+    assert parser.parse("payload", body({"ok": True, "data": {"output": "xyz"}})) == FinalEvent("", "xyz", None)
+
+
+def test_failed_and_unreadable_payloads_are_errors():
+    failed = ResponseParser().parse("payload", body({"ok": False, "reason": "boom"}))
+    unreadable = ResponseParser().parse("payload", b"{not json")
+
+    assert isinstance(failed, ErrorEvent) and failed.code == ERROR_BRIDGEHUB and failed.reason == "boom"
+    assert isinstance(unreadable, ErrorEvent) and unreadable.code == ERROR_INVALID_RESPONSE
+
+
+def test_resume_failed_is_retryable_only_before_output():
+    refused = ResponseParser().parse("payload", body({"ok": False, "reason": "resume_failed"}))
+    assert refused.code == ERROR_RESUME_FAILED
+
+    parser = ResponseParser()
+    parser.parse("partial", body({"text": "half"}))
+    assert parser.parse("payload", body({"ok": False, "reason": "resume_failed"})).code == ERROR_BRIDGEHUB
+
+
+def test_logs_and_unknown_kinds():
+    parser = ResponseParser()
+
+    event = parser.parse("log", b"hello\n")
+    assert isinstance(event, LogEvent) and event.text == "hello"
+    assert parser.parse("telemetry", b"{}") is None
+    assert parser.parse("partial", b"not json") is None
+
+
+def test_stream_forwards_text_and_raises_errors():
+    stream = ResponseStream()
+    assert stream.feed("progress", body({"stage": "cli_started"})) == []
+    assert stream.feed("partial", body({"text": "echo: "})) == ["echo: "]
+    assert stream.feed("payload", body({"ok": True, "data": {"output": "echo: hi"}})) == ["hi"]
+
+    with pytest.raises(ExecutionError) as raised:
+        ResponseStream().feed("payload", body({"ok": False, "reason": "boom"}))
+    assert raised.value.code == ERROR_BRIDGEHUB and not isinstance(raised.value, BridgeHubFailure)
+
+    with pytest.raises(BridgeHubFailure):
+        ResponseStream().feed("payload", b"{not json")
+
+
+def test_stream_flags_a_resume_refusal_for_a_retry():
+    stream = ResponseStream(resumed=True)
+
+    assert stream.feed("payload", body({"ok": False, "reason": "resume_failed"})) == []
+    assert stream.resume_failed
+
+
+def test_resume_refusal_without_a_resume_is_an_error():
+    with pytest.raises(ExecutionError) as raised:
+        ResponseStream().feed("payload", body({"ok": False, "reason": "resume_failed"}))
+    assert raised.value.code == ERROR_RESUME_FAILED
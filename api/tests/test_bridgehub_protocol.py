@@ -0,0 +1,66 @@
+"""FrameReader: length-prefixed frames, legacy lines and log lines"""
+
+import asyncio
+
+import pytest
+
+from bridgehub_protocol import FrameReader, ProtocolError
+
+
+def read_all(data: bytes, limit: int = 64 * 1024) -> list:
+    async def main():
+        stream = asyncio.StreamReader(limit=limit)
+        stream.feed_data(data)
+        stream.feed_eof()
+
+        reader = FrameReader(stream)
+        records = []
+        while (record := await reader.read_tagged()) is not None:
+            records.append(record)
+        return records
+
+    return asyncio.run(main())
+
+
+def test_frames_legacy_lines_and_logs_in_order():
+    data = (
+        b"starting\n"
+        b"JARVIS_FRAME=partial 12\n{\"text\":\"a\"}\n"
+        b"\n"
+        b"JARVIS_PARTIAL={\"text\":\"b\"}\n"
+        b"JARVIS_FRAME=payload 9 req-1\n{\"ok\":1}\n"
+        b"JARVIS_PAYLOAD={\"ok\":true}"
+    )
+
+    assert read_all(data) == [
+        ("log", b"starting\n", None),
+        ("partial", b'{"text":"a"}', None),
+        ("partial", b'{"text":"b"}\n', None),
+        ("payload", b'{"ok":1}\n', "req-1"),
+        ("payload", b'{"ok":true}', None),
+    ]
+
+
+def test_frame_bodies_may_contain_newlines_and_headers():
+    body = b"line\nJARVIS_PAYLOAD={}\n"
+    data = b"JARVIS_FRAME=partial %d\n" % len(body) + body
+
+    assert read_all(data) == [("partial", body, None)]
+
+
+def test_legacy_lines_longer_than_the_stream_limit():
+    text = b"x" * 100_000
+    records = read_all(b"JARVIS_PAYLOAD=" + text + b"\n", limit=1024)
+
+    assert records == [("payload", text + b"\n", None)]
+
+
+@pytest.mark.parametrize("data", [
+    b"JARVIS_FRAME=partial many\n{}\n",
+    b"JARVIS_FRAME=partial 2 id extra\n{}\n",
+    b"JARVIS_FRAME=partial -1\n",
+    b"JARVIS_FRAME=payload 100\n{\"ok\":true}\n",
+])
+def test_malformed_or_truncated_frames_raise(data):
+    with pytest.raises(ProtocolError):
+        read_all(data)
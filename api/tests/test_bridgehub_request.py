@@ -0,0 +1,50 @@
+"""Request building and compact encoding, with orjson and with the standard library"""
+
+import json
+
+import pytest
+
+import bridgehub_request
+from bridgehub_request import build_request, encode_request
+
+HISTORY = [
+    {"role": "user", "content": "Résumé of the café plan, please"},
+    {"role": "assistant", "content": "Sure: \"step 1\" → step 2\n\tdone ✅"}
+]
+ATTACHMENTS = [{"name": "plan.pdf", "size": 2048, "path": "/tmp/plan.pdf"}]
+
+
+def request() -> dict:
+    return build_request(
+        session_id="s1",
+        agent_type="claude",
+        message="Ünïcode and \"quotes\"",
+        conversation_history=HISTORY,
+        system_context="# CLAUDE.md",
+        attachments=ATTACHMENTS,
+        metadata={"message_count": 3, "priority": "interactive"}
+    )
+
+
+def encoded_with_json(monkeypatch) -> bytes:
+    monkeypatch.setattr(bridgehub_request, "orjson", None)
+    return encode_request(request())
+
+
+def test_json_encoding_is_compact_and_keeps_unicode(monkeypatch):
+    body = encoded_with_json(monkeypatch)
+
+    assert body == json.dumps(json.loads(body), separators=(",", ":"), ensure_ascii=False).encode('utf-8')
+    assert b'", "' not in body and b'": ' not in body
+    assert "Résumé".encode('utf-8') in body
+    history = next(item for item in json.loads(body)["payload"]["context"] if item["title"] == "Conversation History")
+    assert json.loads(history["content"]) == HISTORY
+
+
+def test_orjson_and_json_produce_the_same_bytes(monkeypatch):
+    pytest.importorskip("orjson")
+
+    with_orjson = encode_request(request())
+    with_json = encoded_with_json(monkeypatch)
+
+    assert with_orjson == with_json
@@ -0,0 +1,112 @@
+"""CircuitBreaker: trips after consecutive failures, probes, half-open trials"""
+
+import asyncio
+
+import pytest
+
+from circuit_breaker import (
+    STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, BridgeHubFailure, CircuitBreaker, CircuitOpen
+)
+
+
+def make_breaker(healthy: list) -> CircuitBreaker:
+    async def probe():
+        return healthy[0]
+
+    return CircuitBreaker(probe, failure_threshold=3, probe_interval=0.01)
+
+
+def test_opens_after_threshold_and_fails_fast():
+    async def main():
+        breaker = make_breaker([False])
+        for _ in range(2):
+            breaker.record_failure(BridgeHubFailure("spawn failed"))
+        breaker.check()
+        assert breaker.state == STATE_CLOSED
+
+        breaker.record_failure(BridgeHubFailure("spawn failed"))
+        assert breaker.state == STATE_OPEN
+        with pytest.raises(CircuitOpen) as raised:
+            breaker.check()
+        assert raised.value.details["last_error"] == "spawn failed"
+        assert breaker.get_stats()["rejected"] == 1
+
+        await breaker.close()
+
+    asyncio.run(main())
+
+
+def test_success_resets_the_failure_count():
+    async def main():
+        breaker = make_breaker([False])
+        for _ in range(2):
+            breaker.record_failure(BridgeHubFailure("x"))
+        breaker.record_success()
+        breaker.record_failure(BridgeHubFailure("x"))
+
+        assert breaker.state == STATE_CLOSED
+
+    asyncio.run(main())
+
+
+def test_probe_half_opens_and_a_trial_closes_or_reopens():
+    async def main():
+        healthy = [False]
+        breaker = make_breaker(healthy)
+        for _ in range(3):
+            breaker.record_failure(BridgeHubFailure("x"))
+
+        await asyncio.sleep(0.05)
+        assert breaker.state == STATE_OPEN and breaker.probes >= 2
+
+        healthy[0] = True
+        await asyncio.sleep(0.05)
+        assert breaker.state == STATE_HALF_OPEN
+        breaker.check()
+
+        breaker.record_failure(BridgeHubFailure("still broken"))
+        assert breaker.state == STATE_OPEN and breaker.trips == 2
+
+        await asyncio.sleep(0.05)
+        assert breaker.state == STATE_HALF_OPEN
+        breaker.record_success()
+        assert breaker.state == STATE_CLOSED and breaker.consecutive_failures == 0
+
+        await breaker.close()
+
+    asyncio.run(main())
+
+
+def test_half_open_lets_one_trial_through_at_a_time():
+    async def main():
+        healthy = [True]
+        breaker = make_breaker(healthy)
+        for _ in range(3):
+            breaker.record_failure(BridgeHubFailure("x"))
+        await asyncio.sleep(0.05)
+        assert breaker.state == STATE_HALF_OPEN
+
+        assert breaker.check(trial=False) is False  # An early check claims nothing
+        assert breaker.check() is True
+        with pytest.raises(CircuitOpen) as raised:
+            breaker.check()
+        assert "trial" in str(raised.value)
+        with pytest.raises(CircuitOpen):
+            breaker.check(trial=False)
+
+        # Cancelled: neither outcome, so the next request is the trial
+        breaker.end_trial()
+        assert breaker.check() is True
+
+        breaker.record_failure(BridgeHubFailure("still broken"))
+        assert breaker.state == STATE_OPEN and not breaker.trial_in_flight
+
+        await asyncio.sleep(0.05)
+        assert breaker.check() is True
+        breaker.record_success()
+        assert breaker.state == STATE_CLOSED
+        assert breaker.check() is False and breaker.check() is False
+
+        await breaker.close()
+
+    asyncio.run(main())
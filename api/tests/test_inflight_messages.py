@@ -0,0 +1,64 @@
+"""In-flight message coalescing: followers catch up, then see live frames"""
+
+import asyncio
+
+from inflight_messages import InflightRegistry
+
+
+def message(text: str) -> dict:
+    return {"type": "message", "content": text}
+
+
+async def collect(stream) -> list:
+    return [frame async for frame in stream]
+
+
+def test_follower_gets_the_backlog_then_live_frames():
+    async def main():
+        registry = InflightRegistry()
+        inflight = registry.start("m1", "s1")
+        inflight.publish(message("Hel"))
+        inflight.publish(message("lo"))
+
+        duplicate = registry.get("m1")
+        assert duplicate is inflight
+        follower = asyncio.create_task(collect(duplicate.follow()))
+        await asyncio.sleep(0)
+        assert registry.get_stats()["followers"] == 1
+
+        inflight.publish(message(" there"))
+        inflight.publish({"type": "complete"})
+        registry.finish(inflight)
+
+        frames = await follower
+        assert [frame["content"] for frame in frames[:2]] == ["Hello", " there"]
+        assert frames[2] == {"type": "complete"}
+        assert registry.get("m1") is None
+        assert registry.get_stats()["coalesced"] == 1
+
+    asyncio.run(main())
+
+
+def test_following_a_finished_message_replays_text_and_final_frame():
+    async def main():
+        inflight = InflightRegistry().start("m1", "s1")
+        inflight.publish(message("done"))
+        inflight.publish({"type": "error", "error": "boom"})
+        inflight.finish()
+
+        frames = await collect(inflight.follow())
+        assert frames[0]["content"] == "done"
+        assert frames[1] == {"type": "error", "error": "boom"}
+        assert inflight.followers == []
+
+    asyncio.run(main())
+
+
+def test_a_restarted_message_is_not_unregistered_by_the_old_one():
+    registry = InflightRegistry()
+    old = registry.start("m1", "s1")
+    new = registry.start("m1", "s1")
+
+    registry.finish(old)
+
+    assert registry.messages["m1"] is new
@@ -0,0 +1,404 @@
+"""CLIProcessPool lifecycle against the BridgeHub stand-in: warm-up, turns, eviction, shutdown"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+import cli_process_pool
+from bridgehub_protocol import MAX_ARGV_REQUEST_BYTES
+from bridgehub_standin import ARGV_ONLY_ENV, STARTUP_ENV, STREAM_ENV
+from circuit_breaker import STATE_CLOSED, CircuitOpen
+from conftest import STANDIN, collect
+from performance_trace import PerformanceTrace
+from process_control import ExecutionError
+
+
+def test_turn_runs_on_the_sessions_warm_worker(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            assert await collect(pool, "s1", "hello") == "echo: hello"
+            worker = pool.processes["s1"].process
+            assert await collect(pool, "s1", "again") == "echo: again"
+            assert pool.processes["s1"].process is worker and worker.returncode is None
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_long_failed_turn_keeps_an_eviction_deadline(make_pool):
+    async def main():
+        pool = make_pool(idle_timeout=0.2)
+        await pool.start()
+        try:
+            with pytest.raises(ExecutionError):
+                # Outlives its idle deadline, which the eviction loop skips mid-turn
+                await collect(pool, "s1", "sleep:400 fail: boom")
+
+            worker = pool.processes["s1"].process
+            assert worker.returncode is None
+            await asyncio.sleep(0.6)
+
+            assert "s1" not in pool.processes
+            assert worker.returncode is not None
+            assert pool.idle_evictions == 1
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_memory_pressure_drains_standby_before_sessions(make_pool, monkeypatch):
+    async def main():
+        pool = make_pool(standby_workers=1)
+        await pool.start()
+        try:
+            await collect(pool, "s1", "hello")
+            await pool.refill_tasks["claude"]
+            standby = pool.standby["claude"][0]
+
+            # Low until one worker has gone, then fine again; the eviction
+            # loop stays out of it until its next periodic check
+            pool.last_memory_check = time.time()
+            monkeypatch.setattr(cli_process_pool, "host_memory", lambda: (4096.0, 8192.0))
+            pool.memory = (512.0, 8192.0)
+            await pool._relieve_memory_pressure()
+
+            assert not pool.standby["claude"]
+            assert standby.returncode is not None
+            assert pool.processes["s1"].is_alive
+            assert pool.pressure_evictions == 1
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_stop_reaps_running_one_shot_children(make_pool):
+    async def main():
+        pool = make_pool()
+        pool.serve_supported = False  # One-shot mode
+        pool.serve_retry_at = float("inf")
+        await pool.start()
+
+        turn = asyncio.create_task(collect(pool, "s1", "sleep:10000 hello"))
+        while not pool.one_shots:
+            await asyncio.sleep(0.01)
+        child = next(iter(pool.one_shots))
+
+        report = await pool.stop(timeout=1.0)
+
+        assert child.returncode is not None
+        assert report["graceful"] + report["killed"] == 1
+        turn.cancel()
+        await asyncio.gather(turn, return_exceptions=True)
+
+    asyncio.run(main())
+
+
+def test_cancel_mid_turn_kills_the_worker_group_and_frees_its_slot(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            await collect(pool, "s1", "hello")
+            worker = pool.processes["s1"].process
+
+            turn = asyncio.create_task(collect(pool, "s1", "sleep:10000 hello"))
+            while pool.admission.active == 0:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)  # The request is with the worker
+            turn.cancel()
+            await asyncio.gather(turn, return_exceptions=True)
+
+            await asyncio.wait_for(worker.wait(), timeout=2.0)
+            with pytest.raises(ProcessLookupError):
+                os.killpg(worker.pid, 0)
+            assert pool.admission.active == 0
+            assert "s1" not in pool.processes
+
+            assert await collect(pool, "s1", "again") == "echo: again"
+            assert pool.processes["s1"].process is not worker
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("worker_mode", [True, False])
+def test_partials_stream_through_the_pool_in_order(make_pool, monkeypatch, worker_mode):
+    async def main():
+        pool = make_pool()
+        if not worker_mode:
+            pool.serve_supported = False  # One-shot mode
+            pool.serve_retry_at = float("inf")
+        monkeypatch.setitem(pool.launcher.env, STREAM_ENV, "100")
+        await pool.start()
+        try:
+            arrivals = []
+            async for chunk in pool.execute_message("s1", "claude", "one two three", []):
+                arrivals.append((chunk, time.monotonic()))
+
+            assert [chunk for chunk, _ in arrivals] == ["echo: ", "one ", "two ", "three"]
+            # Forwarded as produced, not held back until the final payload
+            assert arrivals[-1][1] - arrivals[0][1] >= 0.25
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_message_survives_kill_during_warm_up(make_pool, monkeypatch):
+    async def main():
+        pool = make_pool()
+        monkeypatch.setitem(pool.launcher.env, STARTUP_ENV, "300")
+        await pool.start()
+        try:
+            assert pool.warm("claude", "s1") == "warming"
+            turn = asyncio.create_task(collect(pool, "s1", "hello"))
+            await asyncio.sleep(0.1)  # The turn is waiting on the warm-up
+
+            await pool.kill_process("s1")
+
+            assert await turn == "echo: hello"
+            assert pool.processes["s1"].is_alive
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_warm_up_reserves_a_worker_for_the_first_message(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            pool.warm("claude", "s1")
+            await pool.warming["s1"]
+            worker = pool.processes["s1"].process
+            assert pool.processes["s1"].reserved
+
+            assert await collect(pool, "s1", "hello") == "echo: hello"
+            assert pool.processes["s1"].process is worker
+            assert pool.reservation_hits == 1
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_warm_ups_are_capped(make_pool):
+    async def main():
+        pool = make_pool(max_reservations=2)
+        await pool.start()
+        try:
+            statuses = [pool.warm("claude", f"s{i}") for i in range(5)]
+            assert statuses == ["warming", "warming", "standby", "standby", "standby"]
+            await asyncio.wait(list(pool.warming.values()))
+
+            assert sum(1 for cli_process in pool.processes.values() if cli_process.reserved) == 2
+            assert pool.warm("claude", "s9") == "standby"
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_background_turn_leaves_the_warm_worker_alone(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            await collect(pool, "s1", "hello")
+            worker = pool.processes["s1"].process
+
+            assert await collect(pool, "s1", "build", priority="background") == "echo: build"
+
+            assert pool.processes["s1"].process is worker
+            assert os.getpriority(os.PRIO_PROCESS, worker.pid) == os.getpriority(os.PRIO_PROCESS, 0)
+            assert pool.processes["s1"].message_count == 2
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_background_turn_does_not_start_a_worker(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            assert await collect(pool, "s1", "build", priority="batch") == "echo: build"
+            assert not pool.processes["s1"].is_alive
+
+            # The next interactive turn gets a worker as usual
+            await collect(pool, "s1", "hello")
+            assert pool.processes["s1"].is_alive
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_warm_up_during_a_background_turn_keeps_the_sessions_entry(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            await collect(pool, "s1", "first", priority="batch")
+            entry = pool.processes["s1"]
+            background = asyncio.create_task(collect(pool, "s1", "sleep:500 build", priority="batch"))
+            while not entry.lock.locked():
+                await asyncio.sleep(0.01)
+
+            pool.warm("claude", "s1")
+            await pool.warming["s1"]
+            assert pool.processes["s1"] is entry and entry.reserved and entry.is_alive
+            assert entry.lock.locked()
+
+            # Waits for the background turn instead of overlapping it
+            turn = asyncio.create_task(collect(pool, "s1", "hello"))
+            done, _ = await asyncio.wait([background, turn], return_when=asyncio.FIRST_COMPLETED)
+            assert done == {background}
+            assert await turn == "echo: hello"
+            assert entry.message_count == 3
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_stop_terminates_session_and_standby_workers(make_pool):
+    async def main():
+        pool = make_pool(standby_workers=1)
+        await pool.start()
+        await collect(pool, "s1", "hello")
+        await asyncio.gather(*pool.refill_tasks.values())
+        workers = [pool.processes["s1"].process, *pool.standby["claude"], *pool.standby["codex"]]
+
+        report = await pool.stop(timeout=1.0)
+
+        assert all(worker.returncode is not None for worker in workers)
+        assert report["graceful"] + report["killed"] == 3
+        assert not pool.processes and not any(pool.standby.values())
+
+    asyncio.run(main())
+
+
+def test_broken_bridgehub_opens_the_circuit_until_a_probe_passes(make_pool, tmp_path):
+    async def main():
+        script = tmp_path / "bridgehub.js"
+        pool = make_pool(bridgehub_path=str(script))
+        pool.breaker.probe_interval = 0.05
+        await pool.start()
+        try:
+            while not pool.breaker.is_open:
+                with pytest.raises(ExecutionError):
+                    await collect(pool, "s1", "hello")
+            with pytest.raises(CircuitOpen):
+                await collect(pool, "s1", "hello")
+
+            script.write_text(STANDIN.read_text())
+            while pool.breaker.is_open:
+                await asyncio.sleep(0.05)
+
+            assert await collect(pool, "s1", "hello") == "echo: hello"
+            assert pool.breaker.state == STATE_CLOSED
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_cli_session_id_is_stored_and_resumed(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            state = {}
+            await collect(pool, "s1", "first", session_state=state)
+            assert state == {"cli_session_id": "cli-s1"}
+
+            trace = PerformanceTrace("t1", "s1", "claude")
+            assert await collect(pool, "s1", "second", session_state=state, trace=trace) == "echo: second"
+            assert trace.metadata["request_encoded"]["resumed"]
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_refused_resume_is_retried_with_full_history(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            state = {"cli_session_id": "expired-1"}
+            trace = PerformanceTrace("t1", "s1", "claude")
+
+            assert await collect(pool, "s1", "hello", session_state=state, trace=trace) == "echo: hello"
+            assert not trace.metadata["request_encoded"]["resumed"]  # The retry
+            assert state == {"cli_session_id": "cli-s1"}
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_resume_refusal_for_a_fresh_turn_fails_it(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        try:
+            state = {}
+            with pytest.raises(ExecutionError) as raised:
+                await collect(pool, "s1", "fail: resume_failed", session_state=state)
+
+            assert raised.value.code == "resume_failed"
+            assert state == {}
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_one_shot_falls_back_to_argv_requests(make_pool, monkeypatch):
+    async def main():
+        pool = make_pool()
+        pool.serve_supported = False  # One-shot mode
+        pool.serve_retry_at = float("inf")
+        monkeypatch.setitem(pool.launcher.env, ARGV_ONLY_ENV, "1")
+        await pool.start()
+        try:
+            assert await collect(pool, "s1", "hello") == "echo: hello"
+            assert not pool.launcher.stdin_requests
+            assert pool.breaker.consecutive_failures == 0
+
+            assert await collect(pool, "s1", "again") == "echo: again"
+
+            with pytest.raises(ExecutionError) as raised:
+                await collect(pool, "s1", "x" * MAX_ARGV_REQUEST_BYTES)
+            assert raised.value.code == "request_too_large"
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+def test_stop_is_not_lost_to_a_simultaneous_eviction_wakeup(make_pool):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+        await asyncio.sleep(0)  # The eviction loop is waiting
+
+        pool.eviction_wakeup.set()
+        stop = asyncio.ensure_future(pool.stop())
+        await asyncio.wait([stop], timeout=2.0)
+
+        assert stop.done() and pool.eviction_task.done()
+
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""ProcessLimiter rlimits: applied after spawn or in the child, skipped when inherited; exits explained"""
+
+import asyncio
+import resource
+import signal
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import resource_limits
+from bridgehub_standin import STARTUP_ENV
+from process_control import NEW_PROCESS_GROUP
+from resource_limits import ProcessLimiter, ResourceLimits, _Cgroup
+
+PRINT_CPU_LIMIT = "import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])"
+
+
+async def child_cpu_limit(limiter: ProcessLimiter, **options) -> int:
+    process = await limiter.spawn(
+        "test", sys.executable, "-c", PRINT_CPU_LIMIT,
+        stdout=asyncio.subprocess.PIPE, **NEW_PROCESS_GROUP, **options
+    )
+    stdout, _ = await process.communicate()
+    return int(stdout)
+
+
+def test_cpu_limit_reaches_the_child_either_way():
+    limiter = ProcessLimiter(ResourceLimits(cpu_seconds=1000, open_files=None))
+
+    async def main():
+        assert await child_cpu_limit(limiter, limit_after_spawn=False) == 1000
+        # prlimit may land after the child's first instructions, but long before it prints
+        assert await child_cpu_limit(limiter) == 1000
+
+    asyncio.run(main())
+
+
+def test_limits_the_child_inherits_are_not_set_again():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    limiter = ProcessLimiter(ResourceLimits(open_files=soft if soft != resource.RLIM_INFINITY else None))
+
+    assert limiter._rlimits() == []
+
+
+def test_without_prlimit_the_server_raises_its_own_open_files_limit(monkeypatch):
+    calls = []
+    monkeypatch.setattr(resource_limits, "LIMIT_AFTER_SPAWN", False)
+    monkeypatch.setattr(resource_limits.resource, "getrlimit", lambda limit: (256, resource.RLIM_INFINITY))
+    monkeypatch.setattr(resource_limits.resource, "setrlimit", lambda limit, values: calls.append((limit, values)))
+
+    ProcessLimiter(ResourceLimits(open_files=4096))
+
+    assert calls == [(resource.RLIMIT_NOFILE, (4096, resource.RLIM_INFINITY))]
+
+
+def test_oom_killed_cli_is_reported_whatever_bridgehub_exits_with(tmp_path):
+    limiter = ProcessLimiter(ResourceLimits(cgroup_memory_mb=512))
+    (tmp_path / "memory.events").write_text("low 0\nhigh 0\nmax 3\noom 1\noom_kill 1\n")
+    limiter.cgroups[4242] = _Cgroup(tmp_path)
+
+    breach = limiter.check_exit(SimpleNamespace(pid=4242, returncode=1))
+
+    assert breach.limit == "memory"
+    assert limiter.get_stats()["breaches"] == {"memory": 1}
+
+
+@pytest.mark.parametrize("cpu_seconds, expected", [(60, "cpu_time"), (None, None)])
+def test_sigkill_is_the_cpu_hard_limit_only_when_one_is_set(cpu_seconds, expected):
+    limiter = ProcessLimiter(ResourceLimits(cpu_seconds=cpu_seconds))
+
+    breach = limiter.check_exit(SimpleNamespace(pid=4242, returncode=-signal.SIGKILL))
+
+    assert (breach.limit if breach else None) == expected
+
+
+def test_worker_that_never_gets_ready_is_killed_and_released(make_pool, monkeypatch):
+    released = []
+
+    async def main():
+        pool = make_pool(worker_start_timeout=0.2)
+        monkeypatch.setitem(pool.launcher.env, STARTUP_ENV, "10000")
+        monkeypatch.setattr(pool.limiter, "release", released.append)
+
+        assert await pool._spawn_worker("claude") is None
+        [process] = released
+        assert process.returncode is not None
+
+    asyncio.run(main())
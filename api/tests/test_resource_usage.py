@@ -0,0 +1,124 @@
+"""Host memory and per-execution usage measurement"""
+
+import asyncio
+import logging
+import subprocess
+import sys
+
+import pytest
+
+import cli_process_pool
+import resource_usage
+
+VM_STAT = """Mach Virtual Memory Statistics: (page size of 16384 bytes)
+Pages free:                               10000.
+Pages active:                            200000.
+Pages inactive:                           50000.
+Pages speculative:                         4000.
+Pages wired down:                         90000.
+"""
+
+
+@pytest.fixture
+def no_psutil(monkeypatch):
+    monkeypatch.setattr(resource_usage, "psutil", None)
+    monkeypatch.setattr(resource_usage, "_memory_warned", False)
+
+
+def test_macos_memory_comes_from_sysctl_and_vm_stat(no_psutil, monkeypatch):
+    outputs = {"sysctl": "17179869184\n", "vm_stat": VM_STAT}
+
+    def run(command, **kwargs):
+        return subprocess.CompletedProcess(command, 0, stdout=outputs[command[0]])
+
+    monkeypatch.setattr(resource_usage.sys, "platform", "darwin")
+    monkeypatch.setattr(resource_usage.subprocess, "run", run)
+
+    available_mb, total_mb = resource_usage.host_memory()
+    assert total_mb == pytest.approx(17179.869184)
+    assert available_mb == pytest.approx(64000 * 16384 / 1e6)  # free + inactive + speculative
+
+
+def test_unreadable_memory_is_none_and_warned_once(no_psutil, monkeypatch, caplog):
+    def unreadable(*args, **kwargs):
+        raise OSError("no such file")
+
+    monkeypatch.setattr(resource_usage.sys, "platform", "linux")
+    monkeypatch.setattr("builtins.open", unreadable)
+
+    with caplog.at_level(logging.WARNING, logger="resource_usage"):
+        assert resource_usage.host_memory() is None
+        assert resource_usage.host_memory() is None
+
+    assert len([record for record in caplog.records if "Cannot read host memory" in record.message]) == 1
+
+
+def test_pool_without_memory_readings_neither_evicts_nor_extends(make_pool, monkeypatch):
+    monkeypatch.setattr(cli_process_pool, "host_memory", lambda: None)
+
+    async def main():
+        pool = make_pool(standby_workers=1)
+        await pool.start()
+        try:
+            await pool.refill_tasks["claude"]
+            await pool._relieve_memory_pressure()
+
+            assert len(pool.standby["claude"]) == 1
+            assert not pool._memory_plentiful()
+            assert pool.get_stats()["eviction"]["memory_available_mb"] is None
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
+
+
+async def spawn(code: str) -> asyncio.subprocess.Process:
+    return await asyncio.create_subprocess_exec(sys.executable, "-c", code)
+
+
+BURN = "import time\nend = time.process_time() + 0.3\nwhile time.process_time() < end: pass"
+
+
+def test_reaped_one_shot_gets_its_own_cpu_time(no_psutil):
+    async def main():
+        process = await spawn(BURN)
+        meter = resource_usage.UsageMeter(process)
+        await process.wait()
+        return meter.stop(100, 2000)
+
+    usage = asyncio.run(main())
+
+    assert usage.source == "rusage"
+    assert 0.25 <= usage.user_cpu_s + usage.system_cpu_s < 2.0
+    assert usage.wall_ms >= 250
+    assert (usage.bytes_in, usage.bytes_out) == (100, 2000)
+
+
+def test_live_worker_and_overlapping_executions_are_unmeasured(no_psutil):
+    async def main():
+        worker = await spawn("import time; time.sleep(10)")
+        one_shot = await spawn(BURN)
+        try:
+            worker_meter = resource_usage.UsageMeter(worker)
+            one_shot_meter = resource_usage.UsageMeter(one_shot)
+            await one_shot.wait()
+            return one_shot_meter.stop(), worker_meter.stop()
+        finally:
+            worker.kill()
+            await worker.wait()
+
+    for usage in asyncio.run(main()):
+        assert usage.user_cpu_s is None and usage.system_cpu_s is None
+        assert usage.max_rss_mb is None
+        assert usage.to_dict()["user_cpu_s"] is None
+
+
+def test_totals_count_unmeasured_executions_apart():
+    ledger = resource_usage.UsageLedger()
+    ledger.record("s1", "claude", resource_usage.ExecutionUsage(user_cpu_s=1.0, system_cpu_s=0.5, max_rss_mb=80.0, wall_ms=900))
+    ledger.record("s1", "claude", resource_usage.ExecutionUsage(wall_ms=100, source="daemon"))
+
+    totals = ledger.session_stats("s1")
+    assert totals["executions"] == 2 and totals["unmeasured"] == 1
+    assert totals["user_cpu_s"] == 1.0 and totals["peak_rss_mb"] == 80.0
+    assert totals["wall_s"] == 1.0
@@ -0,0 +1,96 @@
+"""Response cache: TTL and LRU, and what the server lets into it"""
+
+import asyncio
+import time
+
+import pytest
+
+import response_cache
+from response_cache import CacheOptions, ResponseCache
+from session_manager import SessionManager
+
+
+class FakeWebSocket:
+    """Records the frames a handler sends"""
+
+    closed = False
+
+    def __init__(self):
+        self.frames = []
+
+    async def send_json(self, frame):
+        self.frames.append(frame)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """server_persistent with its own session database and response cache"""
+
+    # The module opens api/sessions.db relative to the working directory on import
+    (tmp_path / "api").mkdir()
+    monkeypatch.chdir(tmp_path)
+    import server_persistent
+
+    monkeypatch.setattr(server_persistent, "session_manager", SessionManager(db_path=str(tmp_path / "sessions.db")))
+    monkeypatch.setattr(response_cache, "response_cache", ResponseCache())
+    return server_persistent
+
+
+def test_entries_expire_after_their_ttl():
+    cache = ResponseCache()
+    cache.put("short", "a", ttl=0.05)
+    cache.put("long", "b", ttl=60)
+
+    assert cache.get("short") == "a"
+    time.sleep(0.06)
+    assert cache.get("short") is None
+    assert cache.get("long") == "b"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")  # b is now the least recently used
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.evictions == 1
+
+
+def test_cache_options_cap_the_ttl():
+    assert CacheOptions.from_message(True).ttl == response_cache.DEFAULT_TTL_SECONDS
+    assert CacheOptions.from_message({"ttl": 10 ** 6}).ttl == response_cache.MAX_TTL_SECONDS
+    assert CacheOptions.from_message("yes") is None
+
+
+def test_failed_turn_is_not_cached(server, make_pool, monkeypatch):
+    async def main():
+        pool = make_pool()
+        await pool.start()
+
+        async def get_pool():
+            return pool
+
+        monkeypatch.setattr(server, "get_cli_pool", get_pool)
+
+        try:
+            for _ in range(2):
+                ws = FakeWebSocket()
+                await server.handle_claude_session(ws, "fail: quota exceeded", "s-fail", "device", cache=CacheOptions())
+                assert ws.frames[-1]["type"] == "error"
+            assert response_cache.response_cache.get_stats()["entries"] == 0
+
+            sent = []
+            for _ in range(2):
+                ws = FakeWebSocket()
+                await server.handle_claude_session(ws, "status", "s-ok", "device", cache=CacheOptions())
+                sent.append(ws.frames)
+            assert sent[0][-1]["cached"] is False
+            assert sent[1][-1]["cached"] is True
+            assert sent[1][0]["content"] == sent[0][0]["content"]
+        finally:
+            await pool.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""Session history windowing by token budget, excerpts of older turns and find_turn"""
+
+from session_manager import EXCERPT_TOKENS, MAX_MESSAGE_TOKENS, Session, estimate_tokens
+
+
+def make_session(count: int, chars: int = 400) -> Session:
+    session = Session(session_id="s1", agent_type="claude", device_id="d1")
+    for i in range(count):
+        session.add_message("user" if i % 2 == 0 else "assistant", f"{i} " + "x" * chars)
+    return session
+
+
+def test_window_keeps_the_newest_messages_within_budget():
+    session = make_session(20)
+
+    history = session.get_conversation_history(max_tokens=1000)
+
+    window = history[1:]
+    assert history[0]["role"] == "system"
+    assert window[-1]["content"].startswith("19 ")
+    assert sum(estimate_tokens(entry["content"]) for entry in window) <= 1000
+    assert session.excerpts_cover == 20 - len(window)
+    assert history[0]["content"].startswith(f"Opening lines of the {session.excerpts_cover} messages before this window:")
+
+
+def test_excerpts_are_extended_as_the_window_slides():
+    session = make_session(20)
+    session.get_conversation_history(max_tokens=1000)
+    covered, excerpts = session.excerpts_cover, session.history_excerpts
+
+    session.add_message("user", "20 " + "x" * 400)
+    session.get_conversation_history(max_tokens=1000)
+
+    assert session.excerpts_cover == covered + 1
+    assert session.history_excerpts.startswith(excerpts)
+
+
+def test_the_oldest_excerpts_are_dropped_and_said_to_be():
+    session = make_session(200)
+
+    history = session.get_conversation_history(max_tokens=1000)
+
+    kept = session.history_excerpts.splitlines()
+    assert estimate_tokens(session.history_excerpts) <= EXCERPT_TOKENS
+    assert len(kept) < session.excerpts_cover
+    assert not kept[0].startswith("- user: 0 ")  # The first turns are gone
+    assert history[0]["content"].startswith(
+        f"Opening lines of the {len(kept)} messages before this window, "
+        f"the {session.excerpts_cover - len(kept)} before them omitted:"
+    )
+
+
+def test_excerpts_saved_under_the_old_keys_still_load():
+    session = make_session(20)
+    session.get_conversation_history(max_tokens=1000)
+    data = session.to_dict()
+    data["history_summary"], data["summary_covers"] = data.pop("history_excerpts"), data.pop("excerpts_cover")
+
+    loaded = Session.from_dict(data)
+
+    assert (loaded.history_excerpts, loaded.excerpts_cover) == (session.history_excerpts, session.excerpts_cover)
+
+
+def test_short_histories_have_no_excerpts():
+    session = make_session(3, chars=10)
+
+    assert [entry["role"] for entry in session.get_conversation_history(max_tokens=1000)] == ["user", "assistant", "user"]
+
+
+def test_a_huge_newest_message_is_clipped_but_kept():
+    session = make_session(1, chars=100_000)
+
+    history = session.get_conversation_history(max_tokens=1000)
+
+    assert len(history) == 1
+    assert "characters omitted" in history[0]["content"]
+    assert estimate_tokens(history[0]["content"]) <= MAX_MESSAGE_TOKENS + 20
+
+
+def test_find_turn_matches_the_client_message_id():
+    session = make_session(2, chars=1)
+    session.add_message("user", "hi", {"message_id": "m1"})
+    session.add_message("assistant", "hello", {"message_id": "m1"})
+    session.add_message("user", "again", {"message_id": "m2"})
+
+    user_message, reply = session.find_turn("m1")
+    assert (user_message.content, reply.content) == ("hi", "hello")
+    assert session.find_turn("m2")[1] is None
@@ -0,0 +1,26 @@
+"""StderrLog retention: live children's rings stay, exited ones age out"""
+
+from types import SimpleNamespace
+
+from stderr_capture import StderrLog
+
+
+def child(pid, returncode=None):
+    return SimpleNamespace(pid=pid, stderr=None, returncode=returncode)
+
+
+def test_live_rings_outlast_many_exited_children():
+    log = StderrLog(max_entries=3)
+    worker = child(1)
+    log.capture(worker, "worker", "claude")
+
+    for pid in range(2, 12):
+        log.capture(child(pid, returncode=0), "one-shot", "claude")
+
+    assert log.get(1) is not None
+    assert sorted(log.entries) == [1, 9, 10, 11]
+
+    # Once the worker exits it ages out like any other child
+    worker.returncode = 0
+    log.capture(child(12, returncode=0), "one-shot", "claude")
+    assert log.get(1) is None
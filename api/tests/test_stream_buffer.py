@@ -0,0 +1,74 @@
+"""Stream buffer backpressure policies and their configuration"""
+
+import asyncio
+
+import pytest
+
+import stream_buffer
+from stream_buffer import StreamBuffer, buffered
+
+
+async def drain(buffer: StreamBuffer) -> list:
+    buffer.close()
+    chunks = []
+    while (chunk := await buffer.get()) is not None:
+        chunks.append(chunk)
+    return chunks
+
+
+def test_coalesce_merges_into_the_last_chunk_when_full():
+    async def main():
+        buffer = StreamBuffer("coalesce", max_chunks=2)
+        for chunk in "abcd":
+            await buffer.put(chunk)
+
+        assert buffer.counters["coalesced"] == 2
+        assert await drain(buffer) == ["a", "bcd"]
+
+    asyncio.run(main())
+
+
+def test_pause_waits_for_the_consumer():
+    async def main():
+        buffer = StreamBuffer("pause", max_chunks=1)
+        await buffer.put("a")
+        put = asyncio.create_task(buffer.put("b"))
+        await asyncio.sleep(0.01)
+        assert not put.done()
+
+        assert await buffer.get() == "a"
+        await put
+        assert buffer.counters["pauses"] == 1
+        assert await drain(buffer) == ["b"]
+
+    asyncio.run(main())
+
+
+def test_spill_keeps_order_through_the_disk():
+    async def main():
+        buffer = StreamBuffer("spill", max_chunks=2)
+        for chunk in ["a", "b", "c", "d"]:
+            await buffer.put(chunk)
+
+        assert buffer.counters["spilled_chunks"] == 2
+        assert await drain(buffer) == ["a", "b", "c", "d"]
+        buffer.discard()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("value, policy", [("", "coalesce"), ("Spill", "spill"), ("pause", "pause"), ("drop", "coalesce")])
+def test_policy_comes_from_the_environment(monkeypatch, value, policy):
+    monkeypatch.setenv(stream_buffer.STREAM_POLICY_ENV, value)
+    monkeypatch.setattr(stream_buffer, "stream_policy", None)
+
+    async def source():
+        for chunk in ["a", "b"]:
+            yield chunk
+
+    async def main():
+        return [chunk async for chunk in buffered(source())]
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert stream_buffer.get_stream_policy() == policy
+    assert stream_buffer.get_backpressure_stats().get_stats()["by_policy"][policy]["streams"] >= 1
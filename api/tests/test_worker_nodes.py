@@ -0,0 +1,169 @@
+"""Consistent-hash placement of sessions on worker nodes, and per-request dispatch to them"""
+
+import asyncio
+import json
+import shutil
+import subprocess
+import time
+from collections import Counter
+
+import pytest
+
+import bridgehub_daemon
+from admission_control import AdmissionController
+from conftest import collect, start_node, stop_node
+from worker_nodes import HashRing, NodeCluster
+
+
+def test_ring_moves_about_one_nth_of_sessions_when_a_node_joins():
+    ring = HashRing()
+    for node in ["a", "b", "c"]:
+        ring.add(node)
+
+    sessions = [f"session-{i}" for i in range(2000)]
+    before = {session: ring.owner(session) for session in sessions}
+    assert min(Counter(before.values()).values()) > 400  # Roughly even
+
+    ring.add("d")
+    moved = [session for session in sessions if ring.owner(session) != before[session]]
+
+    assert all(ring.owner(session) == "d" for session in moved)
+    assert 300 < len(moved) < 700
+
+
+def test_ring_owners_lists_each_node_once_owner_first():
+    ring = HashRing()
+    for node in ["a", "b", "c"]:
+        ring.add(node)
+
+    owners = list(ring.owners("s1"))
+    assert sorted(owners) == ["a", "b", "c"]
+    assert owners[0] == ring.owner("s1")
+
+    ring.remove(owners[0])
+    assert ring.owner("s1") == owners[1]
+
+
+def test_draining_node_is_inactive_and_releases_its_sessions():
+    async def main():
+        cluster = NodeCluster(["tcp://127.0.0.1:1", "tcp://127.0.0.1:2"])
+        owner = cluster.route("s1").address
+        cluster.assignments["s1"] = owner
+
+        report = await cluster.drain(owner, timeout=0)
+
+        assert report["sessions_moved"] == 1
+        assert cluster.route("s1").address != owner
+        assert cluster.active
+
+        await cluster.drain(cluster.route("s1").address, timeout=0)
+        assert not cluster.active and cluster.route("s1") is None
+
+    asyncio.run(main())
+
+
+def test_sessions_follow_nodes_added_and_removed_between_turns(make_pool):
+    async def main():
+        cluster = NodeCluster()
+        pool = make_pool(cluster=cluster)
+        await pool.start()
+        address, node = await start_node()
+        try:
+            assert await collect(pool, "s1", "here") == "echo: here"
+            local = pool.processes["s1"].process
+
+            cluster.add_node(address)
+            assert await collect(pool, "s1", "there") == "echo: there"
+            assert cluster.assignments["s1"] == address
+            assert local.returncode is not None  # Retired
+            assert not pool.processes["s1"].is_alive
+            assert not pool.worker_mode
+
+            await cluster.remove_node(address)
+            assert await collect(pool, "s1", "back") == "echo: back"
+            assert pool.processes["s1"].is_alive
+            assert pool.processes["s1"].message_count == 3
+        finally:
+            await pool.stop()
+            await cluster.close()
+            await stop_node(node)
+
+    asyncio.run(main())
+
+
+def test_turns_on_nodes_take_no_local_admission_slot(make_pool):
+    async def main():
+        cluster = NodeCluster()
+        admission = AdmissionController(max_concurrent=1)
+        pool = make_pool(cluster=cluster, admission=admission)
+        await pool.start()
+        address, node = await start_node()
+        cluster.add_node(address)
+        try:
+            started = time.monotonic()
+            answers = await asyncio.gather(*(collect(pool, f"s{i}", "sleep:300 hi") for i in range(3)))
+
+            assert answers == ["echo: hi"] * 3
+            assert time.monotonic() - started < 0.8  # Concurrent, not one at a time
+            assert admission.admitted == 0
+        finally:
+            await pool.stop()
+            await cluster.close()
+            await stop_node(node)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("address, allowed", [
+    ("tcp://127.0.0.1:7300", True),
+    ("tcp://localhost:7300", True),
+    ("tcp://[::1]:7300", True),
+    ("tcp://mini-1.local:7300", False),
+    ("tcp://10.0.0.5:7300", False),
+    ("tls://mini-1.local:7300", True),
+    ("mini-1.local:7300", False),
+])
+def test_plaintext_nodes_are_refused_off_loopback(address, allowed):
+    cluster = NodeCluster()
+    if allowed:
+        cluster.add_node(address)
+    else:
+        with pytest.raises(ValueError):
+            cluster.add_node(address)
+        assert address not in cluster.nodes
+
+
+def test_plaintext_nodes_can_be_allowed_explicitly():
+    assert NodeCluster(["tcp://10.0.0.5:7300"], allow_plaintext=True).configured
+    assert not NodeCluster(["tcp://10.0.0.5:7300"]).configured
+
+
+def test_requests_reach_a_node_over_tls(tmp_path, monkeypatch):
+    if not shutil.which("openssl"):
+        pytest.skip("openssl is needed to make a test certificate")
+
+    cert, key = tmp_path / "node.pem", tmp_path / "node.key"
+    subprocess.run([
+        "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+        "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+        "-keyout", str(key), "-out", str(cert)
+    ], check=True, capture_output=True)
+    monkeypatch.setenv(bridgehub_daemon.NODE_CA_ENV, str(cert))
+    monkeypatch.setattr(bridgehub_daemon, "tls_context", None)
+
+    async def main():
+        address, node = await start_node(
+            token="secret", scheme="tls", host="localhost",
+            options=("--tls-cert", str(cert), "--tls-key", str(key))
+        )
+        cluster = NodeCluster([address], token="secret")
+        try:
+            body = json.dumps({"session": "s1", "payload": {"message": "hi"}}).encode('utf-8')
+            records = [record async for record in cluster.execute("s1", body)]
+            assert records[-1][0] == "payload"
+            assert json.loads(records[-1][1])["data"]["output"] == "echo: hi"
+        finally:
+            await cluster.close()
+            await stop_node(node)
+
+    asyncio.run(main())
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Worker Nodes for BuilderOS Mobile
+
+One Mac running every CLI caps capacity at its cores and memory. A worker
+node is another machine running a BridgeHub daemon that listens on TCP
+(`bridgehub.js --daemon --socket tls://0.0.0.0:7300`); it speaks the same
+multiplexed daemon protocol as the local Unix socket (see
+docs/BRIDGEHUB_WORKER_PROTOCOL.md, "Worker nodes").
+
+NodeCluster dispatches executions across the nodes:
+- Sessions map to nodes by consistent hashing on session_id (with virtual
+  nodes), so a session keeps landing where its CLI state is warm and
+  adding or removing a node only moves about 1/N of the sessions
+- A session sticks to the node that last ran it while that node is active,
+  even if a newly added node now owns it on the ring; rebalance() releases
+  such sessions to their ring owner
+- drain() stops new work for a node, waits for its in-flight executions
+  and then removes it; its sessions move to the next node on the ring
+- A node that cannot be reached is skipped for the next one on the ring
+
+Nodes are configured with BRIDGEHUB_NODES (comma-separated addresses) and
+authenticate with BRIDGEHUB_NODE_TOKEN. Without nodes, everything runs on
+this Mac as before.
+
+Requests carry conversation history and the token, so nodes on other hosts
+must be tls:// addresses. Plain tcp:// is refused for anything but loopback
+unless BRIDGEHUB_ALLOW_PLAINTEXT_NODES=1 (e.g. on a VPN or through an SSH
+tunnel).
+
+`bridgehub_standin.py --nodes N` runs a local multi-process stand-in cluster.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import ipaddress
+import logging
+import os
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bridgehub_daemon import TCP_SCHEME, TLS_SCHEME, DaemonPool, DaemonUnavailable, split_address
+from bridgehub_protocol import ProtocolError
+
+logger = logging.getLogger(__name__)
+
+NODES_ENV = "BRIDGEHUB_NODES"
+NODE_TOKEN_ENV = "BRIDGEHUB_NODE_TOKEN"
+PLAINTEXT_NODES_ENV = "BRIDGEHUB_ALLOW_PLAINTEXT_NODES"
+
+VIRTUAL_NODES = 64  # Ring points per node; more spreads sessions more evenly
+DRAIN_TIMEOUT = 300.0  # Seconds a draining node gets to finish in-flight work
+DRAIN_POLL_INTERVAL = 0.5
+
+NODE_ACTIVE = "active"
+NODE_DRAINING = "draining"
+
+
+def check_node_address(address: str, allow_plaintext: bool = False):
+    """
+    Refuse node addresses that would send requests in the clear to another host
+
+    Raises:
+        ValueError: not a tcp:// or tls://host:port address, or plain TCP to a
+            host other than loopback while plaintext is not allowed
+    """
+
+    if not address.startswith((TCP_SCHEME, TLS_SCHEME)):
+        raise ValueError(f"Worker node address must be tls://host:port or tcp://host:port: {address}")
+
+    try:
+        scheme, host, _ = split_address(address)
+    except ValueError:
+        raise ValueError(f"Worker node address has no valid port: {address}")
+
+    if scheme == TLS_SCHEME or allow_plaintext:
+        return
+
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = host == "localhost"
+
+    if not loopback:
+        raise ValueError(
+            f"Refusing plaintext worker node {address}: use tls:// "
+            f"(or set {PLAINTEXT_NODES_ENV}=1 on a trusted network)"
+        )
+
+
+def _ring_hash(key: str) -> int:
+    """Stable 64-bit hash (Python's hash() differs between processes)"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring of node ids"""
+
+    def __init__(self, virtual_nodes: int = VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self.points: List[Tuple[int, str]] = []
+
+    def add(self, node_id: str):
+        for i in range(self.virtual_nodes):
+            bisect.insort(self.points, (_ring_hash(f"{node_id}#{i}"), node_id))
+
+    def remove(self, node_id: str):
+        self.points = [point for point in self.points if point[1] != node_id]
+
+    def owners(self, key: str) -> Iterator[str]:
+        """Distinct node ids in ring order from the key's position (owner first)"""
+
+        if not self.points:
+            return
+
+        start = bisect.bisect(self.points, (_ring_hash(key), ""))
+        seen = set()
+        for i in range(len(self.points)):
+            node_id = self.points[(start + i) % len(self.points)][1]
+            if node_id not in seen:
+                seen.add(node_id)
+                yield node_id
+
+    def owner(self, key: str) -> Optional[str]:
+        return next(self.owners(key), None)
+
+
+class WorkerNode:
+    """One worker node and its pooled daemon connections"""
+
+    def __init__(self, address: str, token: Optional[str] = None):
+        self.address = address
+        self.pool = DaemonPool(address, token=token)
+        self.state = NODE_ACTIVE
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def active_requests(self) -> int:
+        return sum(conn.load for conn in self.pool.connections if not conn.closed)
+
+    @property
+    def usable(self) -> bool:
+        return self.state == NODE_ACTIVE and self.pool.available
+
+
+class NodeCluster:
+    """
+    Session-affine dispatch of BridgeHub requests across worker nodes
+
+    Usage:
+        async for kind, body in cluster.execute(session_id, encoded_request):
+            ...
+    Raises DaemonUnavailable (before yielding) when no node can take it.
+    """
+
+    def __init__(
+        self,
+        addresses: Iterable[str] = (),
+        token: Optional[str] = None,
+        virtual_nodes: int = VIRTUAL_NODES,
+        allow_plaintext: bool = False  # Plain tcp:// to other hosts
+    ):
+        self.token = token
+        self.allow_plaintext = allow_plaintext
+        self.ring = HashRing(virtual_nodes)
+        self.nodes: Dict[str, WorkerNode] = {}
+
+        # Session → node that last ran it (where its CLI state is warm)
+        self.assignments: Dict[str, str] = {}
+        self.reroutes = 0  # Requests sent past an unreachable node
+
+        for address in addresses:
+            try:
+                self.add_node(address)
+            except ValueError as e:
+                logger.error(f"❌ {e}")
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.nodes)
+
+    @property
+    def active(self) -> bool:
+        """Whether any node takes new sessions (draining nodes do not)"""
+        return any(node.state == NODE_ACTIVE for node in self.nodes.values())
+
+    def add_node(self, address: str) -> WorkerNode:
+        """
+        Add a node (or reactivate a draining one) and give it its share of new sessions
+
+        Raises:
+            ValueError: the address is malformed or would be plaintext to another host
+        """
+
+        node = self.nodes.get(address)
+        if node is None:
+            check_node_address(address, self.allow_plaintext)
+            node = WorkerNode(address, self.token)
+            self.nodes[address] = node
+        elif node.state == NODE_ACTIVE:
+            return node
+
+        node.state = NODE_ACTIVE
+        self.ring.add(address)
+        logger.info(f"🖥️  Worker node {address} added ({len(self.nodes)} nodes)")
+        return node
+
+    async def remove_node(self, address: str):
+        """Remove a node at once, cutting off anything still running on it"""
+
+        node = self.nodes.pop(address, None)
+        if node is None:
+            return
+
+        self.ring.remove(address)
+        self._release_sessions(address)
+        await node.pool.close()
+        logger.info(f"🖥️  Worker node {address} removed ({len(self.nodes)} nodes)")
+
+    async def drain(self, address: str, timeout: float = DRAIN_TIMEOUT) -> Dict:
+        """
+        Take a node out of rotation once its in-flight executions finish
+
+        Args:
+            address: Node to drain
+            timeout: Seconds to wait before cutting off what is still running
+
+        Returns:
+            Drain report (sessions moved, whether it finished in time)
+        """
+
+        node = self.nodes.get(address)
+        if node is None:
+            raise KeyError(f"Unknown worker node: {address}")
+
+        start_time = time.monotonic()
+        node.state = NODE_DRAINING
+        self.ring.remove(address)
+        moved = self._release_sessions(address)
+        in_flight = node.active_requests
+        logger.info(f"🚰 Draining worker node {address} ({in_flight} in flight, {moved} sessions moved)")
+
+        while node.active_requests and node.state == NODE_DRAINING and time.monotonic() - start_time < timeout:
+            await asyncio.sleep(DRAIN_POLL_INTERVAL)
+
+        if node.state != NODE_DRAINING or self.nodes.get(address) is not node:
+            # Re-added (or removed) while draining
+            return {"node": address, "sessions_moved": moved, "in_flight": in_flight, "drained": False}
+
+        drained = not node.active_requests
+        if not drained:
+            logger.warning(f"⚠️  Worker node {address} still had {node.active_requests} executions after {timeout:.0f}s")
+
+        await self.remove_node(address)
+        return {
+            "node": address,
+            "sessions_moved": moved,
+            "in_flight": in_flight,
+            "drained": drained,
+            "duration_ms": round((time.monotonic() - start_time) * 1000, 1)
+        }
+
+    def rebalance(self) -> Dict:
+        """
+        Release sessions that stuck to a node other than their ring owner
+
+        Their next message goes to the owner; the old node's warm state for
+        them simply idles out.
+        """
+
+        moved = [
+            session_id for session_id, address in self.assignments.items()
+            if self.ring.owner(session_id) != address
+        ]
+        for session_id in moved:
+            del self.assignments[session_id]
+
+        if moved:
+            logger.info(f"⚖️  Rebalanced {len(moved)} of {len(self.assignments) + len(moved)} sessions")
+        return {"sessions_moved": len(moved), "sessions": len(self.assignments)}
+
+    def forget(self, session_id: str):
+        """Drop a closed session's node assignment"""
+        self.assignments.pop(session_id, None)
+
+    def _release_sessions(self, address: str) -> int:
+        sessions = [session_id for session_id, node in self.assignments.items() if node == address]
+        for session_id in sessions:
+            del self.assignments[session_id]
+        return len(sessions)
+
+    def route(self, session_id: str, exclude: Collection[str] = ()) -> Optional[WorkerNode]:
+        """The node a session's next execution should run on, if any is usable"""
+
+        assigned = self.nodes.get(self.assignments.get(session_id, ""))
+        if assigned and assigned.usable and assigned.address not in exclude:
+            return assigned
+
+        for address in self.ring.owners(session_id):
+            node = self.nodes[address]
+            if node.usable and address not in exclude:
+                return node
+
+        return None
+
+    async def execute(self, session_id: str, body: bytes) -> AsyncIterator[Tuple[str, bytes]]:
+        """
+        Run one encoded request on the session's node
+
+        Yields:
+            (kind, body) records, ending with the payload
+
+        Raises:
+            DaemonUnavailable: no node could take the request; nothing was sent
+            ConnectionError: the node dropped the connection mid-request
+        """
+
+        tried: List[str] = []
+
+        while True:
+            node = self.route(session_id, tried)
+            if node is None:
+                raise DaemonUnavailable(f"No worker node available (tried {len(tried)})")
+
+            if tried:
+                self.reroutes += 1
+
+            records = node.pool.execute(body)
+            try:
+                accepted = False
+                async with aclosing(records):
+                    async for record in records:
+                        if not accepted:
+                            accepted = True
+                            node.requests += 1
+                            if node.state == NODE_ACTIVE and self.assignments.get(session_id) != node.address:
+                                self.assignments[session_id] = node.address
+                                logger.debug(f"🖥️  Session {session_id[:8]} now on worker node {node.address}")
+                        yield record
+                return
+
+            except DaemonUnavailable as e:
+                # Nothing was sent: try the next node on the ring
+                logger.warning(f"⚠️  Worker node {node.address} unavailable: {e}")
+                tried.append(node.address)
+
+            except (ConnectionError, OSError, ProtocolError):
+                node.failures += 1
+                self.forget(session_id)
+                raise
+
+    async def close(self):
+        """Close the connections to every node"""
+        for node in self.nodes.values():
+            await node.pool.close()
+
+    def get_stats(self) -> Dict:
+        """Get worker node statistics"""
+
+        sessions_by_node: Dict[str, int] = {}
+        for address in self.assignments.values():
+            sessions_by_node[address] = sessions_by_node.get(address, 0) + 1
+
+        return {
+            "configured": self.configured,
+            "active": self.active,
+            "sessions": len(self.assignments),
+            "reroutes": self.reroutes,
+            "nodes": [
+                {
+                    "address": address,
+                    "state": node.state,
+                    "connected": any(not conn.closed for conn in node.pool.connections),
+                    "active_requests": node.active_requests,
+                    "sessions": sessions_by_node.get(address, 0),
+                    "requests": node.requests,
+                    "failures": node.failures
+                }
+                for address, node in self.nodes.items()
+            ]
+        }
+
+
+# Global node cluster shared by CLIProcessPool and the admin endpoints
+node_cluster: Optional[NodeCluster] = None
+
+
+def get_node_cluster() -> NodeCluster:
+    """Get or create the global node cluster from BRIDGEHUB_NODES"""
+    global node_cluster
+
+    if node_cluster is None:
+        addresses = [address.strip() for address in os.environ.get(NODES_ENV, "").split(",") if address.strip()]
+        node_cluster = NodeCluster(
+            addresses,
+            token=os.environ.get(NODE_TOKEN_ENV) or None,
+            allow_plaintext=os.environ.get(PLAINTEXT_NODES_ENV, "").strip().lower() in ("1", "true", "yes")
+        )
+
+    return node_cluster